@@ -18,6 +18,7 @@ from gametools.ImageFuncs import *
 from gametools.ani import *
 import BaseFunctions
 import TileFuncs
+from TileGrid import FISHABLE, WALKABLE
 from World import *
 from async_funcs.entity_consumption import consume_func_villager
 
@@ -55,6 +56,7 @@ class Angler(GameEntity):
         self.max_speed = 80.0 * (1.0 / 60.0)
         self.speed = self.max_speed
         self.base_speed = self.speed
+        self.nav_profile = "angler"
         self.view_range = 3
         self.fish = 0
         self.hunger_limit = 40
@@ -144,10 +146,14 @@ class Searching(State):
     def entry_actions(self):
         """Defines actions to be taken when entering the Searching state."""
         dice = random()
-        if dice > ANGLER_RETURN_PROBABILITY or len(self.angler.world.known_fishing_spots) == 0:
-            BaseFunctions.random_dest(self.angler)
+        known_spots = []
+        if dice <= ANGLER_RETURN_PROBABILITY:
+            # Only return to the spots that can still be reached from here
+            known_spots = [spot for spot in self.angler.world.known_fishing_spots
+                           if self.angler.world.is_reachable(self.angler.location, spot, self.angler.nav_profile)]
+        if len(known_spots) == 0:
+            BaseFunctions.resource_dest(self.angler, "shore")
         else:
-            known_spots = self.angler.world.known_fishing_spots
             spot_dice = randint(1, len(known_spots)) - 1
             self.angler.destination = known_spots[spot_dice]
 
@@ -163,26 +169,28 @@ class Searching(State):
         """
         # Check if the Angler has reached its destination
         if self.angler.location.get_distance_to(self.angler.destination) < 0.25 * self.angler.world.tile_size:
-            location_array = TileFuncs.get_vnn_array(self.angler.world,(self.angler.location), self.angler.view_range)
-
-            for location in location_array:
+            world = self.angler.world
+            tiles = world.tiles
+            nav = world.nav_layers[self.angler.nav_profile]
+            tile_size = world.tile_size
+            start = (int(self.angler.location.x // tile_size), int(self.angler.location.y // tile_size))
+
+            # Works on tile coordinates and flat indices, only the chosen spot becomes a Vector2
+            for water_x, water_y in tiles.find(start[0], start[1], self.angler.view_range - 1, FISHABLE):
                 # TODO: This will make the angler go into the water, change this to go to the nearest walkable tile.
-                test_tile = TileFuncs.get_tile(self.angler.world, location)
-                if test_tile.fishable:
-                    destination_array = TileFuncs.get_vnn_array(world=self.angler.world, location=location, r=2)
-                    for destination in destination_array:
-                        destination_tile = TileFuncs.get_tile(self.angler.world, destination)
-                        if destination_tile.walkable:
-                            self.angler.destination = destination.copy()
-                            self.angler.destination.x = int(self.angler.destination.x // 32 * 32)
-                            self.angler.destination.y = int(self.angler.destination.y // 32 * 32)
-                            if self.angler.destination not in self.angler.world.known_fishing_spots:
-                                print("Angler ID: " + str(self.angler.id) + " adding new fishing spots: "
-                                      + str(self.angler.destination))
-                                self.angler.world.known_fishing_spots.append(self.angler.destination)
-                            return "Fishing"
-
-            BaseFunctions.random_dest(self.angler)
+                for index in tiles.cells(water_x, water_y, 1):
+                    if not tiles.flags[index] & WALKABLE:
+                        continue
+                    goal = (index % tiles.width, index // tiles.width)
+                    if nav.reachable(start, goal):
+                        self.angler.destination = Vector2(goal[0] * tile_size, goal[1] * tile_size)
+                        if self.angler.destination not in self.angler.world.known_fishing_spots:
+                            print("Angler ID: " + str(self.angler.id) + " adding new fishing spots: "
+                                  + str(self.angler.destination))
+                            self.angler.world.known_fishing_spots.append(self.angler.destination)
+                        return "Fishing"
+
+            BaseFunctions.resource_dest(self.angler, "shore")
 
         # Check if Angler needs to eat
         if self.angler.food < self.angler.hunger_limit:
@@ -192,7 +200,8 @@ class Searching(State):
         #     return "Idle"
 
     def exit_actions(self):
-        pass
+        """Gives up the claim on the shore the Angler was heading for."""
+        self.angler.world.reservations.release_all(self.angler)
 
 
 class Delivering(State):
@@ -16,6 +16,7 @@ from configuration.villager_configuration import WORKING_TIME_END
 from gametools.vector2 import Vector2
 from gametools.ImageFuncs import *
 from gametools.ani import *
+from gametools import tile_images
 from async_funcs.entity_consumption import consume_func_villager
 import math
 import pygame
@@ -123,10 +124,10 @@ class Arborist_Planting(State):
                 self.arborist.world,self.arborist.location).plantable == 1:
             self.plant_seed()
 
-        # Move to a random destination if the current tile is not plantable
+        # Move to one of the closest plantable tiles if the current tile is not plantable
         if self.arborist.location == self.arborist.destination and self.arborist.hit != 4 and TileFuncs.get_tile(
                 self.arborist.world, self.arborist.location).plantable != 1:
-            BaseFunctions.random_dest(self.arborist)
+            BaseFunctions.resource_dest(self.arborist, "plantable")
 
     def plant_seed(self):
         """
@@ -141,28 +142,32 @@ class Arborist_Planting(State):
             old_tile = TileFuncs.get_tile(self.arborist.world,Vector2(self.arborist.location))
 
             # Prepare the new tile for the tree
-            darkness = pygame.Surface((32, 32))
-            darkness.set_alpha(old_tile.darkness)
+            darkness = tile_images.get_shade(old_tile.darkness, (32, 32))
 
             new_tile = Tile.Baby_Tree(self.arborist.world, "GrassWithCenterTree")
 
             new_tile.darkness = old_tile.darkness
 
             new_tile.location = TileFuncs.get_tile_pos(self.arborist.world,self.arborist.destination)*32
-            new_tile.rect.topleft = new_tile.location
             new_tile.color = old_tile.color
 
             # Update the world with the new tile
-            self.arborist.world.tile_array[int(new_tile.location.y/32)][int(new_tile.location.x/32)] = new_tile
+            self.arborist.world.set_tile(int(new_tile.location.x/32), int(new_tile.location.y/32), new_tile)
             self.arborist.world.world_surface.blit(new_tile.img, new_tile.location)
             self.arborist.world.world_surface.blit(darkness, new_tile.location)
 
-        # Goes to a random destination no matter what
+        # Goes to the next plantable tile no matter what
         self.arborist.hit = 0
-        BaseFunctions.random_dest(self.arborist)
+        BaseFunctions.resource_dest(self.arborist, "plantable")
 
     def entry_actions(self):
         """
         Defines actions to be taken when entering the Planting state.
         """
-        BaseFunctions.random_dest(self.arborist)
+        BaseFunctions.resource_dest(self.arborist, "plantable")
+
+    def exit_actions(self):
+        """
+        Gives up the claim on the tile the Arborist was heading for.
+        """
+        self.arborist.world.reservations.release_all(self.arborist)
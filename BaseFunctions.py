@@ -10,7 +10,9 @@ import random
 import math
 
 from configuration.world_configuration import FPS, DAY_DURATION
+from configuration.villager_configuration import RESOURCE_CHOICES
 from gametools.vector2 import Vector2
+from navigation.profiles import PROFILES
 import TileFuncs
 
 DEBUG = False
@@ -45,7 +47,8 @@ def random_dest(entity, recurse=False, r_num=0, r_max=6):
 
     # Calculate maximum allowable distance from the nearest food court
     max_distance = entity.speed * FPS * 0.75 * 0.5 * DAY_DURATION
-    nearest_food_court = entity.world.get_food_court(entity)
+    # Only the straight line distance to it is checked, so the food court does not have to be the nearest by path
+    nearest_food_court = entity.world.get_food_court(entity, by_path=False)
     if nearest_food_court is not None:
         home_distance = possible_dest.get_distance_to(nearest_food_court)
         if home_distance > max_distance:
@@ -62,7 +65,11 @@ def random_dest(entity, recurse=False, r_num=0, r_max=6):
         if DEBUG:
             "BAD SPOT IS TRUE"
 
-    walk = TileFuncs.get_tile(entity.world, possible_dest).walkable == entity.land_based
+    # Land profiles need a walkable destination, water profiles an unwalkable one
+    walk = TileFuncs.get_tile(entity.world, possible_dest).walkable == PROFILES[entity.nav_profile].land
+    # A destination cut off from the entity (an island, the far side of a lake) is as bad as an unwalkable one
+    if walk:
+        walk = entity.world.is_reachable(entity.location, possible_dest, entity.nav_profile)
     depth_max = r_num >= r_max
 
     if (not walk and not depth_max) or bad_spot:
@@ -84,6 +91,58 @@ def random_dest(entity, recurse=False, r_num=0, r_max=6):
             print("BAD SPOT, WTF")
 
 
+def resource_dest(entity, capability):
+    """
+    Sends an entity to one of the closest tiles it can reach that have a capability of the world's resource index
+    and that no other entity has claimed, or to a random destination if there is none.
+    The entity gives up its previous claims and claims the tile it heads for.
+
+    Args:
+        entity (GameEntity): The entity looking for a resource.
+        capability (str): What the tile has to offer, e.g. "tree", "stone", "tillable", "plantable" or "shore".
+
+    Returns:
+        bool: True if the entity heads for such a tile, False if it wanders to a random destination instead.
+    """
+    world = entity.world
+    tile_size = world.tile_size
+    start = (int(entity.location.x // tile_size), int(entity.location.y // tile_size))
+    nav = world.nav_layers[entity.nav_profile]
+    reservations = world.reservations
+    reservations.release_all(entity)
+    tiles = world.resources.nearest(capability, start[0], start[1], RESOURCE_CHOICES,
+                                    lambda tile: reservations.is_free(tile) and nav.reachable(start, tile))
+    if len(tiles) == 0:
+        random_dest(entity)
+        return False
+    tile_x, tile_y = random.choice(tiles)
+    reservations.claim(entity, (tile_x, tile_y))
+    entity.destination = Vector2(tile_x * tile_size + tile_size / 2, tile_y * tile_size + tile_size / 2)
+    return True
+
+
+def claim_target(entity, location):
+    """
+    Claims the tile an entity heads for or works on, giving up the tiles it claimed before, so it never holds on to
+    an old target. Claiming the tile it holds already renews the claim. Nothing is given up if another entity holds
+    the tile.
+
+    Args:
+        entity (GameEntity): The entity picking a new target.
+        location (Vector2): A location on the tile in world coordinates.
+
+    Returns:
+        bool: True if the entity holds the tile now, False if another entity does.
+    """
+    tile_size = entity.world.tile_size
+    tile = (int(location.x // tile_size), int(location.y // tile_size))
+    reservations = entity.world.reservations
+    if not reservations.is_free(tile, entity):
+        return False
+    reservations.release_all(entity)
+    return reservations.claim(entity, tile)
+
+
 def get_idle_destination(entity):
     """
     Finds the nearest idle location (resting place) for an entity within the game world.
@@ -94,16 +153,5 @@ def get_idle_destination(entity):
     Returns:
         Vector2: The location of the nearest rest place, or None if no rest places are available.
     """
-    world = entity.world
-    # Return None if no resting places are available
-    if len(world.rest_places) < 1:
-        return None
-
-    # Create a list of rest places sorted by distance from the entity
-    rest_candidates = []
-    for rest in world.rest_places:
-        rest_candidates.append((rest, rest.get_distance_to(p=entity.location)))
-    rest_candidates = sorted(rest_candidates, key=lambda r: r[1])
-    # Return the closest rest place if available
-    if len(rest_candidates) > 0:
-        return rest_candidates[0][0]
+    # The nearest rest place by path cost, None if no resting places are available
+    return entity.world.get_rest_place(entity)
@@ -137,8 +137,7 @@ class Builder_Building(State):
                     new_bldg_tile_y = self.Builder.working_building.location.y + y
                     new_bldg_tile = Tile.BuildingTile(self.Builder.world, "Cobble")
                     new_bldg_tile.location = vector2.Vector2(new_bldg_tile_x, new_bldg_tile_y) * 32
-                    new_bldg_tile.rect.topleft = new_bldg_tile.location
-                    self.Builder.world.tile_array[int(new_bldg_tile_y)][int(new_bldg_tile_x)] = new_bldg_tile
+                    self.Builder.world.set_tile(new_bldg_tile_x, new_bldg_tile_y, new_bldg_tile)
                     self.Builder.world.world_surface.blit(new_bldg_tile.img, new_bldg_tile.location)
 
             # Mark the building as complete
@@ -283,8 +282,7 @@ class Builder_Finding(State):  # Finding a suitable place to build.
                         new_bldg_tile_y = self.Builder.target["location"].y + y
                         new_bldg_tile = Tile.BuildingTile(self.Builder.world, "Cobble")
                         new_bldg_tile.location = vector2.Vector2(new_bldg_tile_x, new_bldg_tile_y) * 32
-                        new_bldg_tile.rect.topleft = new_bldg_tile.location
-                        self.Builder.world.tile_array[int(new_bldg_tile_y)][int(new_bldg_tile_x)] = new_bldg_tile
+                        self.Builder.world.set_tile(new_bldg_tile_x, new_bldg_tile_y, new_bldg_tile)
                         self.Builder.world.world_surface.blit(new_bldg_tile.img, new_bldg_tile.location)
 
             else:
@@ -317,6 +315,7 @@ class Waiting(State):
         if DEBUG:
             print("Builder ID: " + str(self.Builder.id) + " entering waiting state.")
         self.Builder.destination = self.Builder.wait_location
+        self.Builder.world.waiting_builders.add(self.Builder)
         pass
 
     def check_conditions(self):
@@ -349,5 +348,6 @@ class Waiting(State):
             pass
 
     def exit_actions(self):
+        self.Builder.world.waiting_builders.discard(self.Builder)
         self.Builder.is_assistant = False
         self.Builder.assistant_of = None
\ No newline at end of file
@@ -60,8 +60,8 @@ class Building(GameEntity):
         # print("Updating building id:" + str(self.id))
         for tile_x in range(self.image.get_width() // self.world.tile_size):
             for tile_y in range(self.image.get_height() // self.world.tile_size):
-                self.world.tile_array[int(self.location.y) + tile_y][int(self.location.x) + tile_x] = (
-                    Tile.BuildingTile(self, "MinecraftGrass"))
+                self.world.set_tile(int(self.location.x) + tile_x, int(self.location.y) + tile_y,
+                                    Tile.BuildingTile(self, "MinecraftGrass"))
         self.world.world_surface.blit(self.image, self.location * self.world.tile_size)
 
 
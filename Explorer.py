@@ -38,6 +38,7 @@ class Explorer(GameEntity.GameEntity):
 
         self.speed = 80.0 * (1.0 / 60.0)
         self.base_speed = self.speed
+        self.nav_profile = "explorer"
         self.view_range = 8
         self.hunger_limit = 50
 
@@ -78,15 +79,15 @@ class SearchStone(aitools.StateMachine.State):
         self.explorer = this_explorer
         
     def entry_actions(self):
-        """When the explorer starts exploring (enters exploring state)."""
-        BaseFunctions.random_dest(self.explorer)
+        """When the explorer starts searching for stone, it heads for one of the closest stone tiles."""
+        BaseFunctions.resource_dest(self.explorer, "stone")
         
 
     def do_actions(self):
         """Actions performed by the Explorer while in the SearchStone state."""
-        curr_tile = self.explorer.world.tile_array[self.explorer.tile_location_y][self.explorer.tile_location_x] 
+        curr_tile = self.explorer.world.tiles.at(self.explorer.tile_location_x, self.explorer.tile_location_y) 
         if self.explorer.location == self.explorer.destination:
-            BaseFunctions.random_dest(self.explorer)      
+            BaseFunctions.resource_dest(self.explorer, "stone")
         pass
     
     def check_conditions(self):
@@ -96,19 +97,19 @@ class SearchStone(aitools.StateMachine.State):
             str: The name of the next state to transition to, if any.
         """
         
-        curr_tile = self.explorer.world.tile_array[self.explorer.tile_location_y][self.explorer.tile_location_x] 
+        curr_tile = self.explorer.world.tiles.at(self.explorer.tile_location_x, self.explorer.tile_location_y) 
 
         # Transition to CollectStone if a stone tile is found
         if isinstance(curr_tile, Tile.SmoothStoneTile) \
         or isinstance(curr_tile, Tile.CobblestoneTile): 
             return "CollectStone" 
         
-        curr_tile = self.explorer.world.tile_array[self.explorer.tile_location_y][self.explorer.tile_location_x]
+        curr_tile = self.explorer.world.tiles.at(self.explorer.tile_location_x, self.explorer.tile_location_y)
 
         # Continue moving to a new destination
         if self.explorer.location.get_distance_to(self.explorer.destination) < (0.5 * self.explorer.world.tile_size):
             # if self.explorer.location == self.explorer.destination:
-            BaseFunctions.random_dest(self.explorer)
+            BaseFunctions.resource_dest(self.explorer, "stone")
 
         # Check for transitions to Feeding or Idle states
         if self.explorer.food < self.explorer.hunger_limit:
@@ -117,9 +118,9 @@ class SearchStone(aitools.StateMachine.State):
             return "Idle"
             
     def exit_actions(self):
-        """What the explorer does as it stops exploring"""
+        """What the explorer does as it stops exploring, it gives up the claim on the stone it was heading for"""
         self.explorer.destination = self.explorer.location
-        pass
+        self.explorer.world.reservations.release_all(self.explorer)
        
 class CollectStone(aitools.StateMachine.State):
     """State where the Explorer collects stone resources from a stone tile."""
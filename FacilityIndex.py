@@ -0,0 +1,185 @@
+"""
+CS5150 Game AI Final Project
+Team Member: Jianyan Chen, Ruidi Huang, Xin Qi
+Aug 2024
+
+This program defines the FacilityIndex class, which keeps the drop-off and rest locations of the buildings by kind,
+lumber yards, barns, stoneworks, fish markets and rest places, and answers which one is the nearest to a villager.
+The world adds the locations of every new building, and the answers are cached per bucket of tiles, so villagers
+asking from the same part of the map share them, however many buildings the village has.
+"""
+
+# The kinds of facilities, each building adds its location to the kinds it serves
+KINDS = ("lumber_yard", "barn", "stonework", "fish_market", "rest_place")
+
+
+class FacilityIndex(object):
+    """
+    The facility locations of every kind, with the nearest ones cached per square bucket of tiles.
+
+    For nearest, a bucket caches the shortlist of the facilities that can be the nearest one in a straight line to
+    some point of the bucket: those not farther from the bucket than the farthest point of the bucket is from the
+    facility closest to it. A query then only compares the distances to the shortlist, usually one or two facilities.
+    For nearest_by_path, a bucket caches the facility a multi-goal search picked by path cost, per movement profile
+    and region, together with the PathCache region versions along the path to it. Like a cached path, the answer
+    holds until a tile changes in one of those regions, changes elsewhere on the map leave it alone.
+
+    Attributes:
+        world (World): The game world the facilities are in.
+        bucket_size (int): The side length of a bucket in tiles.
+        locations (dict): Maps a kind to the list of its locations (Vector2) in world coordinates, in the order
+                          the buildings were added.
+        shortlists (dict): Maps a kind to a dict mapping a (bucket_x, bucket_y) key to its shortlist.
+        path_cache (dict): Maps a kind to a dict mapping a (profile, region, bucket_x, bucket_y) key to the
+                           (regions, versions, location) picked by path cost. Without a path to any facility,
+                           regions is None and versions is the NavGrid version.
+    """
+    def __init__(self, world, bucket_size=8):
+        """
+        Initializes an index without facilities.
+
+        Args:
+            world (World): The game world.
+            bucket_size (int): The side length of a bucket in tiles. Defaults to 8.
+        """
+        self.world = world
+        self.bucket_size = bucket_size
+        self.locations = {kind: [] for kind in KINDS}
+        self.shortlists = {kind: {} for kind in KINDS}
+        self.path_cache = {kind: {} for kind in KINDS}
+
+    def add(self, kind, location):
+        """
+        Adds the location of a facility, and forgets the cached answers for its kind.
+
+        Args:
+            kind (str): One of KINDS.
+            location (Vector2): The location in world coordinates.
+        """
+        self.locations[kind].append(location)
+        self.shortlists[kind].clear()
+        self.path_cache[kind].clear()
+
+    def bucket(self, location):
+        """
+        Returns the key of the bucket holding a location.
+
+        Args:
+            location (Vector2): The location in world coordinates.
+
+        Returns:
+            tuple: The (bucket_x, bucket_y) of the location.
+        """
+        span = self.bucket_size * self.world.tile_size
+        return int(location.x // span), int(location.y // span)
+
+    def nearest(self, kind, location):
+        """
+        Finds the facility of a kind closest to a location in a straight line.
+
+        Args:
+            kind (str): One of KINDS.
+            location (Vector2): The location in world coordinates.
+
+        Returns:
+            Vector2: The location of the nearest facility, or None if there is none of that kind.
+        """
+        locations = self.locations[kind]
+        if len(locations) < 2:
+            return locations[0] if locations else None
+        key = self.bucket(location)
+        shortlist = self.shortlists[kind].get(key)
+        if shortlist is None:
+            shortlist = self.shortlists[kind][key] = self._shortlist(locations, key)
+        x = location.x
+        y = location.y
+        return min(shortlist, key=lambda facility: (facility.x - x) ** 2 + (facility.y - y) ** 2)
+
+    def _shortlist(self, locations, key):
+        """
+        Picks the facilities that are the nearest one to at least one point of a bucket.
+
+        Args:
+            locations (list of Vector2): The facilities of a kind.
+            key (tuple): The (bucket_x, bucket_y) of the bucket.
+
+        Returns:
+            list of Vector2: The candidates, in the order of locations.
+        """
+        span = self.bucket_size * self.world.tile_size
+        left = key[0] * span
+        top = key[1] * span
+        right = left + span
+        bottom = top + span
+        bounds = []
+        for facility in locations:
+            # Distance from the facility to the closest and to the farthest point of the bucket
+            near_x = max(left - facility.x, 0, facility.x - right)
+            near_y = max(top - facility.y, 0, facility.y - bottom)
+            far_x = max(facility.x - left, right - facility.x)
+            far_y = max(facility.y - top, bottom - facility.y)
+            bounds.append((near_x * near_x + near_y * near_y, far_x * far_x + far_y * far_y))
+        limit = min(far for _, far in bounds)
+        return [facility for facility, (near, _) in zip(locations, bounds) if near <= limit]
+
+    def nearest_by_path(self, kind, entity):
+        """
+        Finds the facility of a kind the entity reaches at the lowest path cost, in a single search towards all of
+        them. Its path is cached for the entity's path request. If none of them can be reached, e.g. the entity is
+        cut off by water, the nearest one in a straight line is returned.
+        The answer is shared by the entities of the same movement profile in the same bucket and region, until a
+        facility of the kind is added or a tile changes along the path to it.
+
+        Args:
+            kind (str): One of KINDS.
+            entity (GameEntity): The entity looking for a facility.
+
+        Returns:
+            Vector2: The location of the nearest facility, or None if there is none of that kind.
+        """
+        locations = self.locations[kind]
+        if len(locations) < 2:
+            return locations[0] if locations else None
+        nav = self.world.nav_layers[entity.nav_profile]
+        tile_x, tile_y = nav.clamp(int(entity.location.x // self.world.tile_size),
+                                   int(entity.location.y // self.world.tile_size))
+        key = (entity.nav_profile, nav.regions.region(tile_y * nav.width + tile_x),
+               tile_x // self.bucket_size, tile_y // self.bucket_size)
+        cached = self.path_cache[kind].get(key)
+        if cached is not None and self._fresh(nav, cached):
+            return cached[2]
+        tile_size = self.world.tile_size
+        nearest = nav.find_nearest((tile_x, tile_y), [(int(location.x // tile_size), int(location.y // tile_size))
+                                                      for location in locations])
+        if nearest is None:
+            location = self.nearest(kind, entity.location)
+            self.path_cache[kind][key] = (None, nav.version, location)
+            return location
+        position, path = nearest
+        cache = nav.cache
+        regions = sorted(set(cache.region_of(y * nav.width + x) for x, y in path)
+                         | {cache.region_of(tile_y * nav.width + tile_x)})
+        self.path_cache[kind][key] = (regions, tuple(cache.versions[region] for region in regions),
+                                      locations[position])
+        return locations[position]
+
+    @staticmethod
+    def _fresh(nav, cached):
+        """
+        Checks if an answer of nearest_by_path still holds.
+
+        Args:
+            nav (NavGrid): The navigation layer the answer was searched on.
+            cached (tuple): The (regions, versions, location) of the answer.
+
+        Returns:
+            bool: True if no tile changed along the path to the facility, or at all if no facility was reachable.
+        """
+        regions, versions, _ = cached
+        if regions is None:
+            return versions == nav.version
+        current = nav.cache.versions
+        for region, version in zip(regions, versions):
+            if current[region] != version:
+                return False
+        return True
@@ -24,6 +24,7 @@ from configuration.world_configuration import TILES_PER_FARMER
 from gametools.vector2 import Vector2
 from gametools.ImageFuncs import *
 from gametools.ani import *
+from gametools import tile_images
 import math
 import pygame
 import random
@@ -31,6 +32,48 @@ import TileFuncs
 import BaseFunctions
 
 
+def field_task(tile):
+    """Makes the entry the farm queues keep for a field tile: its flat index and the name it had when queued. A view
+    of the tile would follow whatever kind of tile later replaces it in the cell.
+
+    Args:
+        tile (Tile): A field tile stored in the tile grid.
+
+    Returns:
+        tuple: The flat index of the tile and its name.
+    """
+    return tile.index, tile.name
+
+
+def task_location(world, task):
+    """Returns the world location of the field tile of a farm queue entry.
+
+    Args:
+        world (World): The game world.
+        task (tuple): A flat index and a tile name, as made by field_task.
+
+    Returns:
+        Vector2: The top left corner of the tile.
+    """
+    tile_y, tile_x = divmod(task[0], world.tiles.width)
+    return Vector2(tile_x * world.tile_size, tile_y * world.tile_size)
+
+
+def task_tile(world, task):
+    """Reads the tile of a farm queue entry again, if the cell still holds the tile the entry was queued for.
+
+    Args:
+        world (World): The game world.
+        task (tuple): A flat index and a tile name, as made by field_task.
+
+    Returns:
+        Tile: The tile in the cell, or None if it has been replaced by a tile of another name.
+    """
+    tile_y, tile_x = divmod(task[0], world.tiles.width)
+    tile = world.tiles.at(tile_x, tile_y)
+    return tile if tile.name == task[1] else None
+
+
 class Farmer(GameEntity):
     """The Farmer class represents a villager responsible for managing farming tasks such as tilling,
     sowing, watering, harvesting, and delivering crops. It transitions between various states to 
@@ -149,6 +192,11 @@ class FarmerTilling(aitools.StateMachine.State):
                 self.farmer.update()
                 return self.farmer.primary_state
 
+            # Keep the grass while tilling it, or leave it to the villager that claimed it first
+            if not BaseFunctions.claim_target(self.farmer, self.farmer.location):
+                self.farmer.hit = 0
+                return self.farmer.primary_state
+
             self.farmer.update()
 
             if self.farmer.hit >= self.farmer.tilling_hits:
@@ -156,23 +204,21 @@ class FarmerTilling(aitools.StateMachine.State):
                 # darkness = pygame.Surface((self.farmer.TileSize, self.farmer.TileSize))
                 # darkness.set_alpha(check.darkness)
 
-                shade = pygame.Surface((self.farmer.TileSize, self.farmer.TileSize))
-                shade.set_alpha(check.darkness)
+                shade = tile_images.get_shade(check.darkness, (self.farmer.TileSize, self.farmer.TileSize))
 
                 new_tile = Tile.SoilTile(self.farmer.world, "Soil2")
                 # new_tile.darkness = darkness
                 new_tile.darkness = check.darkness
 
                 new_tile.location = check.location
-                new_tile.rect.topleft = new_tile.location
                 # new_tile.color = check.color # TODO: Figure out what this does.
 
-                self.farmer.world.tile_array[int(new_tile.location.y / 32)][int(new_tile.location.x / 32)] = new_tile
+                self.farmer.world.set_tile(int(new_tile.location.x / 32), int(new_tile.location.y / 32), new_tile)
                 self.farmer.world.world_surface.blit(new_tile.img, new_tile.location)
                 # self.farmer.world.world_surface.blit(darkness, new_tile.location)
                 self.farmer.world.world_surface.blit(shade, new_tile.location)
                 self.farmer.world.fields.append(new_tile)
-                self.farmer.world.sow_queue.put(new_tile)
+                self.farmer.world.sow_queue.put(field_task(new_tile))
 
                 # TODO: Update the minimap
 
@@ -183,10 +229,10 @@ class FarmerTilling(aitools.StateMachine.State):
                 #       str(self.farmer.location.y / self.farmer.world.tile_size) + ").")
 
                 # Find a nearby tillable tile
-                nearby_array = TileFuncs.get_vnn_array(self.farmer.world, self.farmer.location, self.farmer.view_range)
+                nearby_array = TileFuncs.find_tiles(self.farmer.world, self.farmer.location, self.farmer.view_range,
+                                                    name="MinecraftGrass")
                 for location in nearby_array:
-                    test_tile = TileFuncs.get_tile(self.farmer.world, location)
-                    if test_tile.name == "MinecraftGrass":
+                    if BaseFunctions.claim_target(self.farmer, location):
                         self.farmer.destination = location
                         # print("Farmer id " + str(self.farmer.id) + " has found a new tile to till, next tile is (" +
                         #       str(location.x / self.farmer.world.tile_size) + ", " +
@@ -196,7 +242,7 @@ class FarmerTilling(aitools.StateMachine.State):
                 return self.farmer.primary_state
 
         elif self.farmer.location.get_distance_to(self.farmer.destination) < self.farmer.speed:
-            BaseFunctions.random_dest(self.farmer)
+            BaseFunctions.resource_dest(self.farmer, "tillable")
 
         # If the entity is hungry, go back to the village and feed themselves
         if self.farmer.food < self.farmer.hunger_limit:
@@ -206,7 +252,8 @@ class FarmerTilling(aitools.StateMachine.State):
             return "Idle"
 
     def exit_actions(self):
-        pass
+        """Gives up the claim on the grass the Farmer was heading for or tilling."""
+        self.farmer.world.reservations.release_all(self.farmer)
 
 
 class FarmerSearching(aitools.StateMachine.State):
@@ -231,7 +278,7 @@ class FarmerSearching(aitools.StateMachine.State):
 
     def entry_actions(self):
         """Actions taken when the Farmer enters the Searching state."""
-        BaseFunctions.random_dest(self.farmer)
+        BaseFunctions.resource_dest(self.farmer, "tillable")
 
     def do_actions(self):
         pass
@@ -246,63 +293,64 @@ class FarmerSearching(aitools.StateMachine.State):
         if (len(self.farmer.harvest_list) > 0 or
                 (self.farmer.world.harvest_queue is not None and not self.farmer.world.harvest_queue.empty())):
             if len(self.farmer.harvest_list) > 0:
-                self.farmer.destination = self.farmer.harvest_list[0].location
+                self.farmer.destination = task_location(self.farmer.world, self.farmer.harvest_list[0])
                 print("Farmer id " + str(self.farmer.id) + " harvest list: " + str(len(self.farmer.harvest_list))
                       + ", first of the harvest list is "
-                      + str(self.farmer.harvest_list[0].location.x // 32) + ", "
-                      + str(self.farmer.harvest_list[0].location.y // 32) + ")")
+                      + str(self.farmer.destination.x // self.farmer.world.tile_size) + ", "
+                      + str(self.farmer.destination.y // self.farmer.world.tile_size) + ")")
             else:
-                harvest_tile = self.farmer.world.harvest_queue.get()
-                self.farmer.harvest_list.append(harvest_tile)
-                self.farmer.destination = harvest_tile.location
+                harvest_task = self.farmer.world.harvest_queue.get()
+                self.farmer.harvest_list.append(harvest_task)
+                self.farmer.destination = task_location(self.farmer.world, harvest_task)
             return "Harvesting"
 
         # Check if farmers can till more tiles and if the current tile can till, or find the next place to till
         elif (len(self.farmer.sow_list) == 0 and len(self.farmer.water_list) == 0
               and self.farmer.world.farmer_count * TILES_PER_FARMER > len(self.farmer.world.fields)):
             if self.farmer.location.get_distance_to(self.farmer.destination) < 15:
-                location_array = TileFuncs.get_vnn_array(self.farmer.world, self.farmer.location,
-                                                         self.farmer.view_range)
+                location_array = TileFuncs.find_tiles(self.farmer.world, self.farmer.location,
+                                                      self.farmer.view_range, name="MinecraftGrass")
 
                 for location in location_array:
-                    test_tile = TileFuncs.get_tile(self.farmer.world, location)
-                    if test_tile.name == "MinecraftGrass":
+                    # Grass other villagers have claimed is left to them
+                    if BaseFunctions.claim_target(self.farmer, location):
+                        test_tile = TileFuncs.get_tile(self.farmer.world, location)
                         self.farmer.Tree_tile = test_tile
                         self.farmer.tree_id = test_tile.id
 
                         self.farmer.destination = location.copy()
                         return "Tilling"
 
-                # If the current tile cannot till, go to the next
-                BaseFunctions.random_dest(self.farmer)
+                # If the current tile cannot till, go to the closest ones that can
+                BaseFunctions.resource_dest(self.farmer, "tillable")
 
         # If farmers have tilled enough tiles, then find one task to do
         # Add Sowing, Watering, and Harvesting checks here. These ops have to search in order.
         elif (len(self.farmer.sow_list) > 0 or
               (self.farmer.world.sow_queue is not None and not self.farmer.world.sow_queue.empty())):
             if len(self.farmer.sow_list) > 0:
+                self.farmer.destination = task_location(self.farmer.world, self.farmer.sow_list[0])
                 print("Farmer id " + str(self.farmer.id) + " sow list: " + str(len(self.farmer.sow_list))
                       + ", first of the sow list is ("
-                      + str(self.farmer.sow_list[0].location.x // 32) + ", "
-                      + str(self.farmer.sow_list[0].location.y // 32) + ")")
-                self.farmer.destination = self.farmer.sow_list[0].location
+                      + str(self.farmer.destination.x // self.farmer.world.tile_size) + ", "
+                      + str(self.farmer.destination.y // self.farmer.world.tile_size) + ")")
             else:
-                sow_tile = self.farmer.world.sow_queue.get()
-                self.farmer.sow_list.append(sow_tile)
-                self.farmer.destination = sow_tile.location
+                sow_task = self.farmer.world.sow_queue.get()
+                self.farmer.sow_list.append(sow_task)
+                self.farmer.destination = task_location(self.farmer.world, sow_task)
             return "Sowing"
         elif (len(self.farmer.water_list) > 0 or
               self.farmer.world.water_queue is not None and not self.farmer.world.water_queue.empty()):
             if len(self.farmer.water_list) > 0:
-                self.farmer.destination = self.farmer.water_list[0].location
+                self.farmer.destination = task_location(self.farmer.world, self.farmer.water_list[0])
                 print("Farmer id " + str(self.farmer.id) + " water list: " + str(len(self.farmer.water_list))
                       + ", first of the water list is "
-                      + str(self.farmer.water_list[0].location.x // 32) + ", "
-                      + str(self.farmer.water_list[0].location.y // 32) + ")")
+                      + str(self.farmer.destination.x // self.farmer.world.tile_size) + ", "
+                      + str(self.farmer.destination.y // self.farmer.world.tile_size) + ")")
             else:
-                water_tile = self.farmer.world.water_queue.get()
-                self.farmer.water_list.append(water_tile)
-                self.farmer.destination = water_tile.location
+                water_task = self.farmer.world.water_queue.get()
+                self.farmer.water_list.append(water_task)
+                self.farmer.destination = task_location(self.farmer.world, water_task)
             return "Watering"
 
         elif self.farmer.world.farmer_count * TILES_PER_FARMER <= len(self.farmer.world.fields):
@@ -342,6 +390,15 @@ class FarmerSowing(aitools.StateMachine.State):
             str: The name of the next state to transition to, if any.
         """
         check = TileFuncs.get_tile(self.farmer.world, Vector2(self.farmer.location))
+        if not self.farmer.sow_list:
+            return self.farmer.primary_state
+        # The queued field may have been turned into another tile since
+        task = self.farmer.sow_list[0]
+        if task_tile(self.farmer.world, task) is None:
+            print("Farmer id " + str(self.farmer.id) + " dropped a field that has changed.")
+            self.farmer.sow_list.remove(task)
+            self.farmer.hit = 0
+            return self.farmer.primary_state
         if (self.farmer.location.get_distance_to(self.farmer.destination) < (0.10 * self.farmer.world.tile_size)
                 and check.crop_plantable):
             # This will snap the farmer to the target tile.
@@ -363,23 +420,21 @@ class FarmerSowing(aitools.StateMachine.State):
                 # darkness = pygame.Surface((self.farmer.TileSize, self.farmer.TileSize))
                 # darkness.set_alpha(check.darkness)
 
-                shade = pygame.Surface((self.farmer.TileSize, self.farmer.TileSize))
-                shade.set_alpha(check.darkness)
+                shade = tile_images.get_shade(check.darkness, (self.farmer.TileSize, self.farmer.TileSize))
 
                 new_tile = Tile.ShootFieldTile(self.farmer.world, "ShootField")
                 # new_tile.darkness = darkness
                 new_tile.darkness = check.darkness
 
                 new_tile.location = check.location
-                new_tile.rect.topleft = new_tile.location
                 # new_tile.color = check.color # TODO: Figure out what this does.
 
-                self.farmer.world.tile_array[int(new_tile.location.y / 32)][int(new_tile.location.x / 32)] = new_tile
+                self.farmer.world.set_tile(int(new_tile.location.x / 32), int(new_tile.location.y / 32), new_tile)
                 self.farmer.world.world_surface.blit(new_tile.img, new_tile.location)
                 self.farmer.world.world_surface.blit(shade, new_tile.location)
                 # self.farmer.world.fields.append(new_tile)
-                self.farmer.world.water_queue.put(new_tile)
-                self.farmer.sow_list.remove(check)
+                self.farmer.world.water_queue.put(field_task(new_tile))
+                self.farmer.sow_list.remove(task)
 
                 # TODO: Update the minimap
                 self.farmer.hit = 0
@@ -424,6 +479,15 @@ class FarmerWatering(aitools.StateMachine.State):
             str: The name of the next state to transition to, if any.
         """
         check = TileFuncs.get_tile(self.farmer.world, Vector2(self.farmer.location))
+        if not self.farmer.water_list:
+            return self.farmer.primary_state
+        # The queued field may have been turned into another tile since
+        task = self.farmer.water_list[0]
+        if task_tile(self.farmer.world, task) is None:
+            print("Farmer id " + str(self.farmer.id) + " dropped a field that has changed.")
+            self.farmer.water_list.remove(task)
+            self.farmer.hit = 0
+            return self.farmer.primary_state
         if (self.farmer.location.get_distance_to(self.farmer.destination) < (0.10 * self.farmer.world.tile_size)
                 and check.crop_waterable):
             # This will snap the farmer to the target tile.
@@ -444,28 +508,25 @@ class FarmerWatering(aitools.StateMachine.State):
                 self.farmer.update()
                 # Check if the tile is watered enough to mature
                 if check.watered_times >= check.watered_req:
-                    shade = pygame.Surface((self.farmer.TileSize, self.farmer.TileSize))
-                    shade.set_alpha(check.darkness)
+                    shade = tile_images.get_shade(check.darkness, (self.farmer.TileSize, self.farmer.TileSize))
 
                     new_tile = Tile.MatureFieldTile(self.farmer.world, "MatureField")
                     # new_tile.darkness = darkness
                     new_tile.darkness = check.darkness
 
                     new_tile.location = check.location
-                    new_tile.rect.topleft = new_tile.location
                     # new_tile.color = check.color # TODO: Figure out what this does.
 
-                    self.farmer.world.tile_array[int(new_tile.location.y / 32)][
-                        int(new_tile.location.x / 32)] = new_tile
+                    self.farmer.world.set_tile(int(new_tile.location.x / 32), int(new_tile.location.y / 32), new_tile)
                     self.farmer.world.world_surface.blit(new_tile.img, new_tile.location)
                     self.farmer.world.world_surface.blit(shade, new_tile.location)
                     # self.farmer.world.fields.append(new_tile)
-                    self.farmer.world.harvest_queue.put(new_tile)
-                    self.farmer.water_list.remove(check)
+                    self.farmer.world.harvest_queue.put(field_task(new_tile))
+                    self.farmer.water_list.remove(task)
                 else:
                     check.watered_times += 1
-                    self.farmer.world.water_queue.put(check)
-                    self.farmer.water_list.remove(check)
+                    self.farmer.world.water_queue.put(task)
+                    self.farmer.water_list.remove(task)
 
                 # TODO: Update the minimap
                 self.farmer.hit = 0
@@ -508,9 +569,18 @@ class FarmerHarvesting(aitools.StateMachine.State):
         check = TileFuncs.get_tile(self.farmer.world, Vector2(self.farmer.location))
         if TileFuncs.is_entity_collided(self.farmer.world, self.farmer):
             print("Farmer id " + str(self.farmer.id) + " deteced colliding on tile.")
-            for tile in self.farmer.harvest_list:
-                self.farmer.world.harvest_queue.put(tile)
-                self.farmer.harvest_list.remove(tile)
+            for task in self.farmer.harvest_list:
+                self.farmer.world.harvest_queue.put(task)
+            self.farmer.harvest_list.clear()
+            return self.farmer.primary_state
+        if not self.farmer.harvest_list:
+            return self.farmer.primary_state
+        # The queued field may have been turned into another tile since
+        task = self.farmer.harvest_list[0]
+        if task_tile(self.farmer.world, task) is None:
+            print("Farmer id " + str(self.farmer.id) + " dropped a field that has changed.")
+            self.farmer.harvest_list.remove(task)
+            self.farmer.hit = 0
             return self.farmer.primary_state
         if (self.farmer.location.get_distance_to(self.farmer.destination) < (0.10 * self.farmer.world.tile_size)
                 and check.crop_harvestable):
@@ -531,23 +601,21 @@ class FarmerHarvesting(aitools.StateMachine.State):
                 # darkness = pygame.Surface((self.farmer.TileSize, self.farmer.TileSize))
                 # darkness.set_alpha(check.darkness)
 
-                shade = pygame.Surface((self.farmer.TileSize, self.farmer.TileSize))
-                shade.set_alpha(check.darkness)
+                shade = tile_images.get_shade(check.darkness, (self.farmer.TileSize, self.farmer.TileSize))
 
                 new_tile = Tile.SoilTile(self.farmer.world, "Soil2")
                 # new_tile.darkness = darkness
                 new_tile.darkness = check.darkness
 
                 new_tile.location = check.location
-                new_tile.rect.topleft = new_tile.location
                 # new_tile.color = check.color # TODO: Figure out what this does.
 
-                self.farmer.world.tile_array[int(new_tile.location.y / 32)][int(new_tile.location.x / 32)] = new_tile
+                self.farmer.world.set_tile(int(new_tile.location.x / 32), int(new_tile.location.y / 32), new_tile)
                 self.farmer.world.world_surface.blit(new_tile.img, new_tile.location)
                 # self.farmer.world.world_surface.blit(darkness, new_tile.location)
                 self.farmer.world.world_surface.blit(shade, new_tile.location)
-                self.farmer.world.sow_queue.put(new_tile)
-                self.farmer.harvest_list.remove(check)
+                self.farmer.world.sow_queue.put(field_task(new_tile))
+                self.farmer.harvest_list.remove(task)
                 print("Farmer id " + str(self.farmer.id) + " have " + str(len(self.farmer.harvest_list)) +
                       " tiles to harvest.")
                 # TODO: Update the minimap
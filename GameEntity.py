@@ -12,8 +12,9 @@ from gametools.vector2 import *
 import TileFuncs
 import pygame
 from pygame.locals import *
-from PathFinding import a_star_search_nx, create_graph
-from configuration.world_configuration import DEBUG
+from PathFinding import flow_field_path, request_path_grid, collect_path_grid
+from configuration.world_configuration import DEBUG, FLOW_FIELD_LOOKAHEAD
+from array import array
 
 
 class GameEntity(object):
@@ -53,7 +54,8 @@ class GameEntity(object):
 
         self.speed = 0.
 
-        self.land_based = True
+        # Movement profile of the entity, see navigation/profiles.py, it also decides if the entity is land based
+        self.nav_profile = "land"
         self.base_speed = self.speed
         
         # Resource attributes
@@ -70,8 +72,10 @@ class GameEntity(object):
         self.id = 0  # Entity ID
 
         self.tp = 2.0  # Time step or progression
-        self.path = []  # Pathfinding nodes
-        self.next_node = None  # Next node in path
+        self.path = array('l')  # Path waypoints as flat tile indices (tile_y * world width + tile_x)
+        self.path_cursor = 0  # Index of the next waypoint in path
+        self.path_ticket = None  # Path request being searched by the world's path service
+        self.path_goal = None  # Goal tile of that request
 
         # UI elements for displaying entity information
         self.info_bar = pygame.image.load("Images/Entities/info_bar.png").convert()
@@ -97,10 +101,15 @@ class GameEntity(object):
 
     def check_speed(self):
         """
-        Checks and adjusts the entity's speed based on the tile type it is currently on.
+        Checks and adjusts the entity's speed based on the tile type it is currently on,
+        as the navigation layer of its movement profile compiled it.
         """
-        if TileFuncs.get_tile(self.world, self.location).name in ["AndrewSmoothStone", "MinecraftSnow"]:
-            self.speed = 0.5 * self.base_speed
+        nav = self.world.nav_layers[self.nav_profile]
+        tile_size = self.world.tile_size
+        tile_x = int(self.location.x // tile_size)
+        tile_y = int(self.location.y // tile_size)
+        if 0 <= tile_x < nav.width and 0 <= tile_y < nav.height:
+            self.speed = nav.speeds[tile_y * nav.width + tile_x] * self.base_speed
         else:
             self.speed = self.base_speed
         if DEBUG:
@@ -161,33 +170,34 @@ class GameEntity(object):
 
         # if movable
         if self.speed > 0.:
-            # if the entity is not at the destination
-            c_t = TileFuncs.get_tile(self.world, self.location)
-            d_t = TileFuncs.get_tile(self.world, self.destination)
-            dist = (c_t.location - d_t.location).get_length()
-            if c_t != d_t or dist > 1.0:
-                if len(self.path) == 0:
-                    # fill path with nodes
-                    self.path = a_star_search_nx(self.world.graph, self.location, self.destination) 
-                else: 
-                    if self.next_node is None:
-                        self.next_node = self.path.pop(0)
-                    
-                    curr_tile = TileFuncs.get_tile(self.world, self.location)
-                    next_tile = TileFuncs.get_tile(self.world, self.next_node) 
-                    if curr_tile != next_tile:
-                        next_node_offset = self.next_node + Vector2(0.1, 0.1) 
+            # if the entity is not at the destination tile, compared by tile position without looking the tiles up
+            tile_size = self.world.tile_size
+            if (int(self.location.x // tile_size) != int(self.destination.x // tile_size)
+                    or int(self.location.y // tile_size) != int(self.destination.y // tile_size)):
+                if self.path_cursor >= len(self.path):
+                    # fill path with waypoints, shared destinations have a flow field to follow instead of a search
+                    path = None
+                    if self.nav_profile == "land":
+                        path = flow_field_path(self.world.flow_fields, self.location, self.destination,
+                                               FLOW_FIELD_LOOKAHEAD)
+                    self.path = path or self.wait_for_path()
+                    self.path_cursor = 0
+                else:
+                    # waypoints are flat tile indices, so the tiles are compared without looking them up
+                    next_y, next_x = divmod(self.path[self.path_cursor], self.world.nav.width)
+                    if int(self.location.x // tile_size) != next_x or int(self.location.y // tile_size) != next_y:
+                        next_node_offset = Vector2(next_x * tile_size + tile_size / 2 + 0.1,
+                                                   next_y * tile_size + tile_size / 2 + 0.1)
                         vec_to_destination = next_node_offset - self.location
                         distance_to_destination = vec_to_destination.get_length()
                         heading = vec_to_destination.get_normalized()
                         travel_distance = min(distance_to_destination, self.speed)
                         self.location += travel_distance * heading * self.speed
                     else:
-                        if len(self.path) > 0: 
-                            self.next_node = self.path.pop(0) 
-                        
+                        self.path_cursor += 1
             else:
-                self.next_node = None
+                # whatever is left of the path led here
+                self.path_cursor = len(self.path)
                 if self.location != self.destination:
                     vec_to_destination = self.destination - self.location
                     distance_to_destination = vec_to_destination.get_length()
@@ -195,12 +205,51 @@ class GameEntity(object):
                     travel_distance = min(distance_to_destination, self.speed)
                     self.location += travel_distance * heading * self.speed
 
-        self.tile_location_x = int(self.location.x/self.world.tile_size)
-        self.tile_location_y = int(self.location.y/self.world.tile_size)
+        tile_location_x = int(self.location.x/self.world.tile_size)
+        tile_location_y = int(self.location.y/self.world.tile_size)
+        if tile_location_x != self.tile_location_x or tile_location_y != self.tile_location_y:
+            # moved onto another tile, move to its bucket of the spatial hash too
+            self.tile_location_x = tile_location_x
+            self.tile_location_y = tile_location_y
+            self.world.entity_hash.insert(self)
+
+    def wait_for_path(self):
+        """
+        Requests a path to the destination from the world's path service, or collects it once it has been searched.
+        The entity waits where it is while its request is pending. Entities search the layer of their movement
+        profile; if the layer has no path, the entity heads straight for the destination tile.
+
+        Returns:
+            array.array: The path waypoints, empty while the search is still running.
+        """
+        service = self.world.path_service
+        profile = self.nav_profile
+        tile_size = self.world.tile_size
+        goal_tile = (int(self.destination.x // tile_size), int(self.destination.y // tile_size))
+        if self.path_ticket is not None and self.path_goal != goal_tile:
+            # The destination changed while waiting, the pending path leads to the old one
+            service.cancel(self.path_ticket)
+            self.path_ticket = None
+        if self.path_ticket is None:
+            self.path_ticket = request_path_grid(service, self.location, self.destination, profile)
+            self.path_goal = goal_tile
+
+        path = collect_path_grid(service, self.path_ticket, self.location, profile)
+        if path is None:
+            return array('l')
+        self.path_ticket = None
+        if not path:
+            nav = service.layers[profile]
+            goal_x, goal_y = nav.clamp(*goal_tile)
+            path.append(goal_y * nav.width + goal_x)
+        return path
 
     def death(self):
         """
         Removes the entity from the world upon death.
         """
+        if self.path_ticket is not None:
+            self.world.path_service.cancel(self.path_ticket)
+            self.path_ticket = None
         self.world.delete_entity(self)
 
@@ -18,6 +18,7 @@ from gametools.vector2 import Vector2
 from gametools.ImageFuncs import *
 from gametools.ani import *
 import Tile
+from gametools import tile_images
 import math
 import pygame
 import random
@@ -104,9 +105,9 @@ class Searching(State):
 
     def entry_actions(self):
         """
-        Actions performed when the Lumberjack enters the Searching state, such as setting a random destination.
+        Actions performed when the Lumberjack enters the Searching state, such as heading for one of the closest trees.
         """
-        BaseFunctions.random_dest(self.lumberjack)
+        BaseFunctions.resource_dest(self.lumberjack, "tree")
 
     def do_actions(self):
         pass
@@ -117,18 +118,20 @@ class Searching(State):
         If the Lumberjack is hungry, transitions to the Feeding state. If the workday ends, transitions to the Idle state.
         """
         if self.lumberjack.location.get_distance_to(self.lumberjack.destination) < 15:
-            location_array = TileFuncs.get_vnn_array(self.lumberjack.world,(self.lumberjack.location), self.lumberjack.view_range)
+            location_array = TileFuncs.find_tiles(self.lumberjack.world, self.lumberjack.location,
+                                                  self.lumberjack.view_range, name="GrassWithCenterTree")
 
             for location in location_array:
-                test_tile = TileFuncs.get_tile(self.lumberjack.world,location)
-                if test_tile.name == "GrassWithCenterTree":
+                # Trees other villagers have claimed are left to them
+                if BaseFunctions.claim_target(self.lumberjack, location):
+                    test_tile = TileFuncs.get_tile(self.lumberjack.world, location)
                     self.lumberjack.Tree_tile = test_tile
                     self.lumberjack.tree_id = test_tile.id
 
                     self.lumberjack.destination = location.copy()
                     return "Chopping"
 
-            BaseFunctions.random_dest(self.lumberjack)
+            BaseFunctions.resource_dest(self.lumberjack, "tree")
 
         if self.lumberjack.food < self.lumberjack.hunger_limit:
             return "Feeding"
@@ -166,6 +169,11 @@ class Chopping(State):
                 self.lumberjack.update()
                 return "Searching"
 
+            # Keep the tree while chopping it, or leave it to the villager that claimed it first
+            if not BaseFunctions.claim_target(self.lumberjack, self.lumberjack.location):
+                self.lumberjack.hit = 0
+                return "Searching"
+
             self.lumberjack.update()
 
             if self.lumberjack.hit >= 4:
@@ -174,8 +182,7 @@ class Chopping(State):
 
                 old_tile = TileFuncs.get_tile(self.lumberjack.world,Vector2(self.lumberjack.location))
 
-                darkness = pygame.Surface((32, 32))
-                darkness.set_alpha(old_tile.darkness)
+                darkness = tile_images.get_shade(old_tile.darkness, (32, 32))
 
                 # Replacing "GrassWithCenterTree" with TreePlantedTile will prevent Arborist to plant again,
                 # temporarily changed to Grass. This is to be discussed with other team members.
@@ -185,10 +192,9 @@ class Chopping(State):
                 new_tile.darkness = old_tile.darkness
 
                 new_tile.location = TileFuncs.get_tile_pos(self.lumberjack.world,self.lumberjack.destination)*32
-                new_tile.rect.topleft = new_tile.location
                 new_tile.color = old_tile.color
 
-                self.lumberjack.world.tile_array[int(new_tile.location.y/32)][int(new_tile.location.x/32)] = new_tile
+                self.lumberjack.world.set_tile(int(new_tile.location.x/32), int(new_tile.location.y/32), new_tile)
                 self.lumberjack.world.world_surface.blit(new_tile.img, new_tile.location)
                 self.lumberjack.world.world_surface.blit(darkness, new_tile.location)
 
@@ -198,7 +204,10 @@ class Chopping(State):
                 return "Delivering"
 
     def exit_actions(self):
-        pass
+        """
+        Gives up the claim on the tree, which is either chopped down or left behind.
+        """
+        self.lumberjack.world.reservations.release_all(self.lumberjack)
 
 
 class Delivering(State):
@@ -212,10 +221,11 @@ class Delivering(State):
 
     def entry_actions(self):
         """
-        Actions performed when the Lumberjack enters the Delivering state, such as setting the destination to the lumberyard.
+        Actions performed when the Lumberjack enters the Delivering state, such as setting the destination to the
+        nearest lumberyard.
         """
         # self.lumberjack.destination = Vector2(self.lumberjack.world.w/2,self.lumberjack.world.h/2)
-        self.lumberjack.destination = self.lumberjack.world.lumber_yard[0]
+        self.lumberjack.destination = self.lumberjack.world.get_lumber_yard(self.lumberjack)
 
     def do_actions(self):
         pass
@@ -6,79 +6,54 @@ Aug 2024
 This program contains functions for A star path finding for villagers.
 """
 
-import heapq
-import TileFuncs
-import Tile
+from array import array
 from gametools import vector2
-import networkx as nx
+from configuration.world_configuration import PATH_BACKEND
+from navigation.path_backend import get_backend
+from navigation.profiles import PROFILES
+from navigation.path_service import PENDING
+from navigation.smoothing import string_pull
 
 
-def create_graph(world):
+def create_nav_grid(world, profile="land"):
     """
-    Creates a graph representation of the game world using the NetworkX library.
-    Each tile in the world is treated as a node, and edges are created between neighboring tiles.
+    Creates the navigation grid of the game world with the pathfinding engine selected by PATH_BACKEND.
+    The default "grid" engine keeps one int cost per tile instead of a node and up to eight edge objects per tile.
 
     Args:
         world: The game world containing tiles with various properties like cost.
+        profile (str): The movement profile of the grid. Defaults to "land".
 
     Returns:
-        networkx.Graph: A graph where nodes represent tiles in the world and edges represent possible movements 
-                        between tiles with weights based on movement cost.
+        PathBackend: The navigation grid of the world.
     """
-    G = nx.Graph()
-    # print("create graph")
-    for x in range(world.w // 32):
-        for y in range(world.h // 32):
-            node = (x, y)  # Create a node for each tile based on its grid coordinates
-            node_vec = vector2.Vector2(x, y) * 32  # Convert grid coordinates to world coordinates
-            tile = TileFuncs.get_tile(world, node_vec)  # Retrieve the tile at the given coordinates
-            if tile:
-                G.add_node(node)
-                # Check all 8 neighboring tiles (including diagonals)
-                for dx, dy in [(-1, 0), (1, 0), (0, -1), (0, 1)]:  # 4-directions in W, S, N, and E
-                    neighbor = (x + dx, y + dy)
-                    neighbor_vec = vector2.Vector2(x + dx, y + dy) * 32
-                    neighbor_tile = TileFuncs.get_tile(world, neighbor_vec)
-                    if neighbor_tile:
-                        # Add an edge between the current node and the neighboring node with a weight based on the
-                        # neighbor's cost
-                        G.add_edge(node, neighbor, weight=0.5 * neighbor_tile.cost + 0.5 * tile.cost)
-                for dx, dy in [(-1, -1), (-1, 1), (1, -1), (1, 1)]:  # 4-directions in NW, SW, NE, and SE
-                    neighbor = (x + dx, y + dy)
-                    neighbor_vec = vector2.Vector2(x + dx, y + dy) * 32
-                    neighbor_tile = TileFuncs.get_tile(world, neighbor_vec)
-                    if neighbor_tile:
-                        # Add an edge between the current node and the neighboring node with a weight based on the
-                        # neighbor's cost
-                        G.add_edge(node, neighbor, weight=0.707 * neighbor_tile.cost + 0.707 * tile.cost)
-    return G
-
-
-def heuristic(a, b):
+    return get_backend(PATH_BACKEND).build(world, profile)
+
+
+def create_nav_layers(world):
     """
-    Heuristic function used in the A* algorithm to estimate the cost of the cheapest path from node 'a' to node 'b'.
-    This implementation uses the Manhattan distance, suitable for grid-based movement.
+    Creates one navigation grid per movement profile, so land entities never plan through the sea,
+    boats get their own water network and every role plans with the terrain costs it moves by.
 
     Args:
-        a (tuple): The coordinates of the first node (x1, y1).
-        b (tuple): The coordinates of the second node (x2, y2).
+        world: The game world containing the tiles.
 
     Returns:
-        int: The Manhattan distance between nodes 'a' and 'b'.
+        dict: Maps the name of every profile to its PathBackend.
     """
-    (x1, y1) = a
-    (x2, y2) = b
-    return abs(x1 - x2) + abs(y1 - y2)
+    return {profile: create_nav_grid(world, profile) for profile in PROFILES}
 
 
-def a_star_search_nx(graph, start, goal):
+def a_star_search_grid(nav, start, goal, search="astar"):
     """
-    Performs A* search on the given graph to find the shortest path from 'start' to 'goal'.
+    Performs A* search on the navigation grid to find the shortest path from 'start' to 'goal'.
+    Drop-in replacement of a_star_search_nx, it uses the same edge weights and an octile heuristic.
 
     Args:
-        graph (networkx.Graph): The graph representing the world, with nodes as tiles and edges as movements.
+        nav (NavGrid): The navigation grid of the world.
         start (vector2.Vector2): The starting position in world coordinates.
         goal (vector2.Vector2): The goal position in world coordinates.
+        search (str): The grid search to use, "astar" or "jps". Defaults to "astar".
 
     Returns:
         list of vector2.Vector2: The path from start to goal as a list of world coordinates.
@@ -86,8 +61,79 @@ def a_star_search_nx(graph, start, goal):
     # Convert start and goal positions from world coordinates to grid coordinates
     start_node = (int(start.x // 32), int(start.y // 32))
     goal_node = (int(goal.x // 32), int(goal.y // 32))
-    path = nx.astar_path(graph, start_node, goal_node, heuristic=heuristic, weight='weight')
-    # Remove the first node (start node) to return the path after the start point
-    path.pop(0)
-    # Convert the path from grid coordinates back to world coordinates
-    return [vector2.Vector2(p[0], p[1]) * 32 + vector2.Vector2(16, 16) for p in path]
+    path = nav.find_path(start_node, goal_node, search)
+    if path is None:
+        return []
+    # Convert the path from grid coordinates back to the world coordinates of the tile centers
+    return [vector2.Vector2(p[0] * 32 + 16, p[1] * 32 + 16) for p in path]
+
+
+def flow_field_path(flow_fields, start, goal, lookahead=16):
+    """
+    Returns the next stretch of the way towards 'goal' from the flow field of the goal, if the goal is a shared
+    destination. Following the field is a single array lookup per tile, no search is run.
+
+    Args:
+        flow_fields (FlowFields): The flow fields of the world.
+        start (vector2.Vector2): The current position in world coordinates.
+        goal (vector2.Vector2): The goal position in world coordinates.
+        lookahead (int): The number of tiles followed ahead. Defaults to 16.
+
+    Returns:
+        array.array: The smoothed waypoints as flat tile indices, empty if the goal has no flow field or the start is
+                     outside of it.
+    """
+    field = flow_fields.get(int(goal.x // 32), int(goal.y // 32))
+    if field is None:
+        return array('l')
+    nav = flow_fields.nav
+    start_x, start_y = nav.clamp(int(start.x // 32), int(start.y // 32))
+    start_index = start_y * nav.width + start_x
+    path = []
+    step = field.next_index(start_index)
+    while step >= 0 and len(path) < lookahead:
+        path.append(step)
+        step = field.next_index(step)
+    return string_pull(nav.costs, nav.width, start_index, path)
+
+
+def request_path_grid(service, start, goal, profile="land"):
+    """
+    Submits a path request to the path service instead of searching within the frame.
+
+    Args:
+        service (PathService): The path service of the world.
+        start (vector2.Vector2): The starting position in world coordinates.
+        goal (vector2.Vector2): The goal position in world coordinates.
+        profile (str): The movement profile of the entity. Defaults to "land".
+
+    Returns:
+        int: The ticket to pass to collect_path_grid.
+    """
+    start_node = (int(start.x // 32), int(start.y // 32))
+    goal_node = (int(goal.x // 32), int(goal.y // 32))
+    return service.submit(start_node, goal_node, profile)
+
+
+def collect_path_grid(service, ticket, start, profile="land"):
+    """
+    Collects the path of a request submitted with request_path_grid, smoothed into straight segments.
+
+    Args:
+        service (PathService): The path service of the world.
+        ticket (int): The ticket of the request.
+        start (vector2.Vector2): The position the request was made from, in world coordinates.
+        profile (str): The movement profile the request was made with. Defaults to "land".
+
+    Returns:
+        array.array: The waypoints as flat tile indices (empty if there is no path),
+                     or None while the search is still running.
+    """
+    path = service.poll(ticket)
+    if path is PENDING:
+        return None
+    if path is None:
+        return array('l')
+    nav = service.layers[profile]
+    start_x, start_y = nav.clamp(int(start.x // 32), int(start.y // 32))
+    return string_pull(nav.costs, nav.width, start_y * nav.width + start_x, [y * nav.width + x for x, y in path])
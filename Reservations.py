@@ -0,0 +1,150 @@
+"""
+CS5150 Game AI Final Project
+Team Member: Jianyan Chen, Ruidi Huang, Xin Qi
+Aug 2024
+
+This program defines the Reservations class, which lets a villager claim the tile it is heading for, so the other
+villagers leave that tree, grass or stone alone instead of walking to it and finding it already taken.
+A claim is a lease: it runs out unless the villager renews it, so a villager that forgets about its target does not
+keep it from the others forever. The world releases every claim of a villager when it dies.
+"""
+
+
+class Reservations(object):
+    """
+    The tiles claimed by the villagers, each with the time its lease runs out.
+
+    Attributes:
+        lease (float): How long a claim lasts, in seconds of game time, unless it is renewed.
+        time (float): The game time in seconds, advanced by tick. Unlike World.time it never wraps around at midnight.
+        claims (dict): Maps a (tile_x, tile_y) tuple to the (entity, expiry) of its claim.
+        held (dict): Maps the id() of an entity to the set of tiles it claimed.
+    """
+    def __init__(self, lease=10.0):
+        """
+        Initializes an empty set of reservations.
+
+        Args:
+            lease (float): How long a claim lasts in seconds of game time. Defaults to 10.0.
+        """
+        self.lease = lease
+        self.time = 0.0
+        self.claims = {}
+        self.held = {}
+
+    def __len__(self):
+        return len(self.claims)
+
+    def tick(self, delta):
+        """
+        Advances the clock of the leases, called once per frame by the world.
+
+        Args:
+            delta (float): The time passed in seconds since the last frame.
+        """
+        self.time += delta
+
+    def owner(self, tile):
+        """
+        Returns the entity holding a tile, dropping the claim first if its lease ran out.
+
+        Args:
+            tile (tuple): The (tile_x, tile_y) of the tile.
+
+        Returns:
+            GameEntity: The entity holding the tile, or None if it is free.
+        """
+        claim = self.claims.get(tile)
+        if claim is None:
+            return None
+        entity, expiry = claim
+        if expiry <= self.time:
+            self._drop(entity, tile)
+            return None
+        return entity
+
+    def is_free(self, tile, entity=None):
+        """
+        Checks if a tile can be claimed.
+
+        Args:
+            tile (tuple): The (tile_x, tile_y) of the tile.
+            entity (GameEntity): The entity asking, tiles it holds itself count as free. Defaults to None.
+
+        Returns:
+            bool: True if nobody else holds the tile.
+        """
+        owner = self.owner(tile)
+        return owner is None or owner is entity
+
+    def claim(self, entity, tile):
+        """
+        Claims a tile for an entity for the length of a lease. Claiming a tile the entity holds already renews it.
+
+        Args:
+            entity (GameEntity): The entity claiming the tile.
+            tile (tuple): The (tile_x, tile_y) of the tile.
+
+        Returns:
+            bool: True if the entity holds the tile now, False if another entity does.
+        """
+        if not self.is_free(tile, entity):
+            return False
+        self.claims[tile] = (entity, self.time + self.lease)
+        tiles = self.held.get(id(entity))
+        if tiles is None:
+            tiles = self.held[id(entity)] = set()
+        tiles.add(tile)
+        return True
+
+    def renew(self, entity, tile):
+        """
+        Extends the lease of a tile the entity holds, e.g. while it is still working on it.
+
+        Args:
+            entity (GameEntity): The entity holding the tile.
+            tile (tuple): The (tile_x, tile_y) of the tile.
+
+        Returns:
+            bool: True if the lease was extended, False if the entity doesn't hold the tile (anymore).
+        """
+        if self.owner(tile) is not entity:
+            return False
+        self.claims[tile] = (entity, self.time + self.lease)
+        return True
+
+    def release(self, entity, tile):
+        """
+        Gives up the claim of an entity on a tile. Does nothing if the entity doesn't hold it.
+
+        Args:
+            entity (GameEntity): The entity holding the tile.
+            tile (tuple): The (tile_x, tile_y) of the tile.
+        """
+        claim = self.claims.get(tile)
+        if claim is not None and claim[0] is entity:
+            self._drop(entity, tile)
+
+    def release_all(self, entity):
+        """
+        Gives up every claim of an entity, e.g. when it looks for a new target or dies.
+
+        Args:
+            entity (GameEntity): The entity.
+        """
+        for tile in self.held.pop(id(entity), ()):
+            del self.claims[tile]
+
+    def _drop(self, entity, tile):
+        """
+        Removes the claim of an entity on a tile from both dicts.
+
+        Args:
+            entity (GameEntity): The entity holding the tile.
+            tile (tuple): The (tile_x, tile_y) of the tile.
+        """
+        del self.claims[tile]
+        tiles = self.held[id(entity)]
+        tiles.discard(tile)
+        if not tiles:
+            del self.held[id(entity)]
@@ -0,0 +1,232 @@
+"""
+CS5150 Game AI Final Project
+Team Member: Jianyan Chen, Ruidi Huang, Xin Qi
+Aug 2024
+
+This program defines the ResourceIndex class, which keeps the tiles of the world sorted by what villagers can do
+with them: chop a tree, collect stone, till grass, plant a tree or fish from the shore.
+The world updates the index whenever it replaces a tile, so villagers can ask for the closest tiles of a kind
+instead of wandering around until they see one.
+"""
+
+import heapq
+
+import Tile
+from TileGrid import WALKABLE, FISHABLE, PLANTABLE, TILLABLE
+
+# The tiles is_shore looks at for water, and whose shore capability changes with a tile
+NEIGHBOURS = ((0, -1), (-1, 0), (1, 0), (0, 1))
+
+
+# The tests read the columns of the TileGrid, without making a Tile view of the cell
+
+
+def is_tree(tiles, tile_x, tile_y):
+    """A tree Lumberjacks can chop."""
+    return tiles.kinds[tiles.types[tile_y * tiles.width + tile_x]][1] == "GrassWithCenterTree"
+
+
+def is_stone(tiles, tile_x, tile_y):
+    """Stone Explorers can collect."""
+    return issubclass(tiles.kinds[tiles.types[tile_y * tiles.width + tile_x]][0],
+                      (Tile.SmoothStoneTile, Tile.CobblestoneTile))
+
+
+def is_tillable(tiles, tile_x, tile_y):
+    """Grass Farmers can till into a field."""
+    index = tile_y * tiles.width + tile_x
+    return bool(tiles.flags[index] & TILLABLE) and tiles.kinds[tiles.types[index]][1] == "MinecraftGrass"
+
+
+def is_plantable(tiles, tile_x, tile_y):
+    """A tile Arborists can plant a tree on."""
+    return bool(tiles.flags[tile_y * tiles.width + tile_x] & PLANTABLE)
+
+
+def is_shore(tiles, tile_x, tile_y):
+    """A walkable tile next to a fishable one, where Anglers can fish from."""
+    flags = tiles.flags
+    width = tiles.width
+    if not flags[tile_y * width + tile_x] & WALKABLE:
+        return False
+    for dx, dy in NEIGHBOURS:
+        x = tile_x + dx
+        y = tile_y + dy
+        if 0 <= y < tiles.height and 0 <= x < width and flags[y * width + x] & FISHABLE:
+            return True
+    return False
+
+
+# Maps a capability to the test of a tile, new capabilities only need an entry here
+CAPABILITIES = {
+    "tree": is_tree,
+    "stone": is_stone,
+    "tillable": is_tillable,
+    "plantable": is_plantable,
+    "shore": is_shore,
+}
+
+
+class ResourceIndex(object):
+    """
+    The tiles of every capability, in square buckets of tiles so the nearest ones are found by looking at a few
+    buckets around a location.
+
+    Attributes:
+        world (World): The game world whose tiles are indexed.
+        width (int): The width of the world in tiles.
+        height (int): The height of the world in tiles.
+        bucket_size (int): The side length of a bucket in tiles.
+        buckets (dict): Maps a capability to a dict mapping a (bucket_x, bucket_y) key to the set of
+                        (tile_x, tile_y) of the tiles with that capability in the bucket.
+        counts (dict): Maps a capability to the number of tiles that have it.
+    """
+    def __init__(self, world, bucket_size=8):
+        """
+        Initializes the index from the tile array of the world.
+
+        Args:
+            world (World): The game world containing the tiles.
+            bucket_size (int): The side length of a bucket in tiles. Defaults to 8.
+        """
+        self.world = world
+        self.width = world.w // world.tile_size
+        self.height = world.h // world.tile_size
+        self.bucket_size = bucket_size
+        self.buckets = {capability: {} for capability in CAPABILITIES}
+        self.counts = {capability: 0 for capability in CAPABILITIES}
+        for tile_y in range(self.height):
+            for tile_x in range(self.width):
+                self._index(tile_x, tile_y)
+
+    def _index(self, tile_x, tile_y):
+        """
+        Files a tile under exactly the capabilities it has now.
+
+        Args:
+            tile_x (int): The tile column.
+            tile_y (int): The tile row.
+        """
+        tile_array = self.world.tile_array
+        key = (tile_x // self.bucket_size, tile_y // self.bucket_size)
+        for capability, test in CAPABILITIES.items():
+            buckets = self.buckets[capability]
+            bucket = buckets.get(key)
+            indexed = bucket is not None and (tile_x, tile_y) in bucket
+            if test(tile_array, tile_x, tile_y):
+                if not indexed:
+                    if bucket is None:
+                        bucket = buckets[key] = set()
+                    bucket.add((tile_x, tile_y))
+                    self.counts[capability] += 1
+            elif indexed:
+                bucket.discard((tile_x, tile_y))
+                self.counts[capability] -= 1
+                if not bucket:
+                    del buckets[key]
+
+    def update_tile(self, tile_x, tile_y):
+        """
+        Re-indexes a tile after it has been replaced, and its neighbours, which may have become shore or stopped
+        being shore.
+
+        Args:
+            tile_x (int): The tile column.
+            tile_y (int): The tile row.
+        """
+        self._index(tile_x, tile_y)
+        for dx, dy in NEIGHBOURS:
+            if 0 <= tile_x + dx < self.width and 0 <= tile_y + dy < self.height:
+                self._index(tile_x + dx, tile_y + dy)
+
+    def has(self, capability, tile_x, tile_y):
+        """
+        Checks if a tile has a capability.
+
+        Args:
+            capability (str): A key of CAPABILITIES.
+            tile_x (int): The tile column.
+            tile_y (int): The tile row.
+
+        Returns:
+            bool: True if the tile is indexed under the capability.
+        """
+        bucket = self.buckets[capability].get((tile_x // self.bucket_size, tile_y // self.bucket_size))
+        return bucket is not None and (tile_x, tile_y) in bucket
+
+    def nearest(self, capability, tile_x, tile_y, k=1, accept=None):
+        """
+        Finds the k tiles with a capability closest to a tile, in a straight line. The buckets are looked at in
+        rings around the bucket of the tile, until no bucket of the next ring can hold a tile closer than the k-th.
+
+        Args:
+            capability (str): A key of CAPABILITIES.
+            tile_x (int): The tile column to search from.
+            tile_y (int): The tile row to search from.
+            k (int): The number of tiles to find. Defaults to 1.
+            accept (function): Called with (tile_x, tile_y), only tiles it returns True for are found.
+                               Defaults to None.
+
+        Returns:
+            list of tuple: Up to k (tile_x, tile_y), nearest first.
+        """
+        buckets = self.buckets[capability]
+        size = self.bucket_size
+        center_x = tile_x // size
+        center_y = tile_y // size
+        last_ring = max(self.width, self.height) // size + 1
+        # The k best so far as (-distance, tile), the farthest of them on top
+        best = []
+        ring = 0
+        while ring <= last_ring:
+            # Every bucket of ring n is at least (n - 1) buckets away from the tile
+            if len(best) == k and ((ring - 1) * size) ** 2 >= -best[0][0]:
+                break
+            # Once a ring has more buckets than there are non-empty ones, looking at all of them is cheaper
+            every_bucket = 8 * ring > len(buckets)
+            if every_bucket:
+                best = []
+                keys = list(buckets)
+            else:
+                keys = self._ring(center_x, center_y, ring)
+            for key in keys:
+                bucket = buckets.get(key)
+                if bucket is None:
+                    continue
+                for tile in bucket:
+                    distance = (tile[0] - tile_x) ** 2 + (tile[1] - tile_y) ** 2
+                    if len(best) == k and distance >= -best[0][0]:
+                        continue
+                    if accept is not None and not accept(tile):
+                        continue
+                    if len(best) == k:
+                        heapq.heapreplace(best, (-distance, tile))
+                    else:
+                        heapq.heappush(best, (-distance, tile))
+            if every_bucket:
+                break
+            ring += 1
+        return [tile for _, tile in sorted(best, key=lambda item: (-item[0], item[1]))]
+
+    @staticmethod
+    def _ring(center_x, center_y, ring):
+        """
+        Yields the bucket keys of the square ring at a Chebyshev distance from a center bucket.
+
+        Args:
+            center_x (int): The bucket column of the center.
+            center_y (int): The bucket row of the center.
+            ring (int): The distance of the ring in buckets, 0 for the center alone.
+
+        Yields:
+            tuple: The (bucket_x, bucket_y) of every bucket of the ring.
+        """
+        if ring == 0:
+            yield center_x, center_y
+            return
+        for bucket_x in range(center_x - ring, center_x + ring + 1):
+            yield bucket_x, center_y - ring
+            yield bucket_x, center_y + ring
+        for bucket_y in range(center_y - ring + 1, center_y + ring):
+            yield center_x - ring, bucket_y
+            yield center_x + ring, bucket_y
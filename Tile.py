@@ -9,16 +9,25 @@ This program defines class for all tiles in game.
 from random import randint
 import pygame
 from gametools.vector2 import Vector2
+from gametools import tile_images
 
 
 class Tile(object):
     """
     Base class for all tile types in the game.
 
+    What a tile type allows (walking, fishing, building...) and its movement cost are class attributes shared by all
+    the tiles of the type. What differs from tile to tile is kept in the columns of the world's TileGrid once the tile
+    is put in the world: a tile object is then only a view of its cell, and the grid hands out new views on access.
+    Until then the object keeps that state itself.
+
     Attributes:
         world (World): The game world instance the tile belongs to.
         name (str): The name of the tile.
-        img (pygame.Surface): The image associated with the tile.
+        shadow (bool): True if the tile lies in the hard shadow of a ridge and shows the shadowed image.
+        grid (TileGrid): The grid holding the cell of the tile, None until the tile is put in the world.
+        index (int): The flat index of the cell in the grid.
+        img (pygame.Surface): The image associated with the tile, shared with the other tiles of the same name.
         location (Vector2): The position of the tile in the world.
         walkable (bool): Indicates if entities can walk on this tile.
         fishable (bool): Indicates if entities can fish on this tile.
@@ -29,34 +38,140 @@ class Tile(object):
         crop_harvestable (bool): Indicates if crops can be harvested from this tile.
         buildable (bool): Indicates if buildings can be placed on this tile.
         buildable_w (bool): Indicates if water-based buildings can be placed on this tile.
-        darkness (int): Represents the darkness level on the tile.
+        darkness (int): Represents the darkness level on the tile, the alpha of its shade.
+        color (float): The height of the map the tile was generated from.
         watered_times (int): Tracks the number of times the tile has been watered.
         watered_req (int): Number of times the tile needs to be watered to mature.
-        id (int): Unique identifier for the tile.
+        id (int): Unique identifier for the tile, the index of its cell once it is in the world.
         rect (pygame.Rect): The rectangular area of the tile.
         cost (int): Movement cost associated with the tile (lower is easier to traverse).
     """
+    walkable = False
+    fishable = False
+    plantable = False
+    tillable = False
+    crop_plantable = False
+    crop_waterable = False
+    crop_harvestable = False
+    buildable = False
+    buildable_w = False
+    cost = 100  # Default to infinite cost if not walkable
+
     def __init__(self, world, tile_name="NULL"):
         self.world = world
         self.name = tile_name
-        self.img = pygame.image.load("Images/Tiles/"+tile_name+".png").convert()
-        self.location = Vector2(0, 0)
-        self.walkable = False
-        self.fishable = False
-        self.plantable = False
-        self.tillable = False
-        self.crop_plantable = False
-        self.crop_waterable = False
-        self.crop_harvestable = False
-        self.buildable = False
-        self.buildable_w = False
-        self.darkness = 0
-        self.watered_times = 0
-        self.watered_req = 0
+        self.shadow = False
+        self.grid = None
+        self.index = 0
+        self._location = Vector2(0, 0)
+        self._darkness = 0
+        self._color = 0
+        self._watered_times = 0
+        self._watered_req = 0
+        # Loads the image now, so a missing image fails where the tile is made
+        tile_images.get_image(tile_name)
+
+    @classmethod
+    def view(cls, world, name, shadow, grid, index):
+        """
+        Makes a view of a cell of a grid, without running __init__.
+
+        Args:
+            world (World): The game world.
+            name (str): The name of the tile in the cell.
+            shadow (bool): True if the cell is in a hard shadow.
+            grid (TileGrid): The grid holding the cell.
+            index (int): The flat index of the cell.
+
+        Returns:
+            Tile: The view, of the class of the tile in the cell.
+        """
+        tile = cls.__new__(cls)
+        tile.world = world
+        tile.name = name
+        tile.shadow = shadow
+        tile.grid = grid
+        tile.index = index
+        return tile
+
+    def __eq__(self, other):
+        # Views of the same cell are the same tile, as long as the cell still holds a tile of that name
+        if self.grid is None or not isinstance(other, Tile):
+            return self is other
+        return self.grid is other.grid and self.index == other.index and self.name == other.name
+
+    def __hash__(self):
+        if self.grid is None:
+            return id(self)
+        return hash((self.index, self.name))
+
+    @property
+    def img(self):
+        return tile_images.get_image(self.name, self.shadow)
+
+    @property
+    def id(self):
+        return self.index
+
+    @property
+    def location(self):
+        if self.grid is None:
+            return self._location
+        tile_size = self.world.tile_size
+        return Vector2(self.index % self.grid.width * tile_size, self.index // self.grid.width * tile_size)
+
+    @location.setter
+    def location(self, location):
+        # The location of a tile in the world is the one of its cell
+        self._location = location
+
+    @property
+    def rect(self):
+        return pygame.Rect((self.location.x, self.location.y), self.img.get_size())
+
+    @property
+    def darkness(self):
+        return self._darkness if self.grid is None else self.grid.darkness[self.index]
 
-        self.id = 0
-        self.rect = pygame.Rect((0, 0), self.img.get_size())
-        self.cost = 100  # Default to infinite cost if not walkable
+    @darkness.setter
+    def darkness(self, darkness):
+        if self.grid is None:
+            self._darkness = darkness
+        else:
+            self.grid.darkness[self.index] = int(darkness)
+
+    @property
+    def color(self):
+        return self._color if self.grid is None else self.grid.color[self.index]
+
+    @color.setter
+    def color(self, color):
+        if self.grid is None:
+            self._color = color
+        else:
+            self.grid.color[self.index] = color
+
+    @property
+    def watered_times(self):
+        return self._watered_times if self.grid is None else self.grid.watered_times[self.index]
+
+    @watered_times.setter
+    def watered_times(self, watered_times):
+        if self.grid is None:
+            self._watered_times = watered_times
+        else:
+            self.grid.watered_times[self.index] = watered_times
+
+    @property
+    def watered_req(self):
+        return self._watered_req if self.grid is None else self.grid.watered_req[self.index]
+
+    @watered_req.setter
+    def watered_req(self, watered_req):
+        if self.grid is None:
+            self._watered_req = watered_req
+        else:
+            self.grid.watered_req[self.index] = watered_req
 
     def render(self, screen):
         """
@@ -67,147 +182,145 @@ class Tile(object):
         """
         screen.blit(self.img, self.location)
 
-
 class GrassTile(Tile):
     """
     A grass tile, suitable for walking, building, planting, and tilling.
     """
-    def __init__(self, world, tile_name):
-        Tile.__init__(self, world, tile_name)
-        self.walkable = True
-        self.buildable = True
-        self.plantable = True
-        self.tillable = True
-        self.cost = 1  # Easy to walk
+    walkable = True
+    buildable = True
+    plantable = True
+    tillable = True
+    cost = 1  # Easy to walk
+
 
 class WaterTile(Tile):
     """
     A water tile, suitable for fishing and building water-based structures.
     """
-    def __init__(self, world, tile_name):
-        Tile.__init__(self, world, tile_name)
-        self.buildable_w = True
-        self.fishable = True
-        self.cost = 100
+    buildable_w = True
+    fishable = True
+    cost = 100
+
 
 class DeepWaterTile(Tile):
     """
     A deep water tile, not suitable for walking but can have water-based buildings.
     """
-    def __init__(self, world, tile_name):
-        Tile.__init__(self, world, tile_name)
-        self.buildable_w = True
-        self.cost = 100
+    buildable_w = True
+    cost = 100
+
 
 class SmoothStoneTile(Tile):
     """
     A smooth stone tile, suitable for walking and building.
     """
-    def __init__(self, world, tile_name):
-        Tile.__init__(self, world, tile_name)
-        self.walkable = True
-        self.buildable = True
-        self.cost = 3
+    walkable = True
+    buildable = True
+    cost = 3
+
 
 class CobblestoneTile(Tile):
     """
     A cobblestone tile, harder to walk on but suitable for building.
     """
-    def __init__(self, world, tile_name):
-        Tile.__init__(self, world, tile_name)
-        self.walkable = True
-        self.buildable = True
-        self.cost = 5
+    walkable = True
+    buildable = True
+    cost = 5
+
 
 class DirtTile(Tile):
     """
     A dirt tile, suitable for walking, building, and tilling.
     """
-    def __init__(self, world, tile_name):
-        Tile.__init__(self, world, tile_name)
-        self.walkable = True
-        self.buildable = True
-        self.tillable = True
-        self.cost = 1
+    walkable = True
+    buildable = True
+    tillable = True
+    cost = 1
+
 
 class BeachTile(Tile):
     """
     A beach tile, suitable for walking and building.
     """
-    def __init__(self, world, tile_name):
-        Tile.__init__(self, world, tile_name)
-        self.walkable = True
-        self.buildable = True
-        self.cost = 1
+    walkable = True
+    buildable = True
+    cost = 1
+
 
 class Baby_Tree(Tile):
     """
     A baby tree tile, representing a young tree that can be walked on.
     """
-    def __init__(self, world, tile_name):
-        Tile.__init__(self, world, tile_name)
-        self.walkable = True
-        self.cost = 1
+    walkable = True
+    cost = 1
+
 
 class TreePlantedTile(Tile):
     """
     A tile with a planted tree, indicating the presence of a tree.
     """
-    def __init__(self, world, tile_name):
-        Tile.__init__(self, world, tile_name)
-        self.walkable = True
-        self.Taken = False
-        self.cost = 1
+    walkable = True
+    cost = 1
+
 
 class SnowTile(Tile):
     """
     A snow tile, which is harder to walk on.
     """
-    def __init__(self, world, tile_name):
-        Tile.__init__(self, world, tile_name)
-        self.walkable = True
-        self.cost = 10
+    walkable = True
+    cost = 10
 
 
 class BuildingTile(Tile):
     """
     A tile representing a building, suitable for walking.
     """
-    def __init__(self, world, tile_name):
-        Tile.__init__(self, world, tile_name)
-        self.walkable = True
-        self.cost = 1
+    walkable = True
+    cost = 1
+
 
 class SoilTile(Tile):
     """
     A soil tile, suitable for walking and planting crops.
     """
-    def __init__(self, world, tile_name):
-        Tile.__init__(self, world, tile_name)
-        self.walkable = True
-        self.crop_plantable = True
-        self.cost = 1
+    walkable = True
+    crop_plantable = True
+    cost = 1
 
 
 class ShootFieldTile(Tile):
     """
     A tile representing a crop field that is in the process of growing.
     """
+    walkable = True
+    cost = 1
+    crop_waterable = True
+
     def __init__(self, world, tile_name):
         Tile.__init__(self, world, tile_name)
-        self.walkable = True
-        self.cost = 1
         self.watered_times = 0
         self.watered_req = randint(1, 2)
-        self.crop_waterable = True
 
 
 class MatureFieldTile(Tile):
     """
     A tile representing a mature crop field, ready for harvest.
     """
-    def __init__(self, world, tile_name):
+    walkable = True
+    crop_harvestable = True
+    cost = 1
+
+
+class BorderTile(Tile):
+    """
+    The tile beyond the edge of the map. One instance per world is returned for every position outside of it,
+    so it can't be changed.
+    """
+    def __init__(self, world, tile_name="Sand"):
         Tile.__init__(self, world, tile_name)
-        self.walkable = True
-        self.crop_harvestable = True
-        self.cost = 1
+        object.__setattr__(self, "_frozen", True)
+
+    def __setattr__(self, name, value):
+        if getattr(self, "_frozen", False):
+            raise AttributeError("The border tile is shared and can't be changed")
+        object.__setattr__(self, name, value)
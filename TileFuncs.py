@@ -6,8 +6,8 @@ Aug 2024
 This program contains functions related to Tiles.
 """
 from gametools import vector2
-import Tile
 import math
+from TileGrid import stencil_offsets
 from gametools.vector2 import Vector2
 
 
@@ -20,13 +20,9 @@ def get_tile(world, location):
         location (Vector2): The location to retrieve the tile from.
 
     Returns:
-        Tile: The tile at the specified location or a default "Sand" tile if out of bounds.
+        Tile: The tile at the specified location or the world's shared border tile, a "Sand" tile, if out of bounds.
     """
-    tile = get_tile_pos(world, location)
-    try:
-        return world.tile_array[int(tile.y)][int(tile.x)]
-    except IndexError:
-        return Tile.Tile(world, "Sand")
+    return world.tiles.at(int(location.x // 32), int(location.y // 32))
 
 def get_tile_neighbours(world, location):
     """
@@ -72,20 +68,20 @@ def get_tile_pos(world, location):
 
 def get_entity(world,location, radius = 20):
     """
-    Retrieves an entity within a specified radius of a location in the world.
+    Retrieves the entity nearest to a location on the screen, within a specified radius.
+    Only the rings of buckets of the world's spatial hash around the location that can hold it are looked at.
 
     Args:
         world: The game world instance containing the entities.
-        location (Vector2): The location to search around.
+        location (Vector2): The screen location to search around.
         radius (int, optional): The radius to search within. Defaults to 20.
 
     Returns:
-        tuple: The entity found within the radius, or None if no entity is found.
+        tuple: The (id, entity) found within the radius, or None if no entity is found.
     """
-    for i in world.entities.items():
-        ent_location = i[1].world_location
-        if ((ent_location.x - location.x)**2 + (ent_location.y - location.y)**2) < radius**2:
-            return i
+    entity = world.entity_hash.nearest(location - world.world_position, radius)
+    if entity is not None:
+        return entity.id, entity
     # print "no ents"
 
 def get_tile_array(world, start_pos, dimensions):
@@ -98,26 +94,20 @@ def get_tile_array(world, start_pos, dimensions):
         dimensions (tuple): The dimensions (width, height) of the tile array.
 
     Returns:
-        list: A 2D array of tiles.
+        list: A 2D array of tiles, array[row][column], starting one tile up and left of start_pos.
+              Positions outside of the world are None.
     """
-    dimensions = (int(dimensions[0]), int(dimensions[1]))
+    columns = int(dimensions[0]) * 2 + 1
+    rows = int(dimensions[1]) * 2 + 1
 
-    start_tile = get_tile_pos(world,start_pos)
+    left = int(start_pos.x // 32) - 1
+    top = int(start_pos.y // 32) - 1
 
-    array = [[None for i in xrange((dimensions[0] * 2) + 1)]
-             for a in xrange((dimensions[1] * 2) + 1)]
-
-    for i in xrange((dimensions[0] * 2) + 1):
-        for a in xrange((dimensions[1] * 2) + 1):
-            if start_tile.x + i < 0 or start_tile.y + a < 0:
-                continue
-
-            else:
-                try:
-                    array[a][i] = world.tile_array[int((start_tile.y + a) - 1)][int((start_tile.x + i) - 1)]
-                except IndexError:
-                    #print a, i, start_tile
-                    raise IndexError
+    array = [[None] * columns for a in range(rows)]
+    for first_x, tile_y, types in world.tiles.window("types", left, top, columns, rows):
+        row = array[tile_y - top]
+        for i in range(len(types)):
+            row[first_x - left + i] = world.tiles.get(first_x + i, tile_y)
     return array
 
 def get_vnn_array(world, location, r):
@@ -136,8 +126,6 @@ def get_vnn_array(world, location, r):
         Simply returns a neighborhood of locations based
         on the initial location and range r"""
 
-    return_array = []
-
     """
     range: 3
     num rows: 5 (number of rows is equal to (2 * r) - 1
@@ -146,41 +134,47 @@ def get_vnn_array(world, location, r):
     2 * * * * *  5
     3   * * *    3     middle is illustration of what is looks like
     4     *      1     num_in_row is just how many spots are looked at in the current row.
-    """
-
-    for row_number in range((2 * r) - 1):
-        if row_number >= r:
-            num_in_row = (2 * row_number) - (4 * (row_number - r + 1) - 1)
-        else:
-            num_in_row = (2 * row_number) + 1
-
-        for cell in range(num_in_row):
 
-            """
-            the y_offset goes from -(r - 1) to +(r - 1) (not affected by the inner loop)
+    x, y offset pairs of a range 3 vnn array, a diamond of radius r - 1:
+                      (0, -2)
+             (-1, -1) (0, -1) (1, -1)
+     (-2, 0) (-1, 0 ) (0, 0 ) (1, 0 ) (2, 0)
+             (-1, 1 ) (0, 1 ) (1, 1 )
+                      (0, 2 )
 
-            the x_offset goes from -math.floor(num_in_row / 2.0) to +math.floor(num_in_row / 2.0)
+    The offsets of every range are computed once and kept by TileGrid.stencil_offsets.
+    """
+    tile_size = world.tile_size
+    return [vector2.Vector2(location.x + (x_offset * tile_size), location.y + (y_offset * tile_size))
+            for x_offset, y_offset in stencil_offsets("diamond", r - 1)]
 
-            0     0     1 |                  (0, -2)                  x, y offset pairs of a range 3 vnn array
-            1   0 1 2   3 |         (-1, -1) (0, -1) (1, -1)
-            2 0 1 2 3 4 5 | (-2, 0) (-1, 0 ) (0, 0 ) (1, 0 ) (2, 0)   left column is row_number
-            3   0 1 2   3 |         (-1, 1 ) (0, 1 ) (1, 1 )          right column is num_in_row
-            4     0     1 |                  (0, 2 )                  middle is cell number
-            """
 
-            tile_size = world.tile_size
-            x_offset = cell - math.floor(num_in_row / 2.0)
-            y_offset = row_number - (r - 1)
+def find_tiles(world, location, r, flag=0, name=None):
+    """
+    Finds the tiles of the Von Neumann neighborhood of get_vnn_array that have some capabilities and/or a name,
+    in the same order, by scanning the columns of the world's TileGrid instead of looking up every tile.
 
-            new_location = vector2.Vector2(location.x + (x_offset * tile_size), location.y + (y_offset * tile_size))
-            return_array.append(new_location)
+    Args:
+        world: The game world instance containing the tiles.
+        location (Vector2): The location to get the neighborhood for.
+        r (int): The range of the neighborhood, as in get_vnn_array.
+        flag (int): The TileGrid capability bits the tiles must all have, 0 for any tile. Defaults to 0.
+        name (str): The name the tiles must have, None for any name. Defaults to None.
 
-    return return_array
+    Yields:
+        Vector2: The location of every matching tile, offset from location by whole tiles like in get_vnn_array.
+    """
+    tile_size = world.tile_size
+    tile_x = int(location.x // tile_size)
+    tile_y = int(location.y // tile_size)
+    for x, y in world.tiles.find(tile_x, tile_y, r - 1, flag, name):
+        yield vector2.Vector2(location.x + (x - tile_x) * tile_size, location.y + (y - tile_y) * tile_size)
 
 
 def is_entity_collided(world, entity):
     """
-    Checks if the given entity has collided with any other entities in the world.
+    Checks if the given entity has collided with any other entities in the world, i.e. shares its tile with one.
+    Only the bucket of that tile in the world's spatial hash is looked at.
 
     Args:
         world: The game world instance containing the entities.
@@ -189,11 +183,9 @@ def is_entity_collided(world, entity):
     Returns:
         bool: True if a collision is detected, False otherwise.
     """
-    for i in world.entities.items():
-        if i[1] is not None and i[1].id != entity.id:
-            i_tile_location = vector2.Vector2(i[1].tile_location_x, i[1].tile_location_y)
-            ent_tile_location = vector2.Vector2(entity.tile_location_x, entity.tile_location_y)
-            if i_tile_location == ent_tile_location:
-                return True
+    for other in world.entity_hash.at(*world.entity_hash.key(entity.location.x, entity.location.y)):
+        if other.id != entity.id:
+            return True
+    return False
 
 
@@ -0,0 +1,469 @@
+"""
+CS5150 Game AI Final Project
+Team Member: Jianyan Chen, Ruidi Huang, Xin Qi
+Aug 2024
+
+This program defines the TileGrid class, which stores the tiles of the world as flat columns, one array per property
+with one entry per tile, instead of one Python object per tile.
+Indexing it like the old list of lists, tile_array[tile_y][tile_x], returns a Tile of the right class that is a view
+of the cell, so the code reading tile.walkable or tile.name works as before, while whole-map queries can read the
+columns directly.
+Region queries return memoryviews of the rows of a column, which share the memory of the grid instead of copying it,
+and numpy.frombuffer can wrap them without a copy too.
+"""
+
+from array import array
+
+import Tile
+
+# Bits of the flags column, one per capability of the tile type
+WALKABLE = 1
+FISHABLE = 2
+PLANTABLE = 4
+TILLABLE = 8
+CROP_PLANTABLE = 16
+CROP_WATERABLE = 32
+CROP_HARVESTABLE = 64
+BUILDABLE = 128
+BUILDABLE_W = 256
+# Not a capability, the cell is in the hard shadow of a ridge
+SHADOW = 512
+
+# Maps the attribute of a tile type to its bit
+CAPABILITY_FLAGS = (
+    ("walkable", WALKABLE),
+    ("fishable", FISHABLE),
+    ("plantable", PLANTABLE),
+    ("tillable", TILLABLE),
+    ("crop_plantable", CROP_PLANTABLE),
+    ("crop_waterable", CROP_WATERABLE),
+    ("crop_harvestable", CROP_HARVESTABLE),
+    ("buildable", BUILDABLE),
+    ("buildable_w", BUILDABLE_W),
+)
+
+
+def diamond_spans(radius):
+    """
+    The rows of a Von Neumann neighbourhood, the cells at a Manhattan distance of at most radius.
+
+    Args:
+        radius (int): The radius in tiles, 0 for the center alone.
+
+    Returns:
+        tuple: (dy, first dx, last dx) for every row, from the top one down.
+    """
+    return tuple((dy, abs(dy) - radius, radius - abs(dy)) for dy in range(-radius, radius + 1))
+
+
+def square_spans(radius):
+    """
+    The rows of a Moore neighbourhood, the cells at a Chebyshev distance of at most radius.
+
+    Args:
+        radius (int): The radius in tiles, 0 for the center alone.
+
+    Returns:
+        tuple: (dy, first dx, last dx) for every row, from the top one down.
+    """
+    return tuple((dy, -radius, radius) for dy in range(-radius, radius + 1))
+
+
+# Maps the shape of a region to the function giving its rows
+SHAPES = {
+    "diamond": diamond_spans,
+    "square": square_spans,
+}
+
+# The stencils computed so far, maps (shape, radius) to its rows, and ("offsets", shape, radius) to its offsets
+_stencils = {}
+
+
+def stencil(shape, radius):
+    """
+    Returns the rows of a shape, computed once per shape and radius.
+
+    Args:
+        shape (str): A key of SHAPES, "diamond" or "square".
+        radius (int): The radius in tiles.
+
+    Returns:
+        tuple: (dy, first dx, last dx) for every row, from the top one down.
+    """
+    key = (shape, radius)
+    spans = _stencils.get(key)
+    if spans is None:
+        spans = _stencils[key] = SHAPES[shape](radius)
+    return spans
+
+
+def stencil_offsets(shape, radius):
+    """
+    Returns the cells of a shape as offsets from its center, computed once per shape and radius.
+
+    Args:
+        shape (str): A key of SHAPES, "diamond" or "square".
+        radius (int): The radius in tiles.
+
+    Returns:
+        tuple: The (dx, dy) of every cell, row by row from the top one down, left to right.
+    """
+    key = ("offsets", shape, radius)
+    offsets = _stencils.get(key)
+    if offsets is None:
+        offsets = _stencils[key] = tuple((dx, dy) for dy, first_dx, last_dx in stencil(shape, radius)
+                                         for dx in range(first_dx, last_dx + 1))
+    return offsets
+
+
+class TileRow(object):
+    """
+    One row of a TileGrid, so that grid[tile_y][tile_x] reads and writes a cell like the old list of lists did.
+
+    Attributes:
+        grid (TileGrid): The grid.
+        tile_y (int): The row.
+    """
+    def __init__(self, grid, tile_y):
+        """
+        Initializes a row.
+
+        Args:
+            grid (TileGrid): The grid.
+            tile_y (int): The row.
+        """
+        self.grid = grid
+        self.tile_y = tile_y
+
+    def __len__(self):
+        return self.grid.width
+
+    def __getitem__(self, tile_x):
+        width = self.grid.width
+        if isinstance(tile_x, slice):
+            return [self.grid.view(self.tile_y * width + x) for x in range(*tile_x.indices(width))]
+        # Negative columns count from the end of the row, like in a list
+        if tile_x < 0:
+            tile_x += width
+        if not 0 <= tile_x < width:
+            raise IndexError("tile column out of range")
+        return self.grid.view(self.tile_y * width + tile_x)
+
+    def __setitem__(self, tile_x, tile):
+        # Negative columns count from the end of the row, like in a list
+        if tile_x < 0:
+            tile_x += self.grid.width
+        self.grid.put(tile_x, self.tile_y, tile)
+
+    def __iter__(self):
+        start = self.tile_y * self.grid.width
+        for index in range(start, start + self.grid.width):
+            yield self.grid.view(index)
+
+
+class TileGrid(object):
+    """
+    The tiles of the world in columns. A tile type is stored once in kinds, a cell only holds the number of its kind.
+
+    Attributes:
+        world (World): The game world.
+        width (int): The width of the grid in tiles.
+        height (int): The height of the grid in tiles.
+        kinds (list of tuple): The (Tile class, name) of every kind of tile met so far.
+        kind_ids (dict): Maps a (Tile class, name) tuple to its position in kinds.
+        types (array.array): The kind of every cell.
+        costs (array.array): The movement cost of every cell.
+        flags (array.array): The capability bits of every cell, and SHADOW.
+        darkness (array.array): The darkness of every cell, as the alpha of its shade (the fraction is dropped,
+                                like pygame does).
+        color (array.array): The height of the map every cell was generated from.
+        watered_times (array.array): How many times every cell has been watered.
+        watered_req (array.array): How many times every cell needs watering to mature.
+        rows (list of TileRow): The rows, for grid[tile_y][tile_x].
+        border (Tile.BorderTile): The tile returned for every position outside of the grid.
+    """
+    def __init__(self, world, width, height):
+        """
+        Initializes a grid. Every cell holds kind 0 until a tile is put in it.
+
+        Args:
+            world (World): The game world.
+            width (int): The width in tiles.
+            height (int): The height in tiles.
+        """
+        self.world = world
+        self.width = width
+        self.height = height
+        self.kinds = []
+        self.kind_ids = {}
+        size = width * height
+        self.types = array('B', bytes(size))
+        self.costs = array('B', bytes(size))
+        self.flags = array('H', bytes(2 * size))
+        self.darkness = array('h', bytes(2 * size))
+        self.color = array('f', bytes(4 * size))
+        self.watered_times = array('B', bytes(size))
+        self.watered_req = array('B', bytes(size))
+        self.rows = [TileRow(self, tile_y) for tile_y in range(height)]
+        self.border = Tile.BorderTile(world)
+
+    def __len__(self):
+        return self.height
+
+    def __getitem__(self, tile_y):
+        return self.rows[tile_y]
+
+    def __iter__(self):
+        return iter(self.rows)
+
+    def kind_id(self, tile):
+        """
+        Returns the number of the kind of a tile, adding the kind on first use.
+
+        Args:
+            tile (Tile): The tile.
+
+        Returns:
+            int: The position of (class, name) in kinds.
+        """
+        key = (type(tile), tile.name)
+        kind = self.kind_ids.get(key)
+        if kind is None:
+            kind = self.kind_ids[key] = len(self.kinds)
+            self.kinds.append(key)
+        return kind
+
+    def put(self, tile_x, tile_y, tile):
+        """
+        Stores a tile in a cell. The tile becomes a view of the cell.
+        Raises IndexError for a position outside the grid; unlike `at`, there is no border tile to write to.
+
+        Args:
+            tile_x (int): The tile column.
+            tile_y (int): The tile row.
+            tile (Tile): The tile, not in a grid yet.
+        """
+        if not (0 <= tile_x < self.width and 0 <= tile_y < self.height):
+            raise IndexError("tile position out of range")
+        index = tile_y * self.width + tile_x
+        flags = SHADOW if tile.shadow else 0
+        for attribute, bit in CAPABILITY_FLAGS:
+            if getattr(tile, attribute):
+                flags |= bit
+        darkness = tile.darkness
+        color = tile.color
+        watered_times = tile.watered_times
+        watered_req = tile.watered_req
+        self.types[index] = self.kind_id(tile)
+        self.costs[index] = tile.cost
+        self.flags[index] = flags
+        tile.grid = self
+        tile.index = index
+        tile.darkness = darkness
+        tile.color = color
+        tile.watered_times = watered_times
+        tile.watered_req = watered_req
+
+    def view(self, index):
+        """
+        Returns a view of a cell.
+
+        Args:
+            index (int): The flat index of the cell.
+
+        Returns:
+            Tile: A tile of the class of the kind in the cell, reading and writing the columns of the grid.
+        """
+        cls, name = self.kinds[self.types[index]]
+        return cls.view(self.world, name, bool(self.flags[index] & SHADOW), self, index)
+
+    def get(self, tile_x, tile_y):
+        """
+        Returns a view of the cell at a tile position.
+
+        Args:
+            tile_x (int): The tile column, inside the grid.
+            tile_y (int): The tile row, inside the grid.
+
+        Returns:
+            Tile: The view.
+        """
+        return self.view(tile_y * self.width + tile_x)
+
+    def at(self, tile_x, tile_y):
+        """
+        Returns the tile at a tile position, or the border tile if the position is outside of the grid.
+        Unlike grid[tile_y][tile_x], negative positions don't wrap around to the other side of the map.
+
+        Args:
+            tile_x (int): The tile column.
+            tile_y (int): The tile row.
+
+        Returns:
+            Tile: A view of the cell, or the border tile.
+        """
+        if 0 <= tile_x < self.width and 0 <= tile_y < self.height:
+            return self.view(tile_y * self.width + tile_x)
+        return self.border
+
+    def at_many(self, tile_xs, tile_ys):
+        """
+        Returns the tiles at many tile positions, like at does for one.
+
+        Args:
+            tile_xs (sequence of int): The tile columns.
+            tile_ys (sequence of int): The tile rows, one per column.
+
+        Returns:
+            list of Tile: The tiles, in the order of the positions.
+        """
+        width = self.width
+        height = self.height
+        kinds = self.kinds
+        types = self.types
+        flags = self.flags
+        world = self.world
+        border = self.border
+        tiles = []
+        for tile_x, tile_y in zip(tile_xs, tile_ys):
+            if 0 <= tile_x < width and 0 <= tile_y < height:
+                index = tile_y * width + tile_x
+                cls, name = kinds[types[index]]
+                tiles.append(cls.view(world, name, bool(flags[index] & SHADOW), self, index))
+            else:
+                tiles.append(border)
+        return tiles
+
+    def window(self, layer, left, top, width, height):
+        """
+        Returns a rectangle of a column, clipped to the grid, without copying it.
+
+        Args:
+            layer (str): The name of the column, e.g. "flags", "types" or "costs".
+            left (int): The first tile column of the rectangle.
+            top (int): The first tile row of the rectangle.
+            width (int): The width of the rectangle in tiles.
+            height (int): The height of the rectangle in tiles.
+
+        Returns:
+            list of tuple: (tile_x, tile_y, memoryview) for every row of the rectangle inside the grid, the memoryview
+                           holding the values of the row from tile_x on.
+        """
+        column = memoryview(getattr(self, layer))
+        first_x = max(left, 0)
+        last_x = min(left + width, self.width)
+        rows = []
+        if first_x >= last_x:
+            return rows
+        for tile_y in range(max(top, 0), min(top + height, self.height)):
+            start = tile_y * self.width
+            rows.append((first_x, tile_y, column[start + first_x:start + last_x]))
+        return rows
+
+    def region(self, layer, tile_x, tile_y, radius, shape="diamond"):
+        """
+        Returns the cells of a column around a tile, row by row, clipped to the grid, without copying them.
+
+        Args:
+            layer (str): The name of the column, e.g. "flags", "types" or "costs".
+            tile_x (int): The tile column of the center.
+            tile_y (int): The tile row of the center.
+            radius (int): The radius of the region in tiles.
+            shape (str): A key of SHAPES, "diamond" or "square". Defaults to "diamond".
+
+        Returns:
+            list of tuple: (tile_x, tile_y, memoryview) for every row of the region inside the grid, the memoryview
+                           holding the values of the row from tile_x on.
+        """
+        column = memoryview(getattr(self, layer))
+        rows = []
+        for dy, first_dx, last_dx in stencil(shape, radius):
+            y = tile_y + dy
+            if not 0 <= y < self.height:
+                continue
+            first_x = max(tile_x + first_dx, 0)
+            last_x = min(tile_x + last_dx + 1, self.width)
+            if first_x < last_x:
+                start = y * self.width
+                rows.append((first_x, y, column[start + first_x:start + last_x]))
+        return rows
+
+    def cells(self, tile_x, tile_y, radius, shape="diamond"):
+        """
+        Yields the flat indices of the cells around a tile that are inside the grid, row by row from the top one down.
+
+        Args:
+            tile_x (int): The tile column of the center.
+            tile_y (int): The tile row of the center.
+            radius (int): The radius of the region in tiles.
+            shape (str): A key of SHAPES, "diamond" or "square". Defaults to "diamond".
+
+        Yields:
+            int: The flat index of every cell of the region.
+        """
+        width = self.width
+        height = self.height
+        for dy, first_dx, last_dx in stencil(shape, radius):
+            y = tile_y + dy
+            if 0 <= y < height:
+                start = y * width
+                yield from range(start + max(tile_x + first_dx, 0), start + min(tile_x + last_dx + 1, width))
+
+    def find(self, tile_x, tile_y, radius, flag=0, name=None, shape="diamond"):
+        """
+        Yields the cells around a tile that have all the capabilities of flag and, if given, the name, row by row
+        from the top one down.
+
+        Args:
+            tile_x (int): The tile column of the center.
+            tile_y (int): The tile row of the center.
+            radius (int): The radius of the region in tiles.
+            flag (int): The capability bits the cells must all have, 0 for any cell. Defaults to 0.
+            name (str): The name the tiles must have, None for any name. Defaults to None.
+            shape (str): A key of SHAPES, "diamond" or "square". Defaults to "diamond".
+
+        Yields:
+            tuple: The (tile_x, tile_y) of every matching cell.
+        """
+        kinds = None
+        if name is not None:
+            kinds = set(kind for kind, (_, kind_name) in enumerate(self.kinds) if kind_name == name)
+            if not kinds:
+                return
+        types = self.types
+        for first_x, y, flags in self.region("flags", tile_x, tile_y, radius, shape):
+            start = y * self.width + first_x
+            for dx, cell_flags in enumerate(flags):
+                if cell_flags & flag == flag and (kinds is None or types[start + dx] in kinds):
+                    yield first_x + dx, y
+
+    def any(self, tile_x, tile_y, radius, flag=0, name=None, shape="diamond"):
+        """
+        Checks if any cell around a tile has all the capabilities of flag and, if given, the name.
+
+        Args:
+            tile_x (int): The tile column of the center.
+            tile_y (int): The tile row of the center.
+            radius (int): The radius of the region in tiles.
+            flag (int): The capability bits the cell must all have, 0 for any cell. Defaults to 0.
+            name (str): The name the tile must have, None for any name. Defaults to None.
+            shape (str): A key of SHAPES, "diamond" or "square". Defaults to "diamond".
+
+        Returns:
+            bool: True if there is such a cell in the region.
+        """
+        for _ in self.find(tile_x, tile_y, radius, flag, name, shape):
+            return True
+        return False
+
+    def indices(self, flag):
+        """
+        Returns the cells that have a capability, from the flags column alone.
+
+        Args:
+            flag (int): One of the bits, e.g. WALKABLE, or several of them or-ed together to match any.
+
+        Returns:
+            list of int: The flat indices of the cells, in row-major order.
+        """
+        return [index for index, flags in enumerate(self.flags) if flags & flag]
@@ -145,6 +145,12 @@ def run(fullscreen, world_size=64):
             debug_explorer_count =     "Explorers: " + str(game_world.explorer_count)
             debug_arborist_count =     "Arborists: " + str(game_world.arborist_count)
             debug_builder_count =     "Builders: " + str(game_world.builder_count)
+            path_cache = game_world.nav.cache
+            debug_path_cache_string =  ("Path cache: " + str(path_cache.hits) + " hits, " + str(path_cache.misses)
+                                        + " misses, " + str(path_cache.invalidations) + " invalidated")
+            path_service = game_world.path_service
+            debug_path_requests_string = ("Path requests: " + str(path_service.pending()) + " queued, "
+                                          + "average wait %.1f ms" % path_service.average_wait())
 
             day_string_surface = debug_font.render(debug_day_string, True, (255, 255, 255)) 
             day_status_surface = debug_font.render(debug_day_status_string, True, (255, 255, 255))
@@ -160,6 +166,8 @@ def run(fullscreen, world_size=64):
             explorer_count_s = debug_font.render(debug_explorer_count, True, LINE_COLOR[4])
             arborist_count_s = debug_font.render(debug_arborist_count, True, LINE_COLOR[2])
             builder_count_s = debug_font.render(debug_builder_count, True, LINE_COLOR[3])
+            path_cache_surface = debug_font.render(debug_path_cache_string, True, (255, 255, 255))
+            path_requests_surface = debug_font.render(debug_path_requests_string, True, (255, 255, 255))
 
             debug_string_positions = [
                 (10, 10),
@@ -176,6 +184,8 @@ def run(fullscreen, world_size=64):
                 (10, 340),
                 (10, 370),
                 (10, 400),
+                (10, 430),
+                (10, 460),
             ]
 
             surfaces = [
@@ -193,6 +203,8 @@ def run(fullscreen, world_size=64):
                 explorer_count_s,
                 arborist_count_s,
                 builder_count_s,
+                path_cache_surface,
+                path_requests_surface,
             ]
 
             # Draw rectangles and blit text surfaces
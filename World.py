@@ -13,8 +13,12 @@ import pygame
 import Buildings
 from GameEntity import GameEntity
 from aitools.BuildingDecision import building_decision
-from gametools import vector2, VoronoiMapGen, MidpointDisplacement, PertTools
+from gametools import vector2, VoronoiMapGen, MidpointDisplacement, PertTools, tile_images
+from gametools.spatial_hash import SpatialHash
 from configuration.world_configuration import DAYTIME_DURATION, NIGHTTIME_DURATION, DAY_DURATION, UTILIZE_LIMIT, DEBUG
+from configuration.world_configuration import FLOW_FIELD_MAX_COST, PATH_REQUEST_MODE, PATH_TICK_BUDGET_MS
+from configuration.world_configuration import PATH_POOL_WORKERS, RESOURCE_BUCKET_SIZE, RESERVATION_LEASE
+from configuration.world_configuration import FACILITY_BUCKET_SIZE
 import math
 import Tile
 import Clips
@@ -24,7 +28,13 @@ import Lumberjack
 import Angler
 import Explorer
 import Arborist
-from PathFinding import create_graph
+from FacilityIndex import FacilityIndex
+from PathFinding import create_nav_layers
+from Reservations import Reservations
+from ResourceIndex import ResourceIndex
+from TileGrid import TileGrid
+from navigation.flow_field import FlowFields
+from navigation.path_service import PathService
 
 
 class World(object):
@@ -76,6 +86,8 @@ class World(object):
 
         # Entities
         self.entities = {}
+        # The living entities by the tile they are on, for lookups around a location
+        self.entity_hash = SpatialHash(self.tile_size)
         self.buildings = {}
         self.entity_id = 0
         self.building_id = 0
@@ -88,11 +100,13 @@ class World(object):
         self.arborist_count = 0
         self.builder_count = 0
 
-        self.lumber_yard = []
-        self.barn = []
-        self.stonework = []
-        self.fish_market = []
-        self.rest_places = []
+        # The drop-off and rest locations of the buildings, the lists below are the ones of the index
+        self.facilities = FacilityIndex(self, FACILITY_BUCKET_SIZE)
+        self.lumber_yard = self.facilities.locations["lumber_yard"]
+        self.barn = self.facilities.locations["barn"]
+        self.stonework = self.facilities.locations["stonework"]
+        self.fish_market = self.facilities.locations["fish_market"]
+        self.rest_places = self.facilities.locations["rest_place"]
 
         # Related lists for farming works.
         self.fields = []
@@ -103,6 +117,8 @@ class World(object):
         # List for builders.
         self.building_list = []
         self.unfinished_buildings = []
+        # Builders in their Waiting state, kept up to date by the state itself
+        self.waiting_builders = set()
 
         self.fields_waiting_to_sow = []
         self.fields_waiting_to_water = []
@@ -120,11 +136,61 @@ class World(object):
                 has_found_starting_point = True
                 self.village_location = vector2.Vector2(starting_point.x * 32, starting_point.y * 32)
                 self.village_location_tile = copy.deepcopy(starting_point)
-        self.graph = create_graph(self)
+        # One navigation layer per movement profile, villagers walk on the land layer
+        self.nav_layers = create_nav_layers(self)
+        self.nav = self.nav_layers["land"]
+        # One flow field per shared destination (barns, markets, lumber yards, stoneworks and rest places)
+        self.flow_fields = FlowFields(self.nav, FLOW_FIELD_MAX_COST)
+        # Path searches requested by the villagers run outside of their update
+        self.path_service = PathService(self.nav_layers, mode=PATH_REQUEST_MODE, budget_ms=PATH_TICK_BUDGET_MS,
+                                        workers=PATH_POOL_WORKERS)
+        # Trees, stone, grass and shore by bucket, for villagers looking for the closest ones
+        self.resources = ResourceIndex(self, RESOURCE_BUCKET_SIZE)
+        # The tiles villagers are heading for or working on, so no two of them pursue the same one
+        self.reservations = Reservations(RESERVATION_LEASE)
 
         self.populate()
         self.clipper = Clips.Clips(self, screen_size)
 
+    def set_tile(self, tile_x, tile_y, new_tile):
+        """Replaces a tile of the tile array and updates the navigation data and the resource index around it.
+
+        Every code path that changes a tile after the world is created should go through here.
+
+        Args:
+            tile_x (int): The column of the tile.
+            tile_y (int): The row of the tile.
+            new_tile (Tile): The tile to put in place.
+
+        Returns:
+            None
+        """
+        tile_x = int(tile_x)
+        tile_y = int(tile_y)
+        self.tile_array[tile_y][tile_x] = new_tile
+        for nav in self.nav_layers.values():
+            changed = nav.update_tiles(((tile_x, tile_y),))
+            if changed and nav is self.nav:
+                self.flow_fields.update_tiles(changed)
+        self.resources.update_tile(tile_x, tile_y)
+
+    def is_reachable(self, start, goal, profile="land", snap=False):
+        """Checks if an entity can get from one position to another, without searching a path.
+
+        Args:
+            start (Vector2): The start position in world coordinates.
+            goal (Vector2): The goal position in world coordinates.
+            profile (str): The movement profile of the entity, "land" or "water". Defaults to "land".
+            snap (bool): Also accept a goal the profile can't use next to a reachable tile, see NavGrid.reachable.
+                         Defaults to False.
+
+        Returns:
+            bool: True if the navigation layer of the profile connects the two positions.
+        """
+        return self.nav_layers[profile].reachable((int(start.x // self.tile_size), int(start.y // self.tile_size)),
+                                                  (int(goal.x // self.tile_size), int(goal.y // self.tile_size)),
+                                                  snap)
+
     def new_world(self, array_size):
         """Creates a new world (including all entities)
 
@@ -142,7 +208,8 @@ class World(object):
                                             max_scalar=1.5, min_scalar=0.0)
 
         self.minimap_img = pygame.Surface((map_width, map_height))
-        self.tile_array = [[0 for tile_x in range(map_width)] for tile_y in range(map_height)]
+        # The tiles in columns, tile_array[tile_y][tile_x] still returns a Tile, tiles.at(tile_x, tile_y) checks bounds
+        self.tiles = self.tile_array = TileGrid(self, map_width, map_height)
         self.world_surface = pygame.Surface(self.world_size, pygame.HWSURFACE)
 
         do_hard_shadow = True
@@ -198,7 +265,6 @@ class World(object):
 
                 new_tile.location = vector2.Vector2(tile_x * self.tile_size, tile_y * self.tile_size)
 
-                new_tile.rect.topleft = new_tile.location
                 new_tile.color = color
 
                 alph = 220 - color
@@ -206,14 +272,11 @@ class World(object):
                     alph = 330 - color
                 new_tile.darkness = alph
 
-                subtle_shadow = pygame.Surface((self.tile_size, self.tile_size))
-                subtle_shadow.set_alpha(alph)
+                subtle_shadow = tile_images.get_shade(alph, (self.tile_size, self.tile_size))
 
-                if do_hard_shadow:
-                    hard_shadow = pygame.Surface((self.tile_size, self.tile_size))
-                    hard_shadow.set_alpha(128)
-                    if shaded:
-                        new_tile.img.blit(hard_shadow, (0, 0))
+                # The image is shared by all the tiles of its name, shaded tiles show the shadowed copy instead
+                if do_hard_shadow and shaded:
+                    new_tile.shadow = True
 
                 self.world_surface.blit(new_tile.img, new_tile.location)
                 self.world_surface.blit(subtle_shadow, new_tile.location)
@@ -403,6 +466,7 @@ class World(object):
         self.entities[self.entity_id] = entity
         entity.id = self.entity_id
         self.entity_id += 1
+        self.entity_hash.insert(entity)
         self.living_entities_count += 1
 
         if isinstance(entity, Farmer.Farmer):
@@ -440,29 +504,26 @@ class World(object):
                 new_bldg_tile = Tile.BuildingTile(self, "Cobble")
                 new_bldg_tile.location = vector2.Vector2(int(building.location.x) + tile_x,
                                                          int(building.location.y) + tile_y) * 32
-                new_bldg_tile.rect.topleft = new_bldg_tile.location
-                self.tile_array[int(building.location.y) + tile_y][int(building.location.x) + tile_x] = new_bldg_tile
+                self.set_tile(int(building.location.x) + tile_x, int(building.location.y) + tile_y, new_bldg_tile)
                 self.world_surface.blit(new_bldg_tile.img, new_bldg_tile.location)
         self.world_surface.blit(building.image, building.location * self.tile_size)
 
         if building is not None:
             # All gathering point deviates one tile by one tile to the upper left corner of the building.
+            gathering_point = building.location * self.tile_size + vector2.Vector2(self.tile_size, self.tile_size)
             if building.can_drop_wood:
-                self.lumber_yard.append(building.location * self.tile_size +
-                                        vector2.Vector2(self.tile_size, self.tile_size))
+                self.facilities.add("lumber_yard", gathering_point)
             if building.can_drop_crop:
-                self.barn.append(building.location * self.tile_size +
-                                 vector2.Vector2(self.tile_size, self.tile_size))
+                self.facilities.add("barn", gathering_point)
             if building.can_drop_fish:
-                self.fish_market.append(building.location * self.tile_size +
-                                        vector2.Vector2(self.tile_size, self.tile_size))
+                self.facilities.add("fish_market", gathering_point)
             if building.can_drop_stone:
-                self.stonework.append(building.location * self.tile_size +
-                                      vector2.Vector2(self.tile_size, self.tile_size))
+                self.facilities.add("stonework", gathering_point)
             if building.supports > 0:
-                self.rest_places.append(building.location * self.tile_size +
-                                        vector2.Vector2(self.tile_size, self.tile_size))
-        self.graph = create_graph(self)
+                self.facilities.add("rest_place", gathering_point)
+            if (building.can_drop_wood or building.can_drop_crop or building.can_drop_fish or building.can_drop_stone
+                    or building.supports > 0):
+                self.flow_fields.add_destination(int(building.location.x) + 1, int(building.location.y) + 1)
 
     def process(self, delta):
         """Runs through each entity and runs their process function.
@@ -476,6 +537,7 @@ class World(object):
 
         # time increment and day/night cycle
         self.time += delta
+        self.reservations.tick(delta)
         # if self.is_day and self.time > self.DAYTIME_DURATION:
         if self.is_day and self.time > DAYTIME_DURATION:
             self.is_day = False
@@ -489,6 +551,9 @@ class World(object):
                 if entity is not None:
                     entity.consume_func(entity)
 
+        # Pending path searches get their share of this frame
+        self.path_service.tick()
+
         for entity in self.entities.values():
             if entity is not None:
                 entity.process(delta)
@@ -529,12 +594,7 @@ class World(object):
                 # print("Farmer created")
                 print(image_string + " created")
 
-        is_builder_available = False
-
-        for entity in self.entities.values():
-            if entity is not None and isinstance(entity, Builder.Builder):
-                if isinstance(entity.brain.active_state, Builder.Waiting):
-                    is_builder_available = True
+        is_builder_available = len(self.waiting_builders) > 0
 
         if is_builder_available:
             next_building = building_decision(self)
@@ -604,27 +664,26 @@ class World(object):
             y_temp_2 = self.clipper.rect_view_h * self.clipper.b
             self.world_position.y = y_temp_1 + (y_temp_2 / 2)
 
-    def get_food_court(self, entity: GameEntity):
+    def get_food_court(self, entity: GameEntity, by_path=True):
         """Get the nearest food court for the given entity.
 
         Args:
             entity (GameEntity): The entity seeking food.
+            by_path (bool): True for the food court reached at the lowest path cost, False for the nearest one
+                            in a straight line, which is cheaper to find. Defaults to True.
 
         Returns:
             Vector2: The location of the nearest food court.
         """
-        food_court_candidates = []
-        if len(self.barn) == 0 and len(self.fish_market) == 0:
-            return None
         if self.fish > 0:
-            for market in self.fish_market:
-                food_court_candidates.append((market, market.get_distance_to(p=entity.location)))
+            kind = "fish_market"
         elif self.crop > 0:
-            for barn in self.barn:
-                food_court_candidates.append((barn, barn.get_distance_to(p=entity.location)))
-        food_court_candidates = sorted(food_court_candidates, key=lambda fc: fc[1])
-        if len(food_court_candidates) > 0:
-            return food_court_candidates[0][0]
+            kind = "barn"
+        else:
+            return None
+        if by_path:
+            return self.facilities.nearest_by_path(kind, entity)
+        return self.facilities.nearest(kind, entity.location)
 
     def get_barn(self, entity):
         """Get the nearest barn for the given entity.
@@ -635,13 +694,7 @@ class World(object):
         Returns:
             Vector2: The location of the nearest barn.
         """
-        barn_candidates = []
-        if len(self.barn) > 0:
-            for b in self.barn:
-                barn_candidates.append((b, b.get_distance_to(entity.location)))
-        barn_candidates = sorted(barn_candidates, key=lambda fm: fm[1])
-        if len(barn_candidates) > 0:
-            return barn_candidates[0][0]
+        return self.facilities.nearest_by_path("barn", entity)
 
     def get_stonework(self, entity):
         """Get the nearest stonework for the given entity.
@@ -652,13 +705,7 @@ class World(object):
         Returns:
             Vector2: The location of the nearest stonework.
         """
-        stone_candidates = []
-        if len(self.stonework) > 0:
-            for sw in self.stonework:
-                stone_candidates.append((sw, sw.get_distance_to(entity.location)))
-        stone_candidates = sorted(stone_candidates, key=lambda fm: fm[1])
-        if len(stone_candidates) > 0:
-            return stone_candidates[0][0]
+        return self.facilities.nearest_by_path("stonework", entity)
 
     def get_lumber_yard(self, entity):
         """Get the nearest lumber yard for the given entity.
@@ -669,13 +716,7 @@ class World(object):
         Returns:
             Vector2: The location of the nearest lumber yard.
         """
-        ly_candidates = []
-        if len(self.lumber_yard) > 0:
-            for ly in self.lumber_yard:
-                ly_candidates.append((ly, ly.get_distance_to(entity.location)))
-        ly_candidates = sorted(ly_candidates, key=lambda fm: fm[1])
-        if len(ly_candidates) > 0:
-            return ly_candidates[0][0]
+        return self.facilities.nearest_by_path("lumber_yard", entity)
 
     def get_fish_market(self, entity):
         """Get the nearest fish market for the given entity.
@@ -686,13 +727,7 @@ class World(object):
         Returns:
             Vector2: The location of the nearest fish market.
         """
-        fm_candidates = []
-        if len(self.fish_market) > 0:
-            for fm in self.fish_market:
-                fm_candidates.append((fm, fm.get_distance_to(entity.location)))
-        fm_candidates = sorted(fm_candidates, key=lambda fm: fm[1])
-        if len(fm_candidates) > 0:
-            return fm_candidates[0][0]
+        return self.facilities.nearest_by_path("fish_market", entity)
 
     def get_rest_place(self, entity):
         """Get the nearest rest place for the given entity.
@@ -703,13 +738,7 @@ class World(object):
         Returns:
             Vector2: The location of the nearest rest place.
         """
-        rest_candidates = []
-        if len(self.rest_places) > 0:
-            for rest in self.rest_places:
-                rest_candidates.append((rest, rest.get_distance_to(entity.location)))
-        rest_candidates = sorted(rest_candidates, key=lambda r: r[1])
-        if len(rest_candidates) > 0:
-            return rest_candidates[0][0]
+        return self.facilities.nearest_by_path("rest_place", entity)
 
 
     def get_next_building_pos(self, grid_upperleft_tile: vector2.Vector2, size_x, size_y):
@@ -749,30 +778,27 @@ class World(object):
             entity: The entity that is needed to be deleted, like the result of a death event.
 
         """
-        for entity in self.entities.values():
-            if entity is not None and entity == entity_to_delete:
-                # Debugging use only.
-                print("Entity:" + str(entity.id) + " has dead.")
-                self.entities[entity_to_delete.id] = None
-                self.living_entities_count -= 1
-                match entity:
-                    case Angler.Angler():
-                        self.angler_count -= 1
-                        break
-                    case Arborist.Arborist():
-                        self.arborist_count -= 1
-                        break
-                    case Builder.Builder():
-                        self.builder_count -= 1
-                        break
-                    case Explorer.Explorer():
-                        self.explorer_count -= 1
-                        break
-                    case Farmer.Farmer():
-                        self.farmer_count -= 1
-                        break
-                    case Lumberjack.Lumberjack():
-                        self.lumberjack_count -= 1
-                        break
+        entity = self.entities.get(entity_to_delete.id)
+        if entity is not None and entity == entity_to_delete:
+            # Debugging use only.
+            print("Entity:" + str(entity.id) + " has dead.")
+            self.entities[entity_to_delete.id] = None
+            self.entity_hash.remove(entity)
+            self.waiting_builders.discard(entity)
+            self.reservations.release_all(entity)
+            self.living_entities_count -= 1
+            match entity:
+                case Angler.Angler():
+                    self.angler_count -= 1
+                case Arborist.Arborist():
+                    self.arborist_count -= 1
+                case Builder.Builder():
+                    self.builder_count -= 1
+                case Explorer.Explorer():
+                    self.explorer_count -= 1
+                case Farmer.Farmer():
+                    self.farmer_count -= 1
+                case Lumberjack.Lumberjack():
+                    self.lumberjack_count -= 1
 
         del entity_to_delete
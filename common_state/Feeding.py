@@ -35,6 +35,8 @@ class Feeding(State):
         This sets the villager's destination to the food court in the village.
         """
         print("Feeding: " + str(self.entity.id) + " at " + str(self.entity.destination))
+        # A villager going to eat leaves the tile it was heading for to the others
+        self.entity.world.reservations.release_all(self.entity)
         self.entity.destination = copy.deepcopy(self.entity.world.get_food_court(self.entity))
 
     def do_actions(self):
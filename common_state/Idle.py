@@ -35,6 +35,8 @@ class Idle(State):
         If a valid destination is found, the villager moves towards it.
         """
         self.rested = False
+        # A resting villager leaves the tile it was heading for to the others
+        self.entity.world.reservations.release_all(self.entity)
         # print("Entity id " + str(self.entity.id) + " has entered idle state.")
         # self.Builder.destination = self.Builder.IdleLocation
         destination = get_idle_destination(self.entity)
@@ -12,3 +12,6 @@ WORKING_TIME_START = 0
 WORKING_TIME_END = 30
 
 ANGLER_RETURN_PROBABILITY = 0.75
+
+# Villagers looking for a resource pick one of this many closest reachable tiles, so they don't all head for the same
+RESOURCE_CHOICES = 4
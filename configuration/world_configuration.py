@@ -20,6 +20,45 @@ WORLD_TILE_SIZE = 32
 # FPS Target
 FPS = 60
 
+# Path cache: side length (in tiles) of the regions used for invalidation, and the maximum number of cached paths
+PATH_CACHE_REGION_SIZE = 16
+PATH_CACHE_CAPACITY = 1024
+
+# Side length in tiles of the buckets of the resource index (trees, stone, grass, shore)
+RESOURCE_BUCKET_SIZE = 8
+
+# Side length in tiles of the buckets the nearest lumber yard, barn, stonework, fish market and rest place are cached for
+FACILITY_BUCKET_SIZE = 8
+
+# Seconds of game time a villager's claim on its target tile lasts unless renewed
+RESERVATION_LEASE = 10.0
+
+# Flow fields towards shared destinations only cover tiles up to this path cost away from the destination
+FLOW_FIELD_MAX_COST = 150
+# Number of tiles of a flow field a villager follows ahead at once, smoothed into straight segments
+FLOW_FIELD_LOOKAHEAD = 16
+
+# Hierarchical path finding: cluster side length in tiles, and the octile distance (in tiles) from which a query
+# is planned over the clusters instead of with a flat A* search
+HPA_CLUSTER_SIZE = 16
+HPA_MIN_DISTANCE = 40
+
+# Pathfinding engine of the navigation layers: "grid" (A* on the cost array), "networkx" (the original graph engine)
+# or "scipy" (scipy.sparse.csgraph, needs scipy). python -m navigation.backend_benchmark compares them.
+PATH_BACKEND = "grid"
+
+# Landmarks of the ALT heuristic per navigation layer, 0 turns it off. Their distance tables are built in the spare
+# time of the frames and rebuilt the same way after a tile got cheaper.
+ALT_LANDMARKS = 8
+
+# How villagers' path requests are searched: "sliced" suspends and resumes the searches across frames within
+# PATH_TICK_BUDGET_MS milliseconds per frame, "thread" runs them on a worker thread, "pool" sends the requests of a
+# frame as one batch to PATH_POOL_WORKERS worker processes (0 for one per core), and "frame" searches right away
+# within the frame, e.g. when debugging.
+PATH_REQUEST_MODE = "sliced"
+PATH_TICK_BUDGET_MS = 4.0
+PATH_POOL_WORKERS = 0
+
 # Debug flag
 DEBUG = True
 
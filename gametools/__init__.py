@@ -1 +1 @@
-__all__ = ['vector2', 'util', 'VoronoiMapGen', 'ImageLoader', 'ImageFuncs','ani']
+__all__ = ['vector2', 'util', 'VoronoiMapGen', 'ImageLoader', 'ImageFuncs','ani', 'spatial_hash', 'tile_images']
@@ -0,0 +1,198 @@
+"""
+CS5150 Game AI Final Project
+Team Member: Jianyan Chen, Ruidi Huang, Xin Qi
+Aug 2024
+
+This program defines the SpatialHash class, a uniform grid of buckets that keeps track of which entities are on
+which tile, so the entities near a location are found by looking at a few buckets instead of every entity.
+"""
+
+import math
+
+
+class SpatialHash(object):
+    """
+    Buckets of entities keyed by their tile. An entity is moved to another bucket when it crosses onto another tile.
+
+    Attributes:
+        tile_size (int): The side length of a tile, and of a bucket, in pixels.
+        buckets (dict): Maps a (tile_x, tile_y) tuple to a dict of the entities on it, keyed by their id().
+        keys (dict): Maps the id() of every entity in the hash to the key of its bucket.
+    """
+    def __init__(self, tile_size):
+        """
+        Initializes an empty hash.
+
+        Args:
+            tile_size (int): The side length of a tile in pixels.
+        """
+        self.tile_size = tile_size
+        self.buckets = {}
+        self.keys = {}
+
+    def __len__(self):
+        return len(self.keys)
+
+    def key(self, x, y):
+        """
+        Returns the key of the bucket holding a location.
+
+        Args:
+            x (float): The x coordinate in pixels.
+            y (float): The y coordinate in pixels.
+
+        Returns:
+            tuple: The (tile_x, tile_y) of the location.
+        """
+        return int(math.floor(x / self.tile_size)), int(math.floor(y / self.tile_size))
+
+    def insert(self, entity):
+        """
+        Adds an entity to the bucket of its location, or moves it there if it is in the hash already.
+
+        Args:
+            entity (GameEntity): The entity.
+        """
+        key = self.key(entity.location.x, entity.location.y)
+        old_key = self.keys.get(id(entity))
+        if old_key == key:
+            return
+        if old_key is not None:
+            self._discard(entity, old_key)
+        self.keys[id(entity)] = key
+        bucket = self.buckets.get(key)
+        if bucket is None:
+            bucket = self.buckets[key] = {}
+        bucket[id(entity)] = entity
+
+    def remove(self, entity):
+        """
+        Removes an entity from the hash, if it is in it.
+
+        Args:
+            entity (GameEntity): The entity.
+        """
+        key = self.keys.pop(id(entity), None)
+        if key is not None:
+            self._discard(entity, key)
+
+    def _discard(self, entity, key):
+        """
+        Takes an entity out of a bucket, dropping the bucket once it is empty.
+
+        Args:
+            entity (GameEntity): The entity.
+            key (tuple): The key of the bucket.
+        """
+        bucket = self.buckets[key]
+        del bucket[id(entity)]
+        if not bucket:
+            del self.buckets[key]
+
+    def at(self, tile_x, tile_y):
+        """
+        Returns the entities on a tile.
+
+        Args:
+            tile_x (int): The tile column.
+            tile_y (int): The tile row.
+
+        Returns:
+            list of GameEntity: The entities on the tile, in the order they arrived.
+        """
+        bucket = self.buckets.get((tile_x, tile_y))
+        if bucket is None:
+            return []
+        return list(bucket.values())
+
+    def in_radius(self, location, radius):
+        """
+        Returns the entities whose location is closer than a radius to a location. Only the buckets overlapping
+        the square around the circle are looked at.
+
+        Args:
+            location (Vector2): The center of the circle in world coordinates.
+            radius (float): The radius in pixels.
+
+        Returns:
+            list of GameEntity: The entities inside the circle, nearest first.
+        """
+        x = location.x
+        y = location.y
+        left, top = self.key(x - radius, y - radius)
+        right, bottom = self.key(x + radius, y + radius)
+        found = []
+        for tile_y in range(top, bottom + 1):
+            for tile_x in range(left, right + 1):
+                bucket = self.buckets.get((tile_x, tile_y))
+                if bucket is None:
+                    continue
+                for entity in bucket.values():
+                    distance = (entity.location.x - x) ** 2 + (entity.location.y - y) ** 2
+                    if distance < radius * radius:
+                        found.append((distance, entity))
+        found.sort(key=lambda item: item[0])
+        return [entity for _, entity in found]
+
+    def nearest(self, location, max_radius, accept=None):
+        """
+        Finds the entity closest to a location, looking at rings of buckets further and further out,
+        and stopping as soon as no bucket of the next ring can hold anything closer.
+
+        Args:
+            location (Vector2): The location in world coordinates.
+            max_radius (float): The largest distance in pixels to look at.
+            accept (function): Called with an entity, only entities it returns True for are found. Defaults to None.
+
+        Returns:
+            GameEntity: The nearest entity, or None if there is none within max_radius.
+        """
+        tile_size = self.tile_size
+        x = location.x
+        y = location.y
+        center_x, center_y = self.key(x, y)
+        best = None
+        best_distance = max_radius * max_radius
+        ring = 0
+        # Every bucket of ring n is at least (n - 1) tiles away from the location, and ring 0 holds the location
+        while (max(ring - 1, 0) * tile_size < max_radius
+               and (max(ring - 1, 0) * tile_size) ** 2 < best_distance):
+            # Once a ring has more tiles than the hash has buckets, looking at every bucket is cheaper
+            every_bucket = 8 * ring > len(self.buckets)
+            tiles = list(self.buckets) if every_bucket else self._ring(center_x, center_y, ring)
+            for tile in tiles:
+                bucket = self.buckets.get(tile)
+                if bucket is None:
+                    continue
+                for entity in bucket.values():
+                    distance = (entity.location.x - x) ** 2 + (entity.location.y - y) ** 2
+                    if distance < best_distance and (accept is None or accept(entity)):
+                        best = entity
+                        best_distance = distance
+            if every_bucket:
+                break
+            ring += 1
+        return best
+
+    @staticmethod
+    def _ring(center_x, center_y, ring):
+        """
+        Yields the tiles of the square ring at a Chebyshev distance from a center tile.
+
+        Args:
+            center_x (int): The tile column of the center.
+            center_y (int): The tile row of the center.
+            ring (int): The distance of the ring in tiles, 0 for the center alone.
+
+        Yields:
+            tuple: The (tile_x, tile_y) of every tile of the ring.
+        """
+        if ring == 0:
+            yield center_x, center_y
+            return
+        for tile_x in range(center_x - ring, center_x + ring + 1):
+            yield tile_x, center_y - ring
+            yield tile_x, center_y + ring
+        for tile_y in range(center_y - ring + 1, center_y + ring):
+            yield center_x - ring, tile_y
+            yield center_x + ring, tile_y
@@ -0,0 +1,69 @@
+"""
+CS5150 Game AI Final Project
+Team Member: Jianyan Chen, Ruidi Huang, Xin Qi
+Aug 2024
+
+This program contains the image cache of the tiles. Every tile image is loaded and converted once per process and
+then shared by all the tiles of that name, and so are the shaded variants and the translucent overlays the world
+darkens tiles with. The shared surfaces must never be drawn on, tiles that need a different look ask for a variant.
+"""
+
+import pygame
+
+# Alpha of the hard shadow cast on the tiles behind a ridge
+HARD_SHADOW_ALPHA = 128
+
+# Maps (tile name, shadowed) to the converted image
+_images = {}
+# Maps (alpha, size) to a black overlay of that alpha
+_shades = {}
+
+
+def get_image(tile_name, shadow=False):
+    """
+    Returns the shared image of a tile, loading it on first use.
+
+    Args:
+        tile_name (str): The name of the tile, the file name in Images/Tiles without its extension.
+        shadow (bool): True for the variant darkened by a hard shadow. Defaults to False.
+
+    Returns:
+        pygame.Surface: The image, shared with every tile of that name. Don't draw on it.
+    """
+    key = (tile_name, shadow)
+    image = _images.get(key)
+    if image is None:
+        if shadow:
+            image = get_image(tile_name).copy()
+            image.blit(get_shade(HARD_SHADOW_ALPHA, image.get_size()), (0, 0))
+        else:
+            image = pygame.image.load("Images/Tiles/" + tile_name + ".png").convert()
+        _images[key] = image
+    return image
+
+
+def get_shade(alpha, size):
+    """
+    Returns a shared black overlay that darkens what it is blitted on by an alpha.
+
+    Args:
+        alpha (float): The alpha of the overlay, 0 or less leaves the tile as it is.
+        size (tuple): The (width, height) of the overlay in pixels.
+
+    Returns:
+        pygame.Surface: The overlay, shared with every caller asking for the same alpha and size. Don't draw on it.
+    """
+    # pygame drops the fraction of an alpha and clamps it, so do the same for the key
+    key = (min(max(int(alpha), 0), 255), tuple(size))
+    shade = _shades.get(key)
+    if shade is None:
+        shade = pygame.Surface(key[1])
+        shade.set_alpha(key[0])
+        _shades[key] = shade
+    return shade
+
+
+def clear():
+    """Forgets every cached surface, e.g. after the display mode changed and the images need converting again."""
+    _images.clear()
+    _shades.clear()
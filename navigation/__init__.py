@@ -0,0 +1,2 @@
+__all__ = ['astar', 'csgraph_backend', 'flow_field', 'hpa', 'jps', 'landmarks', 'nav_grid', 'nx_backend',
+           'path_backend', 'path_cache', 'path_pool', 'path_service', 'profiles', 'regions', 'smoothing']
@@ -0,0 +1,275 @@
+"""
+CS5150 Game AI Final Project
+Team Member: Jianyan Chen, Ruidi Huang, Xin Qi
+Aug 2024
+
+This program contains the A* search that runs directly on a flat, row-major array of tile costs.
+Nodes are plain integer indices (tile_y * width + tile_x), so no graph object has to be built for the world.
+"""
+
+import heapq
+
+# Edge weight factors, identical to the ones of the networkx graph in navigation/nx_backend.py.
+ORTHOGONAL_WEIGHT = 0.5
+DIAGONAL_WEIGHT = 0.707
+
+# Octile heuristic factor for the diagonal part of the distance (a diagonal step costs 2 * 0.707 per unit cost).
+OCTILE_DIAGONAL = 2 * DIAGONAL_WEIGHT - 1
+
+# (dx, dy, weight) of the 8 neighbours: W, E, N, S, NW, SW, NE, SE
+NEIGHBOURS = ((-1, 0, ORTHOGONAL_WEIGHT), (1, 0, ORTHOGONAL_WEIGHT),
+              (0, -1, ORTHOGONAL_WEIGHT), (0, 1, ORTHOGONAL_WEIGHT),
+              (-1, -1, DIAGONAL_WEIGHT), (-1, 1, DIAGONAL_WEIGHT),
+              (1, -1, DIAGONAL_WEIGHT), (1, 1, DIAGONAL_WEIGHT))
+
+
+def octile(x1, y1, x2, y2, min_cost=1):
+    """
+    Octile distance between two tiles, scaled by the cheapest tile cost so it never overestimates.
+
+    Args:
+        x1, y1 (int): The first tile.
+        x2, y2 (int): The second tile.
+        min_cost (int): The lowest tile cost in the grid.
+
+    Returns:
+        float: The estimated cost between the two tiles.
+    """
+    dx = abs(x1 - x2)
+    dy = abs(y1 - y2)
+    if dx > dy:
+        return min_cost * (dx + OCTILE_DIAGONAL * dy)
+    return min_cost * (dy + OCTILE_DIAGONAL * dx)
+
+
+def reconstruct(came_from, start, goal):
+    """
+    Walks the came_from links back from the goal.
+
+    Args:
+        came_from (dict): Maps a node index to the index it was reached from.
+        start (int): The start node index.
+        goal (int): The goal node index.
+
+    Returns:
+        list of int: The node indices from start (exclusive) to goal (inclusive).
+    """
+    path = []
+    node = goal
+    while node != start:
+        path.append(node)
+        node = came_from[node]
+    path.reverse()
+    return path
+
+
+class AStarSearch(object):
+    """
+    An A* search over an 8-connected grid of tile costs that can be suspended and resumed,
+    so a long search can be spread over several frames.
+    The edge between two tiles weighs 0.5 * (cost_a + cost_b), or 0.707 * (cost_a + cost_b) diagonally.
+    Tiles of cost 0 are blocked and never entered.
+
+    Attributes:
+        costs (array.array): Row-major tile costs, len(costs) == width * height.
+        width (int): The grid width in tiles.
+        start (int): The start node index.
+        goal (int): The goal node index.
+        min_cost (int): The lowest tile cost in the grid, used to keep the heuristic admissible.
+        bounds (tuple): The (min_x, min_y, max_x, max_y) window, max exclusive, the search stays inside.
+        landmarks (list of tuple): (distance table, cost from the landmark to the goal) pairs of the landmark
+                                   heuristic, empty to only use the octile distance.
+        done (bool): True once the search has finished.
+        path (list of int): The node indices from start (exclusive) to goal (inclusive) once done, or None if there
+                            is no path.
+        expanded (int): The number of nodes expanded so far.
+    """
+    def __init__(self, costs, width, height, start, goal, min_cost=1, bounds=None, landmarks=None):
+        """
+        Initializes the search, no node is expanded until step is called.
+
+        Args:
+            costs (array.array): Row-major tile costs, len(costs) == width * height.
+            width (int): The grid width in tiles.
+            height (int): The grid height in tiles.
+            start (int): The start node index.
+            goal (int): The goal node index.
+            min_cost (int): The lowest tile cost in the grid. Defaults to 1.
+            bounds (tuple): Optional (min_x, min_y, max_x, max_y) window, max exclusive, the search stays inside.
+            landmarks (list of tuple): Optional landmark tables, see LandmarkTable.heuristic_tables.
+        """
+        self.costs = costs
+        self.width = width
+        self.start = start
+        self.goal = goal
+        self.min_cost = min_cost
+        self.bounds = bounds if bounds is not None else (0, 0, width, height)
+        self.landmarks = landmarks or []
+        self.came_from = {}
+        self.g_score = {start: 0.0}
+        self.open_heap = [(0.0, 0.0, start)]
+        self.expanded = 0
+        self.done = start == goal
+        self.path = [] if self.done else None
+
+    def step(self, budget=None):
+        """
+        Expands nodes until the search finishes or the budget runs out.
+
+        Args:
+            budget (int): The maximum number of nodes to expand, None for no limit.
+
+        Returns:
+            bool: True if the search has finished.
+        """
+        if self.done:
+            return True
+        costs = self.costs
+        width = self.width
+        goal = self.goal
+        min_cost = self.min_cost
+        min_x, min_y, max_x, max_y = self.bounds
+        goal_x = goal % width
+        goal_y = goal // width
+        diagonal = OCTILE_DIAGONAL * min_cost
+        came_from = self.came_from
+        g_score = self.g_score
+        open_heap = self.open_heap
+        push = heapq.heappush
+        pop = heapq.heappop
+        infinity = float("inf")
+        landmarks = self.landmarks
+        remaining = -1 if budget is None else budget
+
+        while open_heap and remaining != 0:
+            _, current_g, current = pop(open_heap)
+            if current == goal:
+                self.done = True
+                self.path = reconstruct(came_from, self.start, goal)
+                return True
+            # A node can sit in the heap several times, skip the outdated entries
+            if current_g > g_score[current]:
+                continue
+            remaining -= 1
+            self.expanded += 1
+            cy, cx = divmod(current, width)
+            current_cost = costs[current]
+
+            for dx, dy, weight in NEIGHBOURS:
+                nx = cx + dx
+                ny = cy + dy
+                if nx < min_x or ny < min_y or nx >= max_x or ny >= max_y:
+                    continue
+                neighbour = ny * width + nx
+                neighbour_cost = costs[neighbour]
+                if not neighbour_cost:
+                    continue
+                tentative_g = current_g + weight * (current_cost + neighbour_cost)
+                if tentative_g < g_score.get(neighbour, infinity):
+                    g_score[neighbour] = tentative_g
+                    came_from[neighbour] = current
+                    # Octile heuristic, inlined from octile() as this is the hot loop
+                    hx = nx - goal_x if nx > goal_x else goal_x - nx
+                    hy = ny - goal_y if ny > goal_y else goal_y - ny
+                    if hx > hy:
+                        h = min_cost * hx + diagonal * hy
+                    else:
+                        h = min_cost * hy + diagonal * hx
+                    # The landmarks know about the expensive terrain between the tile and the goal
+                    for table, goal_distance in landmarks:
+                        distance = table[neighbour]
+                        estimate = goal_distance - distance if goal_distance > distance else distance - goal_distance
+                        if estimate > h:
+                            h = estimate
+                    push(open_heap, (tentative_g + h, tentative_g, neighbour))
+
+        if not open_heap:
+            self.done = True
+        return self.done
+
+
+def astar(costs, width, height, start, goal, min_cost=1, bounds=None, landmarks=None):
+    """
+    A* search over an 8-connected grid of tile costs, run to the end in one go.
+
+    Args:
+        costs (array.array): Row-major tile costs, len(costs) == width * height.
+        width (int): The grid width in tiles.
+        height (int): The grid height in tiles.
+        start (int): The start node index.
+        goal (int): The goal node index.
+        min_cost (int): The lowest tile cost in the grid, used to keep the heuristic admissible.
+        bounds (tuple): Optional (min_x, min_y, max_x, max_y) window, max exclusive, the search stays inside.
+        landmarks (list of tuple): Optional landmark tables, see LandmarkTable.heuristic_tables.
+
+    Returns:
+        list of int: The node indices from start (exclusive) to goal (inclusive), or None if there is no path.
+    """
+    search = AStarSearch(costs, width, height, start, goal, min_cost, bounds, landmarks)
+    search.step()
+    return search.path
+
+
+def nearest_goal(costs, width, height, start, goals, min_cost=1):
+    """
+    A* search towards several goals at once, it stops at the goal that is the cheapest to reach.
+    The heuristic is the octile distance to the closest goal, so it never overestimates either.
+
+    Args:
+        costs (array.array): Row-major tile costs, len(costs) == width * height.
+        width (int): The grid width in tiles.
+        height (int): The grid height in tiles.
+        start (int): The start node index.
+        goals (iterable of int): The goal node indices.
+        min_cost (int): The lowest tile cost in the grid, used to keep the heuristic admissible.
+
+    Returns:
+        tuple: (goal, path), the reached goal index and the node indices from start (exclusive) to it (inclusive),
+               or (-1, None) if no goal can be reached.
+    """
+    goals = set(goals)
+    if start in goals:
+        return start, []
+    if not goals:
+        return -1, None
+    targets = [(goal % width, goal // width) for goal in goals]
+    diagonal = OCTILE_DIAGONAL * min_cost
+    came_from = {}
+    g_score = {start: 0.0}
+    open_heap = [(0.0, 0.0, start)]
+    push = heapq.heappush
+    pop = heapq.heappop
+    infinity = float("inf")
+
+    while open_heap:
+        _, current_g, current = pop(open_heap)
+        if current in goals:
+            return current, reconstruct(came_from, start, current)
+        if current_g > g_score[current]:
+            continue
+        cy, cx = divmod(current, width)
+        current_cost = costs[current]
+
+        for dx, dy, weight in NEIGHBOURS:
+            nx = cx + dx
+            ny = cy + dy
+            if nx < 0 or ny < 0 or nx >= width or ny >= height:
+                continue
+            neighbour = ny * width + nx
+            neighbour_cost = costs[neighbour]
+            if not neighbour_cost:
+                continue
+            tentative_g = current_g + weight * (current_cost + neighbour_cost)
+            if tentative_g < g_score.get(neighbour, infinity):
+                g_score[neighbour] = tentative_g
+                came_from[neighbour] = current
+                h = infinity
+                for goal_x, goal_y in targets:
+                    hx = nx - goal_x if nx > goal_x else goal_x - nx
+                    hy = ny - goal_y if ny > goal_y else goal_y - ny
+                    estimate = min_cost * hx + diagonal * hy if hx > hy else min_cost * hy + diagonal * hx
+                    if estimate < h:
+                        h = estimate
+                push(open_heap, (tentative_g + h, tentative_g, neighbour))
+
+    return -1, None
@@ -0,0 +1,101 @@
+"""
+CS5150 Game AI Final Project
+Team Member: Jianyan Chen, Ruidi Huang, Xin Qi
+Aug 2024
+
+This program benchmarks the path backends on the land layer of maps generated the same way as World.new_world:
+build time including precomputations, memory held after the build, and the latency of find_path and find_nearest queries.
+Run it from the project root: python -m navigation.backend_benchmark [map size] [number of queries] [seed]
+"""
+
+import random
+import sys
+import time
+import tracemalloc
+from array import array
+
+from configuration.world_configuration import HPA_MIN_DISTANCE
+from navigation.benchmark import generate_costs
+from navigation.path_backend import BACKENDS, get_backend
+from navigation.profiles import BLOCKED
+
+# The cost generate_costs gives water, which the land layer blocks
+WATER_COST = 100
+
+# Facilities find_nearest picks from per query, about as many as a grown village has of one kind
+NEAREST_GOALS = 5
+
+
+def build(backend, size, costs, query):
+    """
+    Builds a backend and everything it precomputes, as the world would before villagers start asking.
+
+    Args:
+        backend (type): The PathBackend subclass.
+        size (int): The side length of the map in tiles.
+        costs (array.array): Row-major tile costs, copied for the backend.
+        query (tuple): A (start, goal) pair of flat indices, searched once for the backends that build lazily.
+
+    Returns:
+        PathBackend: The built backend.
+    """
+    nav = backend(size, size, array('i', costs))
+    nav.warm(float("inf"))
+    start, goal = query
+    nav.find_path((start % size, start // size), (goal % size, goal // size))
+    return nav
+
+
+def run(size=128, queries=50, seed=1):
+    """
+    Builds every available backend on the same map, runs the same random queries on each and prints the results.
+
+    Args:
+        size (int): The side length of the map in tiles. Defaults to 128.
+        queries (int): The number of queries of each kind. Defaults to 50.
+        seed (int): The random seed of the map and of the queries. Defaults to 1.
+    """
+    land = array('i', [BLOCKED if cost == WATER_COST else cost for cost in generate_costs(size, seed)])
+    rng = random.Random(seed)
+    walkable = [index for index in range(size * size) if land[index] == 1]
+    pairs = [(rng.choice(walkable), rng.choice(walkable)) for _ in range(queries)]
+    groups = [(rng.choice(walkable), [rng.choice(walkable) for _ in range(NEAREST_GOALS)]) for _ in range(queries)]
+    print("Map %dx%d, %d%% of the tiles walkable, %d queries" %
+          (size, size, 100 * sum(1 for cost in land if cost) // len(land), queries))
+    print("The grid backend answers trips of %d tiles and more with the first part of an HPA* plan" % HPA_MIN_DISTANCE)
+    print("%-9s %10s %10s %14s %14s" % ("backend", "build ms", "memory MB", "path ms/query", "nearest ms/query"))
+
+    for name in BACKENDS:
+        try:
+            backend = get_backend(name)
+        except ImportError as error:
+            print("%-9s skipped, %s" % (name, error))
+            continue
+        start_time = time.perf_counter()
+        nav = build(backend, size, land, pairs[0])
+        build_time = time.perf_counter() - start_time
+        # Tracing slows the build down a lot, so memory is measured on a second build
+        tracemalloc.start()
+        traced = build(backend, size, land, pairs[0])
+        memory = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        del traced
+
+        start_time = time.perf_counter()
+        for start, goal in pairs:
+            # A fresh cache for every query, only the searches are timed
+            nav.cache.clear()
+            nav.find_path((start % size, start // size), (goal % size, goal // size))
+        path_time = time.perf_counter() - start_time
+
+        start_time = time.perf_counter()
+        for start, goals in groups:
+            nav.find_nearest((start % size, start // size), [(goal % size, goal // size) for goal in goals])
+        nearest_time = time.perf_counter() - start_time
+        print("%-9s %10.1f %10.1f %14.2f %14.2f" % (name, build_time * 1000, memory / 1048576.,
+                                                      path_time * 1000 / queries, nearest_time * 1000 / queries))
+
+
+if __name__ == "__main__":
+    arguments = [int(argument) for argument in sys.argv[1:4]]
+    run(*arguments)
@@ -0,0 +1,156 @@
+"""
+CS5150 Game AI Final Project
+Team Member: Jianyan Chen, Ruidi Huang, Xin Qi
+Aug 2024
+
+This program benchmarks the grid searches on maps generated the same way as World.new_world.
+Run it from the project root: python -m navigation.benchmark [map size] [number of queries] [seed] [landmarks]
+"""
+
+import random
+import sys
+import time
+from array import array
+
+from gametools import VoronoiMapGen
+from navigation.astar import AStarSearch, octile
+from navigation.jps import JumpGrid, jps
+from navigation.landmarks import LandmarkTable
+from navigation.regions import RegionMap
+
+
+def height_cost(color):
+    """
+    Returns the cost of the tile World.new_world places for a height value.
+
+    Args:
+        color (float): The height value of the generated map.
+
+    Returns:
+        int: The tile cost: water 100, stone 3, snow 10, everything else 1.
+    """
+    if color < 110:
+        return 100
+    if 220 > color >= 190:
+        return 3
+    if color >= 220:
+        return 10
+    return 1
+
+
+def generate_costs(size, seed=None):
+    """
+    Generates the tile costs of a square map without creating any tiles or surfaces.
+
+    Args:
+        size (int): The side length of the map in tiles.
+        seed (int): The random seed of the map. Defaults to None.
+
+    Returns:
+        array.array: Row-major tile costs of length size * size.
+    """
+    if seed is not None:
+        random.seed(seed)
+    map_generator = VoronoiMapGen.mapGen()
+    vor_map = map_generator.radial_drop(map_generator.negative(map_generator.reallyCoolFull((size, size), num_p=23)),
+                                        max_scalar=1.5, min_scalar=0.0)
+    # vor_map is indexed [tile_x][tile_y]
+    return array('i', [height_cost(vor_map[tile_x][tile_y]) for tile_y in range(size) for tile_x in range(size)])
+
+
+def path_cost(costs, width, start, path):
+    """
+    Sums the edge weights along a path.
+
+    Args:
+        costs (array.array): Row-major tile costs.
+        width (int): The grid width in tiles.
+        start (int): The start node index.
+        path (list of int): The node indices after the start.
+
+    Returns:
+        float: The cost of the path.
+    """
+    total = 0.0
+    previous = start
+    for node in path:
+        straight = previous % width == node % width or previous // width == node // width
+        total += (0.5 if straight else 0.707) * (costs[previous] + costs[node])
+        previous = node
+    return total
+
+
+def expand_count(costs, size, start, goal, min_cost, landmarks=None):
+    """
+    Runs an A* search and counts the nodes it expands.
+
+    Args:
+        costs (array.array): Row-major tile costs.
+        size (int): The side length of the map in tiles.
+        start (int): The start node index.
+        goal (int): The goal node index.
+        min_cost (int): The lowest tile cost.
+        landmarks (LandmarkTable): The landmark heuristic to use, None for the octile distance only.
+
+    Returns:
+        tuple: (path, number of expanded nodes).
+    """
+    tables = landmarks.heuristic_tables(goal) if landmarks is not None else None
+    search = AStarSearch(costs, size, size, start, goal, min_cost, landmarks=tables)
+    search.step()
+    return search.path, search.expanded
+
+
+def run(size=128, queries=50, seed=1, landmark_count=8):
+    """
+    Times the A*, A* with landmarks (ALT) and Jump Point searches on the same random queries of a generated map
+    and prints the results. Starts and goals are picked on tiles of cost 1, where villagers walk.
+
+    Args:
+        size (int): The side length of the map in tiles. Defaults to 128.
+        queries (int): The number of start and goal pairs. Defaults to 50.
+        seed (int): The random seed of the map and of the queries. Defaults to 1.
+        landmark_count (int): The number of landmarks of the ALT search. Defaults to 8.
+    """
+    costs = generate_costs(size, seed)
+    min_cost = max(1, min(costs))
+    rng = random.Random(seed)
+    land = [index for index in range(size * size) if costs[index] == 1]
+    pairs = [(rng.choice(land), rng.choice(land)) for _ in range(queries)]
+
+    start_time = time.perf_counter()
+    jumps = JumpGrid(costs, size, size)
+    print("Map %dx%d, %d%% of the tiles cost 1, %d%% are uniform, %d queries" %
+          (size, size, 100 * len(land) // len(costs), 100 * jumps.mask.count(1) // len(costs), queries))
+    print("JPS jump data built in %.1f ms" % ((time.perf_counter() - start_time) * 1000))
+    start_time = time.perf_counter()
+    landmarks = LandmarkTable(costs, size, size, RegionMap(costs, size, size), landmark_count)
+    landmarks.warm()
+    print("%d landmark tables built in %.1f ms" % (len(landmarks.tables), (time.perf_counter() - start_time) * 1000))
+
+    results = {}
+    for name, search in (("astar", lambda s, g: expand_count(costs, size, s, g, min_cost)),
+                         ("alt", lambda s, g: expand_count(costs, size, s, g, min_cost, landmarks)),
+                         ("jps", lambda s, g: (jps(costs, size, size, s, g, min_cost, jumps), 0))):
+        start_time = time.perf_counter()
+        answers = [search(start, goal) for start, goal in pairs]
+        elapsed = time.perf_counter() - start_time
+        results[name] = [path for path, _ in answers]
+        expanded = sum(count for _, count in answers) / queries
+        print("%-6s %8.1f ms total %8.2f ms per query %9s expanded per query" %
+              (name, elapsed * 1000, elapsed * 1000 / queries, "%.0f" % expanded if expanded else "-"))
+
+    worse = {"alt": 0, "jps": 0}
+    for index, (start, goal) in enumerate(pairs):
+        best = path_cost(costs, size, start, results["astar"][index])
+        for name in worse:
+            if best + 1e-6 < path_cost(costs, size, start, results[name][index]):
+                worse[name] += 1
+    distance = sum(octile(s % size, s // size, g % size, g // size) for s, g in pairs) / queries
+    print("Average octile distance %.1f tiles, paths costlier than A*: ALT %d, JPS %d" %
+          (distance, worse["alt"], worse["jps"]))
+
+
+if __name__ == "__main__":
+    arguments = [int(argument) for argument in sys.argv[1:5]]
+    run(*arguments)
@@ -0,0 +1,177 @@
+"""
+CS5150 Game AI Final Project
+Team Member: Jianyan Chen, Ruidi Huang, Xin Qi
+Aug 2024
+
+This program defines the "scipy" path backend, which runs the searches in compiled code with
+scipy.sparse.csgraph.dijkstra on a sparse adjacency matrix of the tiles. The matrix is built with numpy in one go
+and rebuilt on the first query after tiles changed. Finding the nearest of several goals is a single batched
+Dijkstra from all of them. numpy and scipy are optional, the backend can only be selected if they are installed.
+"""
+
+from navigation.astar import ORTHOGONAL_WEIGHT, DIAGONAL_WEIGHT
+from navigation.nav_grid import NavGrid
+
+try:
+    import numpy
+    from scipy.sparse import coo_matrix
+    from scipy.sparse.csgraph import dijkstra
+except ImportError:
+    numpy = None
+
+# Half of the neighbour directions, the matrix is symmetric so each edge is only added once
+EDGE_DIRECTIONS = ((1, 0, ORTHOGONAL_WEIGHT), (0, 1, ORTHOGONAL_WEIGHT),
+                   (1, 1, DIAGONAL_WEIGHT), (-1, 1, DIAGONAL_WEIGHT))
+
+
+class CsgraphGrid(NavGrid):
+    """
+    A NavGrid that searches its paths with scipy.sparse.csgraph.
+
+    Attributes:
+        matrix (scipy.sparse.csr_matrix): The edge weights between tiles, None until the next query rebuilds it.
+    """
+    sliceable = False
+    hierarchical = False
+    # The matrix is rebuilt under the lock on the first query after a change
+    copy_searchable = False
+
+    def __init__(self, width, height, costs, world=None, profile="land", speeds=None):
+        """
+        Initializes the grid, the matrix is built on the first query.
+
+        Args:
+            width (int): The width of the world in tiles.
+            height (int): The height of the world in tiles.
+            costs (array.array): Row-major tile costs of length width * height.
+            world (World): The game world the grid belongs to. Defaults to None.
+            profile (str): The name of the movement profile. Defaults to "land".
+            speeds (array.array): Row-major speed factors of length width * height. Defaults to None.
+        """
+        if numpy is None:
+            raise ImportError('The "scipy" path backend needs numpy and scipy, install them or use another '
+                              'PATH_BACKEND')
+        NavGrid.__init__(self, width, height, costs, world, profile, speeds)
+        self.landmarks = None
+        self.matrix = None
+
+    def build_matrix(self):
+        """
+        Builds the sparse adjacency matrix from the cost array.
+
+        Returns:
+            scipy.sparse.csr_matrix: The edge weights, symmetric and without edges to blocked tiles.
+        """
+        width = self.width
+        height = self.height
+        costs = numpy.array(self.costs, dtype=numpy.float64).reshape(height, width)
+        indices = numpy.arange(width * height).reshape(height, width)
+        rows = []
+        columns = []
+        weights = []
+        for dx, dy, weight in EDGE_DIRECTIONS:
+            # The tiles that have a neighbour in this direction, and those neighbours
+            source_x = slice(max(0, -dx), width - max(0, dx))
+            target_x = slice(max(0, dx), width + min(0, dx))
+            source = costs[0:height - dy, source_x]
+            target = costs[dy:height, target_x]
+            usable = (source > 0) & (target > 0)
+            rows.append(indices[0:height - dy, source_x][usable])
+            columns.append(indices[dy:height, target_x][usable])
+            weights.append((weight * (source + target))[usable])
+        size = width * height
+        return coo_matrix((numpy.concatenate(weights), (numpy.concatenate(rows), numpy.concatenate(columns))),
+                          shape=(size, size)).tocsr()
+
+    def update_tiles(self, tile_coords):
+        """
+        Updates the costs and drops the matrix if any of them changed.
+
+        Args:
+            tile_coords (iterable): The (tile_x, tile_y) positions of the changed tiles.
+
+        Returns:
+            list of tuple: The positions whose cost actually changed.
+        """
+        with self.lock:
+            changed = NavGrid.update_tiles(self, tile_coords)
+            if changed:
+                self.matrix = None
+        return changed
+
+    def _dijkstra(self, sources):
+        """
+        Runs scipy's Dijkstra from one or several source tiles at once, building the matrix first if needed.
+
+        Args:
+            sources (int or list of int): The flat indices of the source tiles.
+
+        Returns:
+            tuple: The distances, the predecessors and, for several sources, the closest source of every tile.
+        """
+        if self.matrix is None:
+            self.matrix = self.build_matrix()
+        if isinstance(sources, int):
+            return dijkstra(self.matrix, directed=False, indices=sources, return_predecessors=True)
+        return dijkstra(self.matrix, directed=False, indices=sources, return_predecessors=True, min_only=True)
+
+    def search_path(self, start_index, goal_index, search="astar"):
+        """
+        Searches a path with a Dijkstra search from the goal, so the predecessors lead from the start to the goal.
+
+        Args:
+            start_index (int): The flat index of the start tile.
+            goal_index (int): The flat index of the goal tile.
+            search (str): Ignored, csgraph always runs Dijkstra.
+
+        Returns:
+            list of int: The flat indices from start (exclusive) to goal (inclusive), or None if there is no path.
+        """
+        if start_index == goal_index:
+            return []
+        distances, predecessors = self._dijkstra(goal_index)
+        return self._walk(distances, predecessors, start_index, goal_index)
+
+    def search_nearest(self, start_index, goal_indices):
+        """
+        Runs one Dijkstra search from all goals at once, the start then knows its closest goal and the way to it.
+
+        Args:
+            start_index (int): The flat index of the start tile.
+            goal_indices (iterable of int): The flat indices of the goal tiles.
+
+        Returns:
+            tuple: (goal, path), or (-1, None) if no goal can be reached.
+        """
+        goal_indices = list(goal_indices)
+        if start_index in goal_indices:
+            return start_index, []
+        distances, predecessors, closest = self._dijkstra(goal_indices)
+        goal = int(closest[start_index])
+        path = self._walk(distances, predecessors, start_index, goal)
+        if path is None:
+            return -1, None
+        return goal, path
+
+    @staticmethod
+    def _walk(distances, predecessors, start_index, goal_index):
+        """
+        Follows the predecessors of a Dijkstra search from the goal, starting at the start tile.
+
+        Args:
+            distances (numpy.ndarray): The distances of the search.
+            predecessors (numpy.ndarray): The predecessors of the search, towards the goal.
+            start_index (int): The flat index of the start tile.
+            goal_index (int): The flat index of the goal tile.
+
+        Returns:
+            list of int: The flat indices from start (exclusive) to goal (inclusive), or None if there is no path.
+        """
+        if not numpy.isfinite(distances[start_index]):
+            return None
+        path = []
+        node = start_index
+        while node != goal_index:
+            node = int(predecessors[node])
+            path.append(node)
+        return path
@@ -0,0 +1,236 @@
+"""
+CS5150 Game AI Final Project
+Team Member: Jianyan Chen, Ruidi Huang, Xin Qi
+Aug 2024
+
+This program contains the flow fields (Dijkstra maps) towards the shared village destinations.
+A flow field stores, for every tile around a facility, the cost to reach the facility and the next tile to step on,
+so villagers heading to a barn, market, lumber yard, stonework or rest place just follow it without searching.
+"""
+
+import heapq
+from array import array
+
+from navigation.astar import NEIGHBOURS
+
+UNREACHED = float("inf")
+
+
+class FlowField(object):
+    """
+    The cost-to-go field towards a single goal tile.
+
+    Attributes:
+        nav (NavGrid): The navigation grid the field is computed on.
+        goal (int): The flat index of the goal tile.
+        max_cost (float): Tiles further away than this cost are left out of the field.
+        dist (array.array): The cost from every tile to the goal, inf if the tile is not in the field.
+        next (array.array): The flat index of the next tile towards the goal, -1 if there is none.
+    """
+    def __init__(self, nav, goal, max_cost):
+        """
+        Initializes and computes the field.
+
+        Args:
+            nav (NavGrid): The navigation grid the field is computed on.
+            goal (int): The flat index of the goal tile.
+            max_cost (float): The cost bound of the field.
+        """
+        self.nav = nav
+        self.goal = goal
+        self.max_cost = max_cost
+        self.dist = None
+        self.next = None
+        self.build()
+
+    def build(self):
+        """Computes the whole field with a Dijkstra search from the goal."""
+        size = self.nav.width * self.nav.height
+        self.dist = array('d', [UNREACHED]) * size
+        self.next = array('l', [-1]) * size
+        self.dist[self.goal] = 0.0
+        self._propagate([(0.0, self.goal)])
+
+    def _propagate(self, open_heap):
+        """
+        Runs Dijkstra from the given seeds, lowering the cost of every tile it can improve.
+
+        Args:
+            open_heap (list): Heap of (cost, flat index) seeds.
+        """
+        costs = self.nav.costs
+        width = self.nav.width
+        height = self.nav.height
+        dist = self.dist
+        next_tile = self.next
+        max_cost = self.max_cost
+        push = heapq.heappush
+        pop = heapq.heappop
+
+        heapq.heapify(open_heap)
+        while open_heap:
+            current_dist, current = pop(open_heap)
+            if current_dist > dist[current]:
+                continue
+            cy, cx = divmod(current, width)
+            current_cost = costs[current]
+            for dx, dy, weight in NEIGHBOURS:
+                nx = cx + dx
+                ny = cy + dy
+                if nx < 0 or ny < 0 or nx >= width or ny >= height:
+                    continue
+                neighbour = ny * width + nx
+                if not costs[neighbour]:
+                    continue
+                candidate = current_dist + weight * (current_cost + costs[neighbour])
+                if candidate < dist[neighbour] and candidate <= max_cost:
+                    dist[neighbour] = candidate
+                    next_tile[neighbour] = current
+                    push(open_heap, (candidate, neighbour))
+
+    def repair(self, changed):
+        """
+        Updates the field after the cost of some tiles changed, touching only the tiles whose route
+        to the goal went through a changed tile, plus whatever a cheaper tile now improves.
+
+        Args:
+            changed (iterable of int): The flat indices of the tiles whose cost changed.
+        """
+        changed = set(changed)
+        if self.goal in changed:
+            self.build()
+            return
+
+        costs = self.nav.costs
+        width = self.nav.width
+        height = self.nav.height
+        dist = self.dist
+        next_tile = self.next
+
+        # Every tile whose route to the goal passes through a changed tile has to be recomputed
+        affected = set(changed)
+        stack = list(changed)
+        while stack:
+            current = stack.pop()
+            cy, cx = divmod(current, width)
+            for dx, dy, _ in NEIGHBOURS:
+                nx = cx + dx
+                ny = cy + dy
+                if nx < 0 or ny < 0 or nx >= width or ny >= height:
+                    continue
+                neighbour = ny * width + nx
+                if next_tile[neighbour] == current and neighbour not in affected:
+                    affected.add(neighbour)
+                    stack.append(neighbour)
+
+        for index in affected:
+            dist[index] = UNREACHED
+            next_tile[index] = -1
+
+        # Seed the affected tiles from their unaffected neighbours, then let Dijkstra fill the rest
+        open_heap = []
+        for index in affected:
+            if not costs[index]:
+                continue
+            cy, cx = divmod(index, width)
+            best = UNREACHED
+            for dx, dy, weight in NEIGHBOURS:
+                nx = cx + dx
+                ny = cy + dy
+                if nx < 0 or ny < 0 or nx >= width or ny >= height:
+                    continue
+                neighbour = ny * width + nx
+                if neighbour in affected or dist[neighbour] == UNREACHED:
+                    continue
+                candidate = dist[neighbour] + weight * (costs[index] + costs[neighbour])
+                if candidate < best:
+                    best = candidate
+                    next_tile[index] = neighbour
+            if best <= self.max_cost:
+                dist[index] = best
+                open_heap.append((best, index))
+            else:
+                next_tile[index] = -1
+        self._propagate(open_heap)
+
+    def next_index(self, index):
+        """
+        Returns the next tile to step on from the given tile.
+
+        Args:
+            index (int): The flat index of the current tile.
+
+        Returns:
+            int: The flat index of the next tile, or -1 if the tile is outside the field.
+        """
+        return self.next[index]
+
+
+class FlowFields(object):
+    """
+    Keeps one FlowField per shared destination tile and keeps them up to date when tiles change.
+
+    Attributes:
+        nav (NavGrid): The navigation grid the fields are computed on.
+        max_cost (float): The cost bound of every field.
+        fields (dict): Maps the flat index of a destination tile to its FlowField.
+    """
+    def __init__(self, nav, max_cost):
+        """
+        Initializes an empty set of flow fields.
+
+        Args:
+            nav (NavGrid): The navigation grid the fields are computed on.
+            max_cost (float): The cost bound of every field.
+        """
+        self.nav = nav
+        self.max_cost = max_cost
+        self.fields = {}
+
+    def add_destination(self, tile_x, tile_y):
+        """
+        Adds a destination, computing its field if it is not known yet.
+
+        Args:
+            tile_x (int): The column of the destination tile.
+            tile_y (int): The row of the destination tile.
+
+        Returns:
+            FlowField: The field towards the destination.
+        """
+        tile_x, tile_y = self.nav.clamp(int(tile_x), int(tile_y))
+        index = tile_y * self.nav.width + tile_x
+        field = self.fields.get(index)
+        if field is None:
+            field = FlowField(self.nav, index, self.max_cost)
+            self.fields[index] = field
+        return field
+
+    def get(self, tile_x, tile_y):
+        """
+        Returns the field towards a destination tile.
+
+        Args:
+            tile_x (int): The column of the destination tile.
+            tile_y (int): The row of the destination tile.
+
+        Returns:
+            FlowField: The field, or None if the tile is not a shared destination.
+        """
+        if not (0 <= tile_x < self.nav.width and 0 <= tile_y < self.nav.height):
+            return None
+        return self.fields.get(tile_y * self.nav.width + tile_x)
+
+    def update_tiles(self, tile_coords):
+        """
+        Repairs every field after the cost of some tiles changed.
+
+        Args:
+            tile_coords (iterable): The (tile_x, tile_y) positions whose cost changed.
+        """
+        width = self.nav.width
+        changed = [tile_y * width + tile_x for tile_x, tile_y in tile_coords]
+        if not changed:
+            return
+        for field in self.fields.values():
+            field.repair(changed)
@@ -0,0 +1,484 @@
+"""
+CS5150 Game AI Final Project
+Team Member: Jianyan Chen, Ruidi Huang, Xin Qi
+Aug 2024
+
+This program contains the hierarchical path finding (HPA*) layer on top of the navigation grid.
+The map is split into square clusters. Entrance tiles are placed along the borders between clusters, and the
+costs between the entrances of a cluster are computed once and reused, so a long trip is first planned over the
+entrances only and then refined into tiles one cluster at a time.
+"""
+
+import heapq
+import time
+from collections import OrderedDict
+
+from navigation.astar import NEIGHBOURS, ORTHOGONAL_WEIGHT, OCTILE_DIAGONAL, astar
+
+# Tiles at least this expensive (water) split a border into separate entrances
+ENTRANCE_SPLIT_COST = 100
+
+# A border run at least this long gets an entrance near each of its two ends instead of a single one
+LONG_ENTRANCE_RUN = 8
+
+
+def bounded_dijkstra(costs, width, source, bounds, targets):
+    """
+    Dijkstra search from a tile that stays inside a window and stops once every target is settled.
+
+    Args:
+        costs (array.array): Row-major tile costs.
+        width (int): The grid width in tiles.
+        source (int): The flat index of the source tile.
+        bounds (tuple): The (min_x, min_y, max_x, max_y) window, max exclusive.
+        targets (iterable of int): The flat indices the costs are wanted for.
+
+    Returns:
+        dict: Maps every reachable target to its cost from the source.
+    """
+    min_x, min_y, max_x, max_y = bounds
+    remaining = set(targets)
+    found = {}
+    dist = {source: 0.0}
+    open_heap = [(0.0, source)]
+    while open_heap and remaining:
+        current_dist, current = heapq.heappop(open_heap)
+        if current_dist > dist[current]:
+            continue
+        if current in remaining:
+            remaining.discard(current)
+            found[current] = current_dist
+        cy, cx = divmod(current, width)
+        current_cost = costs[current]
+        for dx, dy, weight in NEIGHBOURS:
+            nx = cx + dx
+            ny = cy + dy
+            if nx < min_x or ny < min_y or nx >= max_x or ny >= max_y:
+                continue
+            neighbour = ny * width + nx
+            if not costs[neighbour]:
+                continue
+            candidate = current_dist + weight * (current_cost + costs[neighbour])
+            if candidate < dist.get(neighbour, float("inf")):
+                dist[neighbour] = candidate
+                heapq.heappush(open_heap, (candidate, neighbour))
+    return found
+
+
+class HierarchicalPath(object):
+    """
+    An abstract plan over entrance tiles that is refined into tiles a few segments at a time.
+
+    Attributes:
+        nodes (list of int): The flat indices of the plan, from the start to the goal.
+        cursor (int): The position in nodes the plan has been refined up to.
+        version (int): The version of the hierarchy the plan was made with.
+    """
+    def __init__(self, nodes, version):
+        """
+        Initializes the plan.
+
+        Args:
+            nodes (list of int): The flat indices of the plan, from the start to the goal.
+            version (int): The version of the hierarchy the plan was made with.
+        """
+        self.nodes = nodes
+        self.cursor = 0
+        self.version = version
+
+    @property
+    def done(self):
+        """Whether every segment of the plan has been refined."""
+        return self.cursor >= len(self.nodes) - 1
+
+
+class HierarchicalGrid(object):
+    """
+    Cluster abstraction of a NavGrid used for long distance queries.
+
+    Attributes:
+        nav (NavGrid): The navigation grid the hierarchy is built on.
+        cluster_size (int): The side length of a cluster in tiles.
+        refine_tiles (int): The minimum number of tiles refined per query.
+        borders (dict): Maps (cluster, neighbour cluster) to its transitions (tile in cluster, tile in neighbour, cost).
+        inter (dict): Maps an entrance tile to the list of (tile across the border, cost) it connects to.
+        intra (dict): Maps a cluster to {entrance: {entrance: cost}}, or None while it still has to be computed.
+        cold (set): The clusters whose intra costs still have to be computed.
+        plans (OrderedDict): Unfinished plans, keyed by (tile the refined part ends at, goal tile).
+        version (int): Bumped every time the abstraction is repaired.
+    """
+    def __init__(self, nav, cluster_size=16, refine_tiles=16, max_plans=256):
+        """
+        Initializes the hierarchy and places the entrances of every border.
+        The costs inside a cluster are computed the first time a search needs them.
+
+        Args:
+            nav (NavGrid): The navigation grid the hierarchy is built on.
+            cluster_size (int): The side length of a cluster in tiles. Defaults to 16.
+            refine_tiles (int): The minimum number of tiles refined per query. Defaults to 16.
+            max_plans (int): The maximum number of unfinished plans kept. Defaults to 256.
+        """
+        self.nav = nav
+        self.cluster_size = cluster_size
+        self.refine_tiles = refine_tiles
+        self.max_plans = max_plans
+        self.clusters_x = (nav.width + cluster_size - 1) // cluster_size
+        self.clusters_y = (nav.height + cluster_size - 1) // cluster_size
+        self.borders = {}
+        self.inter = {}
+        self.intra = {}
+        self.cold = set()
+        self.plans = OrderedDict()
+        self.version = 0
+
+        for cluster in range(self.clusters_x * self.clusters_y):
+            self.intra[cluster] = None
+            self.cold.add(cluster)
+        for cluster in range(self.clusters_x * self.clusters_y):
+            for neighbour in self.border_neighbours(cluster):
+                self._build_border(cluster, neighbour)
+
+    def cluster_of(self, index):
+        """
+        Returns the cluster a tile belongs to.
+
+        Args:
+            index (int): The flat index of the tile.
+
+        Returns:
+            int: The cluster index.
+        """
+        tile_y, tile_x = divmod(index, self.nav.width)
+        return (tile_y // self.cluster_size) * self.clusters_x + tile_x // self.cluster_size
+
+    def cluster_bounds(self, cluster):
+        """
+        Returns the tile window of a cluster.
+
+        Args:
+            cluster (int): The cluster index.
+
+        Returns:
+            tuple: (min_x, min_y, max_x, max_y), max exclusive.
+        """
+        cluster_y, cluster_x = divmod(cluster, self.clusters_x)
+        min_x = cluster_x * self.cluster_size
+        min_y = cluster_y * self.cluster_size
+        return (min_x, min_y, min(min_x + self.cluster_size, self.nav.width),
+                min(min_y + self.cluster_size, self.nav.height))
+
+    def border_neighbours(self, cluster):
+        """
+        Returns the clusters to the east and to the south of a cluster, each border is owned by the cluster
+        to its west or north.
+
+        Args:
+            cluster (int): The cluster index.
+
+        Returns:
+            list of int: The neighbouring cluster indices.
+        """
+        cluster_y, cluster_x = divmod(cluster, self.clusters_x)
+        neighbours = []
+        if cluster_x + 1 < self.clusters_x:
+            neighbours.append(cluster + 1)
+        if cluster_y + 1 < self.clusters_y:
+            neighbours.append(cluster + self.clusters_x)
+        return neighbours
+
+    def _border_pairs(self, cluster, neighbour):
+        """
+        Lists the pairs of facing tiles along the border of two clusters.
+
+        Args:
+            cluster (int): The west or north cluster.
+            neighbour (int): The east or south cluster.
+
+        Returns:
+            list of tuple: (tile in cluster, tile in neighbour) flat index pairs.
+        """
+        width = self.nav.width
+        min_x, min_y, max_x, max_y = self.cluster_bounds(cluster)
+        if neighbour == cluster + 1:
+            return [(y * width + max_x - 1, y * width + max_x) for y in range(min_y, max_y)]
+        return [((max_y - 1) * width + x, max_y * width + x) for x in range(min_x, max_x)]
+
+    def _build_border(self, cluster, neighbour):
+        """
+        Places the entrances along one border. The border is split into runs of similar crossings and every run
+        gets its cheapest crossing as an entrance, or the cheapest one of each half for long runs.
+        Blocked tiles can't be crossed and end a run.
+
+        Args:
+            cluster (int): The west or north cluster.
+            neighbour (int): The east or south cluster.
+        """
+        costs = self.nav.costs
+        runs = []
+        run = []
+        run_expensive = None
+        for a, b in self._border_pairs(cluster, neighbour):
+            if not costs[a] or not costs[b]:
+                if run:
+                    runs.append(run)
+                    run = []
+                continue
+            expensive = max(costs[a], costs[b]) >= ENTRANCE_SPLIT_COST
+            if run and expensive != run_expensive:
+                runs.append(run)
+                run = []
+            run.append((a, b))
+            run_expensive = expensive
+        if run:
+            runs.append(run)
+
+        transitions = []
+        for run in runs:
+            if len(run) >= LONG_ENTRANCE_RUN:
+                parts = [run[:len(run) // 2], run[len(run) // 2:]]
+            else:
+                parts = [run]
+            for part in parts:
+                middle = (len(part) - 1) / 2.0
+                best = min(range(len(part)), key=lambda i: (costs[part[i][0]] + costs[part[i][1]], abs(i - middle)))
+                a, b = part[best]
+                transitions.append((a, b, ORTHOGONAL_WEIGHT * (costs[a] + costs[b])))
+
+        self._remove_border(cluster, neighbour)
+        self.borders[(cluster, neighbour)] = transitions
+        for a, b, cost in transitions:
+            self.inter.setdefault(a, []).append((b, cost))
+            self.inter.setdefault(b, []).append((a, cost))
+
+    def _remove_border(self, cluster, neighbour):
+        """
+        Removes the entrances of a border from the inter-cluster edges.
+
+        Args:
+            cluster (int): The west or north cluster.
+            neighbour (int): The east or south cluster.
+        """
+        for a, b, cost in self.borders.pop((cluster, neighbour), []):
+            for node, other in ((a, b), (b, a)):
+                edges = self.inter.get(node)
+                if edges is None:
+                    continue
+                if (other, cost) in edges:
+                    edges.remove((other, cost))
+                if not edges:
+                    del self.inter[node]
+
+    def _cluster_borders(self, cluster):
+        """
+        Returns the keys of the (up to four) borders of a cluster.
+
+        Args:
+            cluster (int): The cluster index.
+
+        Returns:
+            list of tuple: The border keys.
+        """
+        keys = [(cluster, neighbour) for neighbour in self.border_neighbours(cluster)]
+        cluster_y, cluster_x = divmod(cluster, self.clusters_x)
+        if cluster_x > 0:
+            keys.append((cluster - 1, cluster))
+        if cluster_y > 0:
+            keys.append((cluster - self.clusters_x, cluster))
+        return keys
+
+    def entrances(self, cluster):
+        """
+        Returns the entrance tiles inside a cluster.
+
+        Args:
+            cluster (int): The cluster index.
+
+        Returns:
+            set of int: The flat indices of the entrances.
+        """
+        nodes = set()
+        for key in self._cluster_borders(cluster):
+            for a, b, _ in self.borders.get(key, []):
+                nodes.add(a if key[0] == cluster else b)
+        return nodes
+
+    def intra_edges(self, cluster):
+        """
+        Returns the costs between the entrances of a cluster, computing them if needed.
+
+        Args:
+            cluster (int): The cluster index.
+
+        Returns:
+            dict: {entrance: {entrance: cost}} for every pair connected inside the cluster.
+        """
+        edges = self.intra[cluster]
+        if edges is None:
+            nodes = self.entrances(cluster)
+            bounds = self.cluster_bounds(cluster)
+            edges = {}
+            for node in nodes:
+                others = nodes - {node}
+                edges[node] = bounded_dijkstra(self.nav.costs, self.nav.width, node, bounds, others)
+            self.intra[cluster] = edges
+            self.cold.discard(cluster)
+        return edges
+
+    def warm(self, deadline):
+        """
+        Computes the intra-cluster costs that are still missing, one cluster at a time, until the deadline.
+
+        Args:
+            deadline (float): The time.perf_counter() value to stop at.
+
+        Returns:
+            bool: True if every cluster is ready.
+        """
+        while self.cold and time.perf_counter() < deadline:
+            self.intra_edges(next(iter(self.cold)))
+        return not self.cold
+
+    def update_tiles(self, tile_coords):
+        """
+        Repairs the clusters containing the given tiles: their borders get new entrances and their intra-cluster
+        costs, and those of the clusters across their borders, are recomputed when next needed.
+
+        Args:
+            tile_coords (iterable): The (tile_x, tile_y) positions whose cost changed.
+        """
+        dirty = set()
+        for tile_x, tile_y in tile_coords:
+            dirty.add(self.cluster_of(tile_y * self.nav.width + tile_x))
+        if not dirty:
+            return
+
+        rebuilt = set()
+        for cluster in dirty:
+            for key in self._cluster_borders(cluster):
+                if key not in rebuilt:
+                    self._build_border(*key)
+                    rebuilt.add(key)
+        for cluster, neighbour in rebuilt:
+            self.intra[cluster] = None
+            self.intra[neighbour] = None
+            self.cold.add(cluster)
+            self.cold.add(neighbour)
+        self.plans.clear()
+        self.version += 1
+
+    def _plan(self, start, goal):
+        """
+        A* search over the entrances, with the start and goal temporarily linked to the entrances of their clusters.
+
+        Args:
+            start (int): The flat index of the start tile.
+            goal (int): The flat index of the goal tile.
+
+        Returns:
+            list of int: The start, the entrances to go through and the goal, or None if there is no plan.
+        """
+        nav = self.nav
+        width = nav.width
+        costs = nav.costs
+        start_cluster = self.cluster_of(start)
+        goal_cluster = self.cluster_of(goal)
+        start_edges = bounded_dijkstra(costs, width, start, self.cluster_bounds(start_cluster),
+                                       self.entrances(start_cluster))
+        goal_edges = bounded_dijkstra(costs, width, goal, self.cluster_bounds(goal_cluster),
+                                      self.entrances(goal_cluster))
+        if not start_edges or not goal_edges:
+            return None
+
+        goal_y, goal_x = divmod(goal, width)
+        min_cost = nav.min_cost
+        diagonal = OCTILE_DIAGONAL * min_cost
+
+        def heuristic(node):
+            node_y, node_x = divmod(node, width)
+            dx = abs(node_x - goal_x)
+            dy = abs(node_y - goal_y)
+            return min_cost * max(dx, dy) + diagonal * min(dx, dy)
+
+        came_from = {}
+        g_score = {start: 0.0}
+        open_heap = [(heuristic(start), 0.0, start)]
+        while open_heap:
+            _, current_g, current = heapq.heappop(open_heap)
+            if current == goal:
+                nodes = [goal]
+                while nodes[-1] != start:
+                    nodes.append(came_from[nodes[-1]])
+                nodes.reverse()
+                return nodes
+            if current_g > g_score[current]:
+                continue
+
+            if current == start:
+                edges = list(start_edges.items())
+            else:
+                edges = list(self.intra_edges(self.cluster_of(current)).get(current, {}).items())
+            edges.extend(self.inter.get(current, []))
+            if current in goal_edges:
+                edges.append((goal, goal_edges[current]))
+            for neighbour, cost in edges:
+                tentative_g = current_g + cost
+                if tentative_g < g_score.get(neighbour, float("inf")):
+                    g_score[neighbour] = tentative_g
+                    came_from[neighbour] = current
+                    heapq.heappush(open_heap, (tentative_g + heuristic(neighbour), tentative_g, neighbour))
+        return None
+
+    def _refine(self, plan):
+        """
+        Turns the next segments of a plan into tiles until at least refine_tiles tiles are produced.
+
+        Args:
+            plan (HierarchicalPath): The plan to refine.
+
+        Returns:
+            list of int: The refined tiles, or None if a segment could not be refined.
+        """
+        nav = self.nav
+        tiles = []
+        while not plan.done and len(tiles) < self.refine_tiles:
+            a = plan.nodes[plan.cursor]
+            b = plan.nodes[plan.cursor + 1]
+            cluster = self.cluster_of(a)
+            if cluster != self.cluster_of(b):
+                # Crossing a border between two entrances
+                tiles.append(b)
+            else:
+                segment = astar(nav.costs, nav.width, nav.height, a, b, nav.min_cost, self.cluster_bounds(cluster))
+                if segment is None:
+                    return None
+                tiles.extend(segment)
+            plan.cursor += 1
+        return tiles
+
+    def find_path(self, start, goal):
+        """
+        Finds the first part of a long path. The rest of the plan is kept and continued when the next query
+        starts where this part ends, so only the segments the entity is about to walk get refined.
+
+        Args:
+            start (int): The flat index of the start tile.
+            goal (int): The flat index of the goal tile.
+
+        Returns:
+            list of int: The tiles from start (exclusive) towards the goal, or None if no plan is found.
+        """
+        plan = self.plans.pop((start, goal), None)
+        if plan is None or plan.version != self.version:
+            nodes = self._plan(start, goal)
+            if nodes is None:
+                return None
+            plan = HierarchicalPath(nodes, self.version)
+
+        tiles = self._refine(plan)
+        if tiles is None:
+            return None
+        if not plan.done and tiles:
+            self.plans[(tiles[-1], goal)] = plan
+            while len(self.plans) > self.max_plans:
+                self.plans.popitem(last=False)
+        return tiles
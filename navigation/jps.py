@@ -0,0 +1,321 @@
+"""
+CS5150 Game AI Final Project
+Team Member: Jianyan Chen, Ruidi Huang, Xin Qi
+Aug 2024
+
+This program contains a Jump Point Search variant of the grid A* for terrain with mostly uniform costs.
+A tile is "uniform" when it and its 8 neighbours all cost the same. Inside such open fields the search jumps along
+straight and diagonal lines instead of pushing every tile into the heap. Tiles next to a cost boundary
+(stone, snow, water) are jump points that are expanded in all 8 directions, like plain A*. The map edge acts as a
+wall, as in the original algorithm.
+"""
+
+import heapq
+from array import array
+
+from navigation.astar import NEIGHBOURS, OCTILE_DIAGONAL, ORTHOGONAL_WEIGHT, DIAGONAL_WEIGHT
+
+
+def is_uniform(costs, width, height, index):
+    """
+    Checks if a tile and all its neighbours inside the grid have the same cost. Blocked tiles never are.
+
+    Args:
+        costs (array.array): Row-major tile costs.
+        width (int): The grid width in tiles.
+        height (int): The grid height in tiles.
+        index (int): The flat index of the tile.
+
+    Returns:
+        bool: True if the tile is inside a uniform-cost area.
+    """
+    tile_y, tile_x = divmod(index, width)
+    cost = costs[index]
+    if not cost:
+        return False
+    for dx, dy, _ in NEIGHBOURS:
+        x = tile_x + dx
+        y = tile_y + dy
+        if 0 <= x < width and 0 <= y < height and costs[y * width + x] != cost:
+            return False
+    return True
+
+
+class JumpGrid(object):
+    """
+    The uniform tile mask of a grid, together with the first non-uniform tile along each row and column
+    in both directions, so a straight jump is a single lookup.
+
+    Attributes:
+        costs (array.array): Row-major tile costs.
+        width (int): The grid width in tiles.
+        height (int): The grid height in tiles.
+        mask (array.array): 1 for every uniform tile, 0 otherwise.
+        rays (dict): Maps a straight direction (dx, dy) to the flat index of the first non-uniform tile
+                     after every tile in that direction, -1 if the map edge comes first.
+    """
+    def __init__(self, costs, width, height):
+        """
+        Initializes and builds the jump data of a grid.
+
+        Args:
+            costs (array.array): Row-major tile costs.
+            width (int): The grid width in tiles.
+            height (int): The grid height in tiles.
+        """
+        self.costs = costs
+        self.width = width
+        self.height = height
+        self.mask = array('b', [is_uniform(costs, width, height, index) for index in range(width * height)])
+        self.rays = {}
+        for direction in ((1, 0), (-1, 0), (0, 1), (0, -1)):
+            self.rays[direction] = array('l', [-1]) * (width * height)
+        for tile_y in range(height):
+            self._scan_row(tile_y)
+        for tile_x in range(width):
+            self._scan_column(tile_x)
+
+    def _scan_row(self, tile_y):
+        """
+        Recomputes the east and west rays of a row.
+
+        Args:
+            tile_y (int): The row.
+        """
+        mask = self.mask
+        first = tile_y * self.width
+        last = first + self.width - 1
+        self._scan(mask, self.rays[(1, 0)], last, first - 1, -1)
+        self._scan(mask, self.rays[(-1, 0)], first, last + 1, 1)
+
+    def _scan_column(self, tile_x):
+        """
+        Recomputes the south and north rays of a column.
+
+        Args:
+            tile_x (int): The column.
+        """
+        mask = self.mask
+        width = self.width
+        last = (self.height - 1) * width + tile_x
+        self._scan(mask, self.rays[(0, 1)], last, tile_x - width, -width)
+        self._scan(mask, self.rays[(0, -1)], tile_x, last + width, width)
+
+    @staticmethod
+    def _scan(mask, ray, begin, end, step):
+        """
+        Walks a line against the direction of the ray, remembering the last non-uniform tile seen.
+
+        Args:
+            mask (array.array): The uniform tile mask.
+            ray (array.array): The ray array to fill.
+            begin (int): The flat index the walk starts at, the far end of the ray direction.
+            end (int): The flat index the walk stops before.
+            step (int): The index step of the walk.
+        """
+        found = -1
+        for index in range(begin, end, step):
+            ray[index] = found
+            if not mask[index]:
+                found = index
+
+    def update_tiles(self, tile_coords):
+        """
+        Refreshes the mask around tiles whose cost changed, and the rows and columns crossing them.
+
+        Args:
+            tile_coords (iterable): The (tile_x, tile_y) positions whose cost changed, costs already updated.
+        """
+        width = self.width
+        height = self.height
+        rows = set()
+        columns = set()
+        for tile_x, tile_y in tile_coords:
+            for y in range(max(tile_y - 1, 0), min(tile_y + 2, height)):
+                rows.add(y)
+                for x in range(max(tile_x - 1, 0), min(tile_x + 2, width)):
+                    columns.add(x)
+                    index = y * width + x
+                    self.mask[index] = is_uniform(self.costs, width, height, index)
+        for tile_y in rows:
+            self._scan_row(tile_y)
+        for tile_x in columns:
+            self._scan_column(tile_x)
+
+    def straight(self, x, y, dx, dy, goal):
+        """
+        Jumps in a straight line from a tile.
+
+        Args:
+            x, y (int): The first tile of the jump.
+            dx, dy (int): The direction of the jump, one of them is 0.
+            goal (int): The flat index of the goal tile.
+
+        Returns:
+            tuple: (jump point, steps taken to reach it), the jump point is -1 if the line runs into the map edge.
+        """
+        width = self.width
+        if x < 0 or y < 0 or x >= width or y >= self.height:
+            return -1, 0
+        node = y * width + x
+        if node == goal or not self.mask[node]:
+            return node, 1
+        target = self.rays[(dx, dy)][node]
+        goal_y, goal_x = divmod(goal, width)
+        # The goal can sit on the line before the first non-uniform tile
+        if dy == 0:
+            if goal_y == y and (goal_x - x) * dx > 0:
+                if target == -1 or (target % width - goal_x) * dx > 0:
+                    return goal, 1 + (goal_x - x) * dx
+            if target == -1:
+                return -1, 0
+            return target, 1 + (target % width - x) * dx
+        if goal_x == x and (goal_y - y) * dy > 0:
+            if target == -1 or (target // width - goal_y) * dy > 0:
+                return goal, 1 + (goal_y - y) * dy
+        if target == -1:
+            return -1, 0
+        return target, 1 + (target // width - y) * dy
+
+    def jump(self, x, y, dx, dy, goal):
+        """
+        Moves from a tile in one direction while the tiles stay uniform.
+
+        Args:
+            x, y (int): The first tile of the jump.
+            dx, dy (int): The direction of the jump.
+            goal (int): The flat index of the goal tile.
+
+        Returns:
+            tuple: (jump point, steps taken to reach it), the jump point is -1 if the line runs into the map edge.
+        """
+        if not (dx and dy):
+            return self.straight(x, y, dx, dy, goal)
+        width = self.width
+        height = self.height
+        mask = self.mask
+        steps = 1
+        while 0 <= x < width and 0 <= y < height:
+            node = y * width + x
+            if node == goal or not mask[node]:
+                return node, steps
+            # A diagonal move stops where one of its straight components finds something
+            if self.straight(x + dx, y, dx, 0, goal)[0] != -1 or self.straight(x, y + dy, 0, dy, goal)[0] != -1:
+                return node, steps
+            x += dx
+            y += dy
+            steps += 1
+        return -1, steps
+
+
+def jps(costs, width, height, start, goal, min_cost=1, jumps=None):
+    """
+    Jump Point Search over an 8-connected grid of tile costs, using the same edge weights as astar.
+
+    Args:
+        costs (array.array): Row-major tile costs, len(costs) == width * height.
+        width (int): The grid width in tiles.
+        height (int): The grid height in tiles.
+        start (int): The start node index.
+        goal (int): The goal node index.
+        min_cost (int): The lowest tile cost in the grid, used to keep the heuristic admissible.
+        jumps (JumpGrid): The jump data of the grid, built from the costs if not given.
+
+    Returns:
+        list of int: The node indices from start (exclusive) to goal (inclusive), or None if there is no path.
+    """
+    if start == goal:
+        return []
+    if jumps is None:
+        jumps = JumpGrid(costs, width, height)
+    mask = jumps.mask
+    jump = jumps.jump
+
+    goal_x = goal % width
+    goal_y = goal // width
+    diagonal = OCTILE_DIAGONAL * min_cost
+    came_from = {}
+    g_score = {start: 0.0}
+    # Heap entries carry the direction the node was reached with, (0, 0) for the start
+    open_heap = [(0.0, 0.0, start, 0, 0)]
+    push = heapq.heappush
+    pop = heapq.heappop
+    infinity = float("inf")
+
+    while open_heap:
+        _, current_g, current, pdx, pdy = pop(open_heap)
+        if current == goal:
+            return _expand(came_from, width, start, goal)
+        if current_g > g_score[current]:
+            continue
+        cy, cx = divmod(current, width)
+        current_cost = costs[current]
+
+        if mask[current] and (pdx or pdy):
+            # Natural neighbours only: straight on, plus both straight components of a diagonal
+            if pdx and pdy:
+                directions = ((pdx, pdy, DIAGONAL_WEIGHT), (pdx, 0, ORTHOGONAL_WEIGHT), (0, pdy, ORTHOGONAL_WEIGHT))
+            else:
+                directions = ((pdx, pdy, ORTHOGONAL_WEIGHT),)
+        else:
+            directions = NEIGHBOURS
+
+        for dx, dy, weight in directions:
+            nx = cx + dx
+            ny = cy + dy
+            if nx < 0 or ny < 0 or nx >= width or ny >= height:
+                continue
+            neighbour = ny * width + nx
+            neighbour_cost = costs[neighbour]
+            if not neighbour_cost:
+                continue
+            tentative_g = current_g + weight * (current_cost + neighbour_cost)
+            if mask[neighbour]:
+                # Every tile after the first one of the jump costs the same as the neighbour
+                neighbour, steps = jump(nx, ny, dx, dy, goal)
+                if neighbour == -1:
+                    continue
+                tentative_g += (steps - 1) * weight * 2 * costs[neighbour]
+                nx = neighbour % width
+                ny = neighbour // width
+            if tentative_g < g_score.get(neighbour, infinity):
+                g_score[neighbour] = tentative_g
+                came_from[neighbour] = current
+                hx = nx - goal_x if nx > goal_x else goal_x - nx
+                hy = ny - goal_y if ny > goal_y else goal_y - ny
+                if hx > hy:
+                    h = min_cost * hx + diagonal * hy
+                else:
+                    h = min_cost * hy + diagonal * hx
+                push(open_heap, (tentative_g + h, tentative_g, neighbour, dx, dy))
+
+    return None
+
+
+def _expand(came_from, width, start, goal):
+    """
+    Walks the came_from links back from the goal and fills in the tiles between consecutive jump points.
+
+    Args:
+        came_from (dict): Maps a jump point to the jump point it was reached from.
+        width (int): The grid width in tiles.
+        start (int): The start node index.
+        goal (int): The goal node index.
+
+    Returns:
+        list of int: The node indices from start (exclusive) to goal (inclusive).
+    """
+    path = []
+    node = goal
+    while node != start:
+        parent = came_from[node]
+        py, px = divmod(parent, width)
+        ny, nx = divmod(node, width)
+        dx = (nx > px) - (nx < px)
+        dy = (ny > py) - (ny < py)
+        step = dy * width + dx
+        while node != parent:
+            path.append(node)
+            node -= step
+    path.reverse()
+    return path
@@ -0,0 +1,244 @@
+"""
+CS5150 Game AI Final Project
+Team Member: Jianyan Chen, Ruidi Huang, Xin Qi
+Aug 2024
+
+This program contains the landmark (ALT) heuristic of the A* search.
+A few landmark tiles far apart from each other store the path cost from the landmark to every tile. By the triangle
+inequality, |cost(landmark, goal) - cost(landmark, tile)| never overestimates the cost from a tile to the goal,
+and unlike the octile distance it knows about the snow, stone and water in between.
+The tables are built a slice at a time in the spare time of a frame, and rebuilt the same way once a tile got cheaper.
+"""
+
+import heapq
+import time
+from array import array
+
+from navigation.astar import NEIGHBOURS
+
+UNREACHED = float("inf")
+
+
+class DistanceFill(object):
+    """
+    A Dijkstra search from a landmark over the whole grid that can be suspended and resumed.
+    It also finds the tile farthest from all landmarks, where the next landmark goes.
+
+    Attributes:
+        costs (array.array): Row-major tile costs.
+        width (int): The grid width in tiles.
+        height (int): The grid height in tiles.
+        source (int): The flat index of the landmark.
+        distances (array.array): The path cost from the landmark to every tile, UNREACHED if there is no path.
+        nearest (array.array): The cost from every tile to its closest landmark, lowered as tiles are settled.
+                               None to only look for the tile farthest from this landmark.
+        farthest (int): The settled tile farthest from all landmarks so far, -1 if there is none.
+        open_heap (list): The (cost, tile) entries still to settle.
+    """
+    def __init__(self, costs, width, height, source, nearest=None):
+        """
+        Initializes the fill, no tile is settled until step is called.
+
+        Args:
+            costs (array.array): Row-major tile costs.
+            width (int): The grid width in tiles.
+            height (int): The grid height in tiles.
+            source (int): The flat index of the landmark.
+            nearest (array.array): The cost from every tile to its closest landmark. Defaults to None.
+        """
+        self.costs = costs
+        self.width = width
+        self.height = height
+        self.source = source
+        self.distances = array('d', [UNREACHED]) * (width * height)
+        self.distances[source] = 0.0
+        self.nearest = nearest
+        self.farthest = -1
+        self.farthest_distance = 0.0
+        self.open_heap = [(0.0, source)]
+
+    def step(self, deadline=None):
+        """
+        Settles tiles until the fill is complete or the deadline passes.
+
+        Args:
+            deadline (float): The time.perf_counter() value to stop at, None to run to the end.
+
+        Returns:
+            bool: True if the fill is complete.
+        """
+        costs = self.costs
+        width = self.width
+        height = self.height
+        distances = self.distances
+        nearest = self.nearest
+        open_heap = self.open_heap
+        push = heapq.heappush
+        pop = heapq.heappop
+        settled = 0
+
+        while open_heap:
+            # Checking the clock is slow, only do it every few hundred tiles
+            settled += 1
+            if deadline is not None and settled % 256 == 0 and time.perf_counter() >= deadline:
+                return False
+            distance, current = pop(open_heap)
+            if distance > distances[current]:
+                continue
+            # A tile is settled once, so its distance to the closest landmark is final here
+            if nearest is not None:
+                if distance < nearest[current]:
+                    nearest[current] = distance
+                closest = nearest[current]
+            else:
+                closest = distance
+            if closest > self.farthest_distance:
+                self.farthest = current
+                self.farthest_distance = closest
+
+            cy, cx = divmod(current, width)
+            current_cost = costs[current]
+            for dx, dy, weight in NEIGHBOURS:
+                nx = cx + dx
+                ny = cy + dy
+                if nx < 0 or ny < 0 or nx >= width or ny >= height:
+                    continue
+                neighbour = ny * width + nx
+                neighbour_cost = costs[neighbour]
+                if not neighbour_cost:
+                    continue
+                tentative = distance + weight * (current_cost + neighbour_cost)
+                if tentative < distances[neighbour]:
+                    distances[neighbour] = tentative
+                    push(open_heap, (tentative, neighbour))
+        return True
+
+
+class LandmarkTable(object):
+    """
+    The landmarks of a navigation grid and their distance tables.
+    Landmarks are placed one after the other on the tile farthest, by path cost, from the ones placed so far,
+    inside the largest region of the grid. The first one goes to the tile farthest from a probe tile.
+
+    Attributes:
+        costs (array.array): Row-major tile costs.
+        width (int): The grid width in tiles.
+        height (int): The grid height in tiles.
+        regions (RegionMap): The regions of the grid, the landmarks go into the largest one.
+        count (int): The number of landmarks.
+        landmarks (list of int): The flat indices of the landmarks placed so far.
+        tables (dict): Maps a landmark to its finished distance table, the ones the heuristic uses.
+        nearest (array.array): The cost from every tile to its closest landmark, used to place the next one.
+        next_landmark (int): Where the next landmark goes, -1 until the probe found it.
+        fill (DistanceFill): The table being built, None if none is.
+        pending (list of int): The landmarks whose table is still to be rebuilt after tiles changed.
+    """
+    def __init__(self, costs, width, height, regions, count):
+        """
+        Initializes the table, nothing is computed until warm is called.
+
+        Args:
+            costs (array.array): Row-major tile costs.
+            width (int): The grid width in tiles.
+            height (int): The grid height in tiles.
+            regions (RegionMap): The regions of the grid.
+            count (int): The number of landmarks.
+        """
+        self.costs = costs
+        self.width = width
+        self.height = height
+        self.regions = regions
+        self.count = count
+        self.landmarks = []
+        self.tables = {}
+        self.nearest = array('d', [UNREACHED]) * (width * height)
+        self.next_landmark = -1
+        self.fill = None
+        self.pending = []
+
+    def ready(self):
+        """
+        Checks if every table is built and up to date.
+
+        Returns:
+            bool: True if nothing is left to compute.
+        """
+        return self.fill is None and not self.pending and len(self.landmarks) >= self.count
+
+    def warm(self, deadline=None):
+        """
+        Builds the missing or outdated tables, a slice at a time, until the deadline.
+
+        Args:
+            deadline (float): The time.perf_counter() value to stop at, None to build everything.
+
+        Returns:
+            bool: True if every table is ready.
+        """
+        costs = self.costs
+        width = self.width
+        height = self.height
+        while not self.ready():
+            if deadline is not None and time.perf_counter() >= deadline:
+                return False
+            if self.fill is None:
+                if self.pending:
+                    self.fill = DistanceFill(costs, width, height, self.pending.pop())
+                elif self.next_landmark >= 0:
+                    self.landmarks.append(self.next_landmark)
+                    self.fill = DistanceFill(costs, width, height, self.next_landmark, self.nearest)
+                elif not self.landmarks and self.regions.sizes:
+                    # The probe only finds where the first landmark goes, its table is not kept
+                    sizes = self.regions.sizes
+                    probe = self.regions.labels.index(max(sizes, key=sizes.get))
+                    self.fill = DistanceFill(costs, width, height, probe)
+                else:
+                    # Every usable tile is as close to a landmark as it gets, fewer landmarks will do
+                    self.count = len(self.landmarks)
+                    break
+            fill = self.fill
+            if not fill.step(deadline):
+                return False
+            self.fill = None
+            if fill.source in self.landmarks:
+                # A new dict instead of changing it, a search holding the old one keeps consistent tables
+                tables = dict(self.tables)
+                tables[fill.source] = fill.distances
+                self.tables = tables
+            if fill.nearest is not None or fill.source not in self.landmarks:
+                self.next_landmark = fill.farthest
+        return True
+
+    def update_tiles(self, cheaper):
+        """
+        Marks the tables as outdated after tile costs changed. Tables stay admissible when tiles only got more
+        expensive, as paths only got longer, so only a cheaper or unblocked tile makes them stale.
+        Stale tables are dropped from the heuristic right away and rebuilt by warm, the landmarks stay where they are.
+
+        Args:
+            cheaper (bool): True if at least one tile got cheaper or usable.
+        """
+        if not cheaper:
+            return
+        self.tables = {}
+        fill = self.fill
+        self.fill = None
+        self.pending = list(self.landmarks)
+        if fill is not None and fill.nearest is not None:
+            # The landmark being placed is rebuilt with the others, the next one is found by its new table
+            self.pending.remove(fill.source)
+            self.fill = DistanceFill(self.costs, self.width, self.height, fill.source, fill.nearest)
+        elif fill is not None and fill.source not in self.landmarks:
+            self.next_landmark = -1
+
+    def heuristic_tables(self, goal):
+        """
+        Returns what the heuristic of a search towards a goal needs.
+
+        Args:
+            goal (int): The flat index of the goal tile.
+
+        Returns:
+            list of tuple: (distance table, cost from the landmark to the goal) for every table that reaches the goal.
+        """
+        return [(table, table[goal]) for table in self.tables.values() if table[goal] < UNREACHED]
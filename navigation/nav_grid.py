@@ -0,0 +1,455 @@
+"""
+CS5150 Game AI Final Project
+Team Member: Jianyan Chen, Ruidi Huang, Xin Qi
+Aug 2024
+
+This program defines the NavGrid class, the compact navigation data of the world used by the A* search.
+There is one NavGrid per movement profile (see navigation/profiles.py), each with its own costs and caches.
+"""
+
+import threading
+from array import array
+
+from configuration.world_configuration import PATH_CACHE_REGION_SIZE, PATH_CACHE_CAPACITY
+from configuration.world_configuration import HPA_CLUSTER_SIZE, HPA_MIN_DISTANCE, ALT_LANDMARKS
+from navigation.astar import astar, nearest_goal, octile
+from navigation.hpa import HierarchicalGrid
+from navigation.jps import JumpGrid, jps
+from navigation.landmarks import LandmarkTable
+from navigation.path_backend import PathBackend
+from navigation.path_cache import PathCache
+from navigation.profiles import PROFILES
+from navigation.regions import RegionMap
+
+# A goal on a tile the profile can't use is moved to a usable tile at most this many tiles away
+GOAL_SNAP_RADIUS = 2
+
+
+class NavGrid(PathBackend):
+    """
+    Stores the movement cost of every tile as a flat, row-major array of ints
+    and answers path queries on it with A*, remembering recent answers in a PathCache.
+    This is the "grid" backend; the other backends subclass it and only replace search_path and search_nearest.
+
+    Attributes:
+        width (int): The width of the world in tiles.
+        height (int): The height of the world in tiles.
+        costs (array.array): The tile costs, indexed by tile_y * width + tile_x, 0 for tiles the profile can't use.
+        speeds (array.array): The speed factor of the profile on every tile, indexed like costs.
+        min_cost (int): The lowest tile cost, used to keep the heuristic admissible.
+        world (World): The game world the costs are read from when tiles change, if any.
+        profile (str): The name of the movement profile the costs describe.
+        terrain (TerrainProfile): The costs and speeds of the profile per tile type.
+        cache (PathCache): The cache of paths found on this grid.
+        hierarchy (HierarchicalGrid): The cluster abstraction used for long distance queries, None if the backend
+                                      searches long trips directly.
+        jumps (JumpGrid): The jump data of the Jump Point Search, built on its first use.
+        regions (RegionMap): The connected regions of the usable tiles, to reject unreachable goals without a search.
+        landmarks (LandmarkTable): The landmarks of the A* heuristic, None if ALT_LANDMARKS is 0.
+        lock (threading.RLock): Held while changing costs, and while find_path searches them or find_path_unlocked
+                                copies them, as searches can run on a worker thread.
+        version (int): Incremented whenever a tile cost changes, so suspended searches know they are outdated.
+    """
+    sliceable = True
+    # Searches of find_path_unlocked run on a copy of the costs, engines searching structures that update_tiles
+    # changes in place set this to False and search with the lock held instead
+    copy_searchable = True
+    # Plan long trips over the HPA* clusters instead of searching them tile by tile
+    hierarchical = True
+
+    def __init__(self, width, height, costs, world=None, profile="land", speeds=None):
+        """
+        Initializes the grid from an existing cost array.
+
+        Args:
+            width (int): The width of the world in tiles.
+            height (int): The height of the world in tiles.
+            costs (array.array): Row-major tile costs of length width * height.
+            world (World): The game world the grid belongs to. Defaults to None.
+            profile (str): The name of the movement profile. Defaults to "land".
+            speeds (array.array): Row-major speed factors of length width * height. Defaults to full speed everywhere.
+        """
+        self.width = width
+        self.height = height
+        self.costs = costs
+        self.speeds = speeds if speeds is not None else array('f', [1.0]) * (width * height)
+        self.min_cost = min((cost for cost in costs if cost), default=1)
+        self.world = world
+        self.profile = profile
+        self.terrain = PROFILES[profile]
+        self.cache = PathCache(width, height, PATH_CACHE_REGION_SIZE, PATH_CACHE_CAPACITY)
+        self.hierarchy = HierarchicalGrid(self, HPA_CLUSTER_SIZE) if self.hierarchical else None
+        self.jumps = None
+        self.regions = RegionMap(costs, width, height)
+        self.landmarks = LandmarkTable(costs, width, height, self.regions, ALT_LANDMARKS) if ALT_LANDMARKS else None
+        self.lock = threading.RLock()
+        self.version = 0
+
+    @classmethod
+    def build(cls, world, profile="land"):
+        """
+        Builds the grid of a movement profile from the tile array of the world, compiling the costs and speeds
+        of the profile into arrays.
+
+        Args:
+            world (World): The game world containing the tiles.
+            profile (str): The name of the movement profile. Defaults to "land".
+
+        Returns:
+            NavGrid: The navigation grid of the world.
+        """
+        width = world.w // world.tile_size
+        height = world.h // world.tile_size
+        terrain = PROFILES[profile]
+        tiles = [tile for row in world.tile_array[:height] for tile in row[:width]]
+        costs = array('i', [terrain.cost(tile) for tile in tiles])
+        speeds = array('f', [terrain.speed(tile) for tile in tiles])
+        return cls(width, height, costs, world, profile, speeds)
+
+    def update_tiles(self, tile_coords):
+        """
+        Re-reads the cost and speed of the given tiles from the world after they have been replaced.
+        Edge weights are derived from the two tile costs on the fly, so updating the tiles themselves
+        re-weights every edge around them. Cached paths through a changed tile are invalidated.
+        Only the main thread changes costs, so the lock is only taken when a cost really changes.
+
+        Args:
+            tile_coords (iterable): The (tile_x, tile_y) positions of the changed tiles.
+
+        Returns:
+            list of tuple: The positions whose cost actually changed.
+        """
+        changed = []
+        width = self.width
+        tile_array = self.world.tile_array
+        terrain = self.terrain
+        for tile_x, tile_y in tile_coords:
+            tile_x = int(tile_x)
+            tile_y = int(tile_y)
+            if not (0 <= tile_x < width and 0 <= tile_y < self.height):
+                continue
+            tile = tile_array[tile_y][tile_x]
+            # Only the movement code reads the speeds, they change without invalidating anything
+            self.speeds[tile_y * width + tile_x] = terrain.speed(tile)
+            if self.costs[tile_y * width + tile_x] != terrain.cost(tile):
+                changed.append((tile_x, tile_y))
+        if not changed:
+            return changed
+
+        with self.lock:
+            self.version += 1
+            cheaper = False
+            for tile_x, tile_y in changed:
+                cost = terrain.cost(tile_array[tile_y][tile_x])
+                old_cost = self.costs[tile_y * width + tile_x]
+                if cost and (not old_cost or cost < old_cost):
+                    cheaper = True
+                self.costs[tile_y * width + tile_x] = cost
+                if cost and cost < self.min_cost:
+                    self.min_cost = cost
+            self.cache.invalidate_tiles(changed)
+            if self.hierarchy is not None:
+                self.hierarchy.update_tiles(changed)
+            if self.jumps is not None:
+                self.jumps.update_tiles(changed)
+            self.regions.update_tiles(changed)
+            if self.landmarks is not None:
+                self.landmarks.update_tiles(cheaper)
+        return changed
+
+    def clamp(self, tile_x, tile_y):
+        """
+        Clamps a tile position into the grid.
+
+        Args:
+            tile_x (int): The tile column.
+            tile_y (int): The tile row.
+
+        Returns:
+            tuple: The clamped (tile_x, tile_y).
+        """
+        return min(max(tile_x, 0), self.width - 1), min(max(tile_y, 0), self.height - 1)
+
+    def snap(self, index, region=0):
+        """
+        Moves a goal off a tile the profile can't use, e.g. a villager heading for a spot in the water,
+        to the closest usable tile within GOAL_SNAP_RADIUS tiles.
+
+        Args:
+            index (int): The flat index of the goal tile.
+            region (int): Only accept tiles of this region, any region if 0. Defaults to 0.
+
+        Returns:
+            int: The flat index of the usable goal tile, or -1 if there is none nearby.
+        """
+        costs = self.costs
+        labels = self.regions.labels
+        if costs[index] and (not region or labels[index] == region):
+            return index
+        tile_y, tile_x = divmod(index, self.width)
+        for radius in range(1, GOAL_SNAP_RADIUS + 1):
+            best = -1
+            best_distance = None
+            for y in range(max(tile_y - radius, 0), min(tile_y + radius + 1, self.height)):
+                for x in range(max(tile_x - radius, 0), min(tile_x + radius + 1, self.width)):
+                    distance = (x - tile_x) ** 2 + (y - tile_y) ** 2
+                    if not costs[y * self.width + x] or (region and labels[y * self.width + x] != region):
+                        continue
+                    if best_distance is None or distance < best_distance:
+                        best = y * self.width + x
+                        best_distance = distance
+            if best >= 0:
+                return best
+        return -1
+
+    def goal_index(self, start_index, goal_index):
+        """
+        Picks the tile a search from a start tile should head for, answering unreachable goals without a search.
+        A start on a blocked tile, e.g. a villager wading ashore, counts as the closest usable tile.
+        A usable goal is only accepted in the region of the start, it is never moved across a strait into it.
+        Only a goal the profile can't use is moved to a usable tile of the start's region nearby.
+
+        Args:
+            start_index (int): The flat index of the start tile.
+            goal_index (int): The flat index of the requested goal tile.
+
+        Returns:
+            int: The flat index of a goal tile connected to the start, or -1 if the goal can't be reached.
+        """
+        start_index = self.snap(start_index)
+        if start_index < 0:
+            return -1
+        region = self.regions.labels[start_index]
+        if self.costs[goal_index]:
+            return goal_index if self.regions.labels[goal_index] == region else -1
+        return self.snap(goal_index, region)
+
+    def reachable(self, start, goal, snap=False):
+        """
+        Checks in constant time if a path between two tiles exists. The goal itself has to be a usable tile
+        of the grid in the region of the start, unless snap is set.
+
+        Args:
+            start (tuple): The start tile (tile_x, tile_y).
+            goal (tuple): The goal tile (tile_x, tile_y).
+            snap (bool): Also accept a goal off the grid or on a tile the profile can't use, if find_path would
+                         move it to a usable tile of the start's region nearby. Defaults to False.
+
+        Returns:
+            bool: True if a search from start to goal would find a path.
+        """
+        start_x, start_y = self.clamp(*start)
+        goal_x, goal_y = self.clamp(*goal)
+        goal_index = self.goal_index(start_y * self.width + start_x, goal_y * self.width + goal_x)
+        if snap:
+            return goal_index >= 0
+        return goal_index >= 0 and goal_index == goal_y * self.width + goal_x and (goal_x, goal_y) == tuple(goal)
+
+    def find_path(self, start, goal, search="astar"):
+        """
+        Finds the cheapest path between two tiles, over the tiles the profile can use.
+        Long trips are planned over the clusters of the hierarchy instead, and only their first part is returned,
+        asking again from the end of that part continues the same plan.
+
+        Args:
+            start (tuple): The start tile (tile_x, tile_y).
+            goal (tuple): The goal tile (tile_x, tile_y).
+            search (str): "astar" for the plain A* search or "jps" for the Jump Point Search, which is faster on
+                          large open fields. Both find equally cheap paths. Defaults to "astar".
+
+        Returns:
+            list of tuple: The tiles from start (exclusive) to goal (inclusive), or None if there is no path.
+                           The goal is moved to a nearby usable tile if the profile can't use it.
+        """
+        width = self.width
+        start_x, start_y = self.clamp(*start)
+        goal_x, goal_y = self.clamp(*goal)
+        start_index = start_y * width + start_x
+
+        with self.lock:
+            goal_index = self.goal_index(start_index, goal_y * width + goal_x)
+            if goal_index < 0:
+                return None
+            path = self.quick_path(start_index, goal_index)
+            if path is None:
+                path = self.search_path(start_index, goal_index, search)
+                if path is None:
+                    return None
+                self.cache.put(start_index, goal_index, self.profile, path)
+            return [(node % width, node // width) for node in path]
+
+    def find_path_unlocked(self, start, goal, search="astar"):
+        """
+        Finds a path like find_path, for a worker thread: the lock is only held to read the cache and copy the costs,
+        and the search runs on the copy without it, so tiles can change on the main thread meanwhile. A path found
+        on costs that changed during the search is thrown away and searched again.
+
+        Args:
+            start (tuple): The start tile (tile_x, tile_y).
+            goal (tuple): The goal tile (tile_x, tile_y).
+            search (str): "astar" or "jps". Defaults to "astar".
+
+        Returns:
+            list of tuple: The tiles from start (exclusive) to goal (inclusive), or None if there is no path.
+        """
+        if not self.copy_searchable:
+            return self.find_path(start, goal, search)
+        width = self.width
+        start_x, start_y = self.clamp(*start)
+        goal_x, goal_y = self.clamp(*goal)
+        start_index = start_y * width + start_x
+
+        while True:
+            with self.lock:
+                goal_index = self.goal_index(start_index, goal_y * width + goal_x)
+                if goal_index < 0:
+                    return None
+                path = self.quick_path(start_index, goal_index)
+                if path is not None:
+                    return [(node % width, node // width) for node in path]
+                version = self.version
+                costs = array('i', self.costs)
+                min_cost = self.min_cost
+                if search == "jps" and self.jumps is None:
+                    self.jumps = JumpGrid(self.costs, self.width, self.height)
+                jumps = self.jumps
+                landmarks = self.heuristic_tables(goal_index)
+
+            if search == "jps":
+                path = jps(costs, width, self.height, start_index, goal_index, min_cost, jumps)
+            else:
+                path = astar(costs, width, self.height, start_index, goal_index, min_cost, landmarks=landmarks)
+
+            with self.lock:
+                if self.version != version:
+                    # Tile costs changed during the search, start over
+                    continue
+                if path is None:
+                    return None
+                self.cache.put(start_index, goal_index, self.profile, path)
+                return [(node % width, node // width) for node in path]
+
+    def search_path(self, start_index, goal_index, search="astar"):
+        """
+        Runs the search of the engine, called by find_path with the lock held when the cache has no answer.
+
+        Args:
+            start_index (int): The flat index of the start tile.
+            goal_index (int): The flat index of the goal tile, connected to the start.
+            search (str): "astar" or "jps". Defaults to "astar".
+
+        Returns:
+            list of int: The flat indices from start (exclusive) to goal (inclusive), or None if there is no path.
+        """
+        if search == "jps":
+            if self.jumps is None:
+                self.jumps = JumpGrid(self.costs, self.width, self.height)
+            return jps(self.costs, self.width, self.height, start_index, goal_index, self.min_cost, self.jumps)
+        return astar(self.costs, self.width, self.height, start_index, goal_index, self.min_cost,
+                     landmarks=self.heuristic_tables(goal_index))
+
+    def find_nearest(self, start, goals):
+        """
+        Finds which of several goal tiles is the cheapest to reach, and the path to it, in a single search.
+        Goals in another region than the start are dropped before the search. The path is cached,
+        so the request for it that usually follows is answered without searching again.
+
+        Args:
+            start (tuple): The start tile (tile_x, tile_y).
+            goals (list of tuple): The goal tiles (tile_x, tile_y).
+
+        Returns:
+            tuple: (position of the nearest goal in goals, tiles from start (exclusive) to it (inclusive)),
+                   or None if none of the goals can be reached.
+        """
+        width = self.width
+        start_x, start_y = self.clamp(*start)
+        start_index = start_y * width + start_x
+
+        with self.lock:
+            targets = {}
+            for position, goal in enumerate(goals):
+                goal_x, goal_y = self.clamp(*goal)
+                goal_index = self.goal_index(start_index, goal_y * width + goal_x)
+                if goal_index >= 0:
+                    targets.setdefault(goal_index, position)
+            if not targets:
+                return None
+            goal_index, path = self.search_nearest(start_index, targets)
+            if path is None:
+                return None
+            self.cache.put(start_index, goal_index, self.profile, path)
+            return targets[goal_index], [(node % width, node // width) for node in path]
+
+    def search_nearest(self, start_index, goal_indices):
+        """
+        Runs the multi-goal search of the engine, called by find_nearest with the lock held.
+
+        Args:
+            start_index (int): The flat index of the start tile.
+            goal_indices (iterable of int): The flat indices of the goal tiles, all connected to the start.
+
+        Returns:
+            tuple: (goal, path), the reached goal index and the flat indices from start (exclusive) to it
+                   (inclusive), or (-1, None) if no goal can be reached.
+        """
+        return nearest_goal(self.costs, self.width, self.height, start_index, goal_indices, self.min_cost)
+
+    def heuristic_tables(self, goal_index):
+        """
+        Returns the landmark tables an A* search towards a goal can use.
+
+        Args:
+            goal_index (int): The flat index of the goal tile.
+
+        Returns:
+            list of tuple: The landmark tables, see LandmarkTable.heuristic_tables, None without landmarks.
+        """
+        if self.landmarks is None:
+            return None
+        return self.landmarks.heuristic_tables(goal_index)
+
+    def warm(self, deadline):
+        """
+        Computes the cluster costs of the hierarchy and the landmark tables that are missing, until the deadline.
+
+        Args:
+            deadline (float): The time.perf_counter() value to stop at.
+        """
+        with self.lock:
+            if (self.hierarchy is None or self.hierarchy.warm(deadline)) and self.landmarks is not None:
+                self.landmarks.warm(deadline)
+
+    def quick_path(self, start_index, goal_index, warm_only=False):
+        """
+        Answers a query without a flat search: from the cache, or over the clusters of the hierarchy for long trips.
+        Paths from the hierarchy are only a first part of the trip and are never cached.
+
+        Args:
+            start_index (int): The flat index of the start tile.
+            goal_index (int): The flat index of the goal tile.
+            warm_only (bool): Only use the hierarchy once all its cluster costs are computed. Defaults to False.
+
+        Returns:
+            list of int: The flat indices of the path, or None if a flat search is needed.
+        """
+        with self.lock:
+            path = self.cache.get(start_index, goal_index, self.profile)
+            hierarchy = self.hierarchy
+            if path is None and hierarchy is not None and not (warm_only and hierarchy.cold) and \
+                    octile(start_index % self.width, start_index // self.width,
+                           goal_index % self.width, goal_index // self.width) >= HPA_MIN_DISTANCE:
+                path = hierarchy.find_path(start_index, goal_index)
+            return path
+
+    def store_path(self, start_index, goal_index, path):
+        """
+        Caches the result of a flat search that was run outside of find_path.
+
+        Args:
+            start_index (int): The flat index of the start tile.
+            goal_index (int): The flat index of the goal tile.
+            path (list of int): The flat indices of the path.
+        """
+        with self.lock:
+            self.cache.put(start_index, goal_index, self.profile, path)
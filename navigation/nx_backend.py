@@ -0,0 +1,125 @@
+"""
+CS5150 Game AI Final Project
+Team Member: Jianyan Chen, Ruidi Huang, Xin Qi
+Aug 2024
+
+This program defines the "networkx" path backend, the original graph engine of the game behind the PathBackend
+interface. Every usable tile is a node, with an edge to each usable neighbour weighing 0.5 * (cost_a + cost_b),
+or 0.707 * (cost_a + cost_b) diagonally, and paths are searched with networkx.astar_path.
+"""
+
+import networkx as nx
+
+from navigation.astar import NEIGHBOURS, octile
+from navigation.nav_grid import NavGrid
+
+
+class NetworkxGrid(NavGrid):
+    """
+    A NavGrid that searches its paths on a networkx graph kept in sync with the cost array.
+
+    Attributes:
+        graph (networkx.Graph): One node per tile, edges between usable neighbours.
+    """
+    sliceable = False
+    hierarchical = False
+    # update_tiles reconnects the graph in place
+    copy_searchable = False
+
+    def __init__(self, width, height, costs, world=None, profile="land", speeds=None):
+        """
+        Initializes the grid and builds its graph.
+
+        Args:
+            width (int): The width of the world in tiles.
+            height (int): The height of the world in tiles.
+            costs (array.array): Row-major tile costs of length width * height.
+            world (World): The game world the grid belongs to. Defaults to None.
+            profile (str): The name of the movement profile. Defaults to "land".
+            speeds (array.array): Row-major speed factors of length width * height. Defaults to None.
+        """
+        NavGrid.__init__(self, width, height, costs, world, profile, speeds)
+        self.landmarks = None
+        self.graph = nx.Graph()
+        self.graph.add_nodes_from(range(width * height))
+        for index in range(width * height):
+            self._connect(index)
+
+    def _connect(self, index):
+        """
+        Adds the edges between a usable tile and its usable neighbours, replacing any it had.
+
+        Args:
+            index (int): The flat index of the tile.
+        """
+        graph = self.graph
+        costs = self.costs
+        graph.remove_edges_from(list(graph.edges(index)))
+        cost = costs[index]
+        if not cost:
+            return
+        tile_y, tile_x = divmod(index, self.width)
+        for dx, dy, weight in NEIGHBOURS:
+            x = tile_x + dx
+            y = tile_y + dy
+            if 0 <= x < self.width and 0 <= y < self.height and costs[y * self.width + x]:
+                neighbour = y * self.width + x
+                graph.add_edge(index, neighbour, weight=weight * (cost + costs[neighbour]))
+
+    def update_tiles(self, tile_coords):
+        """
+        Updates the costs, then reconnects the changed tiles in the graph.
+
+        Args:
+            tile_coords (iterable): The (tile_x, tile_y) positions of the changed tiles.
+
+        Returns:
+            list of tuple: The positions whose cost actually changed.
+        """
+        with self.lock:
+            changed = NavGrid.update_tiles(self, tile_coords)
+            for tile_x, tile_y in changed:
+                self._connect(tile_y * self.width + tile_x)
+        return changed
+
+    def search_path(self, start_index, goal_index, search="astar"):
+        """
+        Searches a path with networkx.astar_path and the octile heuristic.
+
+        Args:
+            start_index (int): The flat index of the start tile.
+            goal_index (int): The flat index of the goal tile.
+            search (str): Ignored, networkx always runs A*.
+
+        Returns:
+            list of int: The flat indices from start (exclusive) to goal (inclusive), or None if there is no path.
+        """
+        width = self.width
+        min_cost = self.min_cost
+
+        def heuristic(a, b):
+            return octile(a % width, a // width, b % width, b // width, min_cost)
+
+        try:
+            path = nx.astar_path(self.graph, start_index, goal_index, heuristic=heuristic, weight="weight")
+        except nx.NetworkXNoPath:
+            return None
+        return path[1:]
+
+    def search_nearest(self, start_index, goal_indices):
+        """
+        Runs one Dijkstra search from all goals at once towards the start, edges are the same both ways.
+
+        Args:
+            start_index (int): The flat index of the start tile.
+            goal_indices (iterable of int): The flat indices of the goal tiles.
+
+        Returns:
+            tuple: (goal, path), or (-1, None) if no goal can be reached.
+        """
+        try:
+            _, path = nx.multi_source_dijkstra(self.graph, set(goal_indices), target=start_index, weight="weight")
+        except nx.NetworkXNoPath:
+            return -1, None
+        path.reverse()
+        return path[-1], path[1:]
@@ -0,0 +1,132 @@
+"""
+CS5150 Game AI Final Project
+Team Member: Jianyan Chen, Ruidi Huang, Xin Qi
+Aug 2024
+
+This program defines the PathBackend interface every pathfinding engine of the world implements,
+and the registry PATH_BACKEND in configuration/world_configuration.py picks the engine from:
+    "grid":     A* and Jump Point Search on the flat cost array (navigation/nav_grid.py),
+    "networkx": the original networkx graph engine (navigation/nx_backend.py),
+    "scipy":    scipy.sparse.csgraph Dijkstra on a sparse matrix (navigation/csgraph_backend.py), needs scipy.
+The engines share the cost array of the NavGrid, so the flow fields, the path smoothing and the region checks
+work the same with all of them; only the searches differ.
+"""
+
+import importlib
+
+# Maps a backend name to "module:class", modules are only imported when their backend is selected
+BACKENDS = {
+    "grid": "navigation.nav_grid:NavGrid",
+    "networkx": "navigation.nx_backend:NetworkxGrid",
+    "scipy": "navigation.csgraph_backend:CsgraphGrid",
+}
+
+
+class PathBackend(object):
+    """
+    The operations the world, the path service and the villagers use on a navigation layer.
+
+    Attributes:
+        width (int): The width of the world in tiles.
+        height (int): The height of the world in tiles.
+        costs (array.array): The tile costs, indexed by tile_y * width + tile_x, 0 for tiles the profile can't use.
+        speeds (array.array): The speed factor of the profile on every tile, indexed like costs.
+        profile (str): The name of the movement profile the costs describe.
+    """
+    # True if the PathService may run the searches of this engine a slice at a time on the cost array,
+    # otherwise they run within the frame
+    sliceable = False
+
+    @classmethod
+    def build(cls, world, profile="land"):
+        """
+        Builds the navigation layer of a movement profile from the tile array of the world.
+
+        Args:
+            world (World): The game world containing the tiles.
+            profile (str): The name of the movement profile. Defaults to "land".
+
+        Returns:
+            PathBackend: The navigation layer.
+        """
+        raise NotImplementedError
+
+    def update_tiles(self, tile_coords):
+        """
+        Re-reads the cost and speed of the given tiles from the world after they have been replaced.
+
+        Args:
+            tile_coords (iterable): The (tile_x, tile_y) positions of the changed tiles.
+
+        Returns:
+            list of tuple: The positions whose cost actually changed.
+        """
+        raise NotImplementedError
+
+    def find_path(self, start, goal, search="astar"):
+        """
+        Finds the cheapest path between two tiles.
+
+        Args:
+            start (tuple): The start tile (tile_x, tile_y).
+            goal (tuple): The goal tile (tile_x, tile_y).
+            search (str): The search variant, for engines that have several. Defaults to "astar".
+
+        Returns:
+            list of tuple: The tiles from start (exclusive) to goal (inclusive), or None if there is no path.
+        """
+        raise NotImplementedError
+
+    def find_path_unlocked(self, start, goal, search="astar"):
+        """
+        Finds a path like find_path, from a worker thread of the PathService. Engines that can search without
+        keeping the main thread from changing costs meanwhile override it.
+
+        Args:
+            start (tuple): The start tile (tile_x, tile_y).
+            goal (tuple): The goal tile (tile_x, tile_y).
+            search (str): The search variant, for engines that have several. Defaults to "astar".
+
+        Returns:
+            list of tuple: The tiles from start (exclusive) to goal (inclusive), or None if there is no path.
+        """
+        return self.find_path(start, goal, search)
+
+    def find_nearest(self, start, goals):
+        """
+        Finds which of several goal tiles is the cheapest to reach, and the path to it.
+
+        Args:
+            start (tuple): The start tile (tile_x, tile_y).
+            goals (list of tuple): The goal tiles (tile_x, tile_y).
+
+        Returns:
+            tuple: (position of the nearest goal in goals, tiles from start (exclusive) to it (inclusive)),
+                   or None if none of the goals can be reached.
+        """
+        raise NotImplementedError
+
+    def warm(self, deadline):
+        """
+        Spends spare frame time on precomputations, if the engine has any.
+
+        Args:
+            deadline (float): The time.perf_counter() value to stop at.
+        """
+        pass
+
+
+def get_backend(name):
+    """
+    Looks up the class of a pathfinding engine.
+
+    Args:
+        name (str): The name of the backend, a key of BACKENDS.
+
+    Returns:
+        type: The PathBackend subclass.
+    """
+    if name not in BACKENDS:
+        raise ValueError("Unknown path backend %r, expected one of %s" % (name, ", ".join(sorted(BACKENDS))))
+    module_name, class_name = BACKENDS[name].split(":")
+    return getattr(importlib.import_module(module_name), class_name)
@@ -0,0 +1,136 @@
+"""
+CS5150 Game AI Final Project
+Team Member: Jianyan Chen, Ruidi Huang, Xin Qi
+Aug 2024
+
+This program defines the PathCache class, which remembers recently found paths between tiles.
+The map is split into square regions that each carry a version counter. A cached path remembers the versions of
+the regions it passes through and is thrown away as soon as one of them changes.
+"""
+
+from array import array
+from collections import OrderedDict
+
+
+class PathCache(object):
+    """
+    Cache of paths keyed by (start tile, goal tile, movement profile), invalidated per region.
+
+    Attributes:
+        width (int): The width of the world in tiles.
+        height (int): The height of the world in tiles.
+        region_size (int): The side length of a region in tiles.
+        capacity (int): The maximum number of paths kept, the least recently used one is dropped first.
+        versions (array.array): The version counter of every region.
+        hits (int): Number of lookups answered from the cache.
+        misses (int): Number of lookups that had to run a search.
+        invalidations (int): Number of cached paths dropped because a region they cross has changed.
+    """
+    def __init__(self, width, height, region_size=16, capacity=1024):
+        """
+        Initializes an empty cache for a grid of the given size.
+
+        Args:
+            width (int): The width of the world in tiles.
+            height (int): The height of the world in tiles.
+            region_size (int): The side length of a region in tiles. Defaults to 16.
+            capacity (int): The maximum number of cached paths. Defaults to 1024.
+        """
+        self.width = width
+        self.height = height
+        self.region_size = region_size
+        self.capacity = capacity
+        self.regions_x = (width + region_size - 1) // region_size
+        self.regions_y = (height + region_size - 1) // region_size
+        self.versions = array('L', [0] * (self.regions_x * self.regions_y))
+        self.entries = OrderedDict()
+
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def region_of(self, index):
+        """
+        Returns the region a tile belongs to.
+
+        Args:
+            index (int): The flat tile index (tile_y * width + tile_x).
+
+        Returns:
+            int: The region index.
+        """
+        tile_y, tile_x = divmod(index, self.width)
+        return (tile_y // self.region_size) * self.regions_x + tile_x // self.region_size
+
+    def get(self, start, goal, profile):
+        """
+        Looks up a cached path.
+
+        Args:
+            start (int): The flat index of the start tile.
+            goal (int): The flat index of the goal tile.
+            profile (str): The movement profile the path was searched for.
+
+        Returns:
+            array.array: The flat tile indices of the path, or None on a miss.
+        """
+        key = (start, goal, profile)
+        entry = self.entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+
+        path, regions, versions = entry
+        current = self.versions
+        for region, version in zip(regions, versions):
+            if current[region] != version:
+                del self.entries[key]
+                self.invalidations += 1
+                self.misses += 1
+                return None
+
+        self.entries.move_to_end(key)
+        self.hits += 1
+        return path
+
+    def put(self, start, goal, profile, path):
+        """
+        Stores a path together with the current version of every region it crosses.
+
+        Args:
+            start (int): The flat index of the start tile.
+            goal (int): The flat index of the goal tile.
+            profile (str): The movement profile the path was searched for.
+            path (list of int): The flat tile indices of the path, start excluded.
+        """
+        regions = sorted(set(self.region_of(index) for index in path) | {self.region_of(start)})
+        versions = tuple(self.versions[region] for region in regions)
+        self.entries[(start, goal, profile)] = (array('l', path), tuple(regions), versions)
+        self.entries.move_to_end((start, goal, profile))
+        while len(self.entries) > self.capacity:
+            self.entries.popitem(last=False)
+
+    def invalidate_tiles(self, tile_coords):
+        """
+        Bumps the version of every region containing one of the given tiles.
+
+        Args:
+            tile_coords (iterable): The (tile_x, tile_y) positions whose cost changed.
+        """
+        for tile_x, tile_y in tile_coords:
+            region = (tile_y // self.region_size) * self.regions_x + tile_x // self.region_size
+            self.versions[region] += 1
+
+    def clear(self):
+        """Drops every cached path."""
+        self.entries.clear()
+
+    def stats(self):
+        """
+        Returns the cache counters.
+
+        Returns:
+            dict: The hits, misses, invalidations and current size of the cache.
+        """
+        return {"hits": self.hits, "misses": self.misses, "invalidations": self.invalidations,
+                "size": len(self.entries)}
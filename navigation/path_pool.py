@@ -0,0 +1,253 @@
+"""
+CS5150 Game AI Final Project
+Team Member: Jianyan Chen, Ruidi Huang, Xin Qi
+Aug 2024
+
+This program defines the PathPool class, which solves batches of path queries in parallel on a multiprocessing pool.
+The cost array of every navigation layer is copied into a block of multiprocessing.shared_memory that the worker
+processes attach to once, so a batch only sends the start and goal indices to the workers, and each worker sends
+its paths back as a single array of ints. Workers run the plain A* search of navigation/astar.py.
+"""
+
+import atexit
+import multiprocessing
+from array import array
+from multiprocessing import shared_memory
+
+from navigation.astar import astar
+
+# Marks a query without a path in the arrays the workers send back
+NO_PATH = -1
+
+# Chunks a batch is split into per worker, more chunks balance the work better but cost more messages
+CHUNKS_PER_WORKER = 4
+
+# The cost grids the worker process attached to, maps a profile to (shared memory, costs, width, height)
+_grids = {}
+
+
+def _attach(grids):
+    """
+    Attaches a worker process to the shared cost grids, runs once when the worker starts.
+
+    Args:
+        grids (dict): Maps a profile to (name of the shared memory, width, height).
+    """
+    for profile, (name, width, height) in grids.items():
+        memory = shared_memory.SharedMemory(name=name)
+        _grids[profile] = (memory, memory.buf.cast('i'), width, height)
+
+
+def _solve_chunk(task):
+    """
+    Searches the paths of a chunk of queries, runs in a worker process.
+
+    Args:
+        task (tuple): (profile, min_cost, array of start and goal indices, one pair after the other).
+
+    Returns:
+        array.array: For every query the length of its path followed by its flat indices,
+                     or NO_PATH if there is no path.
+    """
+    profile, min_cost, queries = task
+    _, costs, width, height = _grids[profile]
+    paths = array('i')
+    for i in range(0, len(queries), 2):
+        path = astar(costs, width, height, queries[i], queries[i + 1], min_cost)
+        if path is None:
+            paths.append(NO_PATH)
+        else:
+            paths.append(len(path))
+            paths.extend(path)
+    return paths
+
+
+class PathBatch(object):
+    """
+    A batch of queries being solved by the pool.
+
+    Attributes:
+        queries (list of tuple): The (profile, start, goal) queries of the batch, with flat indices.
+        versions (dict): Maps a profile to the NavGrid version the batch was solved on.
+        result (multiprocessing.pool.AsyncResult): The arrays sent back by the workers.
+    """
+    def __init__(self, queries, versions, result):
+        """
+        Initializes a batch.
+
+        Args:
+            queries (list of tuple): The (profile, start, goal) queries.
+            versions (dict): Maps a profile to the NavGrid version of the shared costs.
+            result (multiprocessing.pool.AsyncResult): The pending result of the chunks.
+        """
+        self.queries = queries
+        self.versions = versions
+        self.result = result
+
+    def ready(self):
+        """
+        Checks if every chunk of the batch has been solved.
+
+        Returns:
+            bool: True if get will not block.
+        """
+        return self.result.ready()
+
+    def get(self):
+        """
+        Waits for the batch and unpacks the paths the workers sent back.
+
+        Returns:
+            list: The flat indices from start (exclusive) to goal (inclusive) of every query, in order,
+                  None for the queries without a path.
+        """
+        paths = []
+        for chunk in self.result.get():
+            i = 0
+            while i < len(chunk):
+                length = chunk[i]
+                if length == NO_PATH:
+                    paths.append(None)
+                    i += 1
+                else:
+                    paths.append(chunk[i + 1:i + 1 + length].tolist())
+                    i += 1 + length
+        return paths
+
+
+class PathPool(object):
+    """
+    A pool of worker processes searching paths on shared copies of the cost arrays of the navigation layers.
+
+    Attributes:
+        layers (dict): Maps a movement profile to its NavGrid.
+        workers (int): The number of worker processes.
+        memories (dict): Maps a profile to the shared memory holding its costs.
+        costs (dict): Maps a profile to the shared costs as a memoryview of ints.
+        versions (dict): Maps a profile to the NavGrid version the shared costs were copied at.
+        pending (list of PathBatch): The batches the workers may still be reading the costs for.
+        pool (multiprocessing.pool.Pool): The worker processes.
+    """
+    def __init__(self, layers, workers=0):
+        """
+        Copies the costs of the layers into shared memory and starts the workers.
+
+        Args:
+            layers (dict): Maps a movement profile to its NavGrid.
+            workers (int): The number of worker processes, 0 for one per core. Defaults to 0.
+        """
+        self.layers = layers
+        self.workers = workers or multiprocessing.cpu_count()
+        self.memories = {}
+        self.costs = {}
+        self.versions = {}
+        self.pending = []
+        grids = {}
+        for profile, nav in layers.items():
+            memory = shared_memory.SharedMemory(create=True, size=nav.costs.itemsize * len(nav.costs))
+            self.memories[profile] = memory
+            self.costs[profile] = memory.buf.cast('i')
+            self.versions[profile] = None
+            grids[profile] = (memory.name, nav.width, nav.height)
+        self.sync()
+        self.pool = multiprocessing.Pool(self.workers, initializer=_attach, initargs=(grids,))
+        atexit.register(self.close)
+
+    def sync(self):
+        """
+        Copies the costs of the layers that changed since the last copy into the shared memory.
+        Waits for the batches still in flight first, so no search sees the costs change under it.
+        """
+        for profile, nav in self.layers.items():
+            if self.versions[profile] == nav.version:
+                continue
+            for batch in self.pending:
+                batch.result.wait()
+            self.pending = []
+            with nav.lock:
+                self.costs[profile][:] = nav.costs
+                self.versions[profile] = nav.version
+        self.pending = [batch for batch in self.pending if not batch.ready()]
+
+    def submit(self, queries):
+        """
+        Hands a batch of queries to the workers without waiting for them.
+
+        Args:
+            queries (list of tuple): The (profile, start, goal) queries, with flat indices.
+
+        Returns:
+            PathBatch: The batch, whose get returns the paths in the order of the queries.
+        """
+        self.sync()
+        chunk_size = max(1, -(-len(queries) // (self.workers * CHUNKS_PER_WORKER)))
+        tasks = []
+        for i in range(0, len(queries), chunk_size):
+            chunk = queries[i:i + chunk_size]
+            # Queries of the same profile go together, a new chunk starts where the profile changes
+            start = 0
+            for j in range(1, len(chunk) + 1):
+                if j == len(chunk) or chunk[j][0] != chunk[start][0]:
+                    profile = chunk[start][0]
+                    indices = array('i')
+                    for _, query_start, query_goal in chunk[start:j]:
+                        indices.append(query_start)
+                        indices.append(query_goal)
+                    tasks.append((profile, self.layers[profile].min_cost, indices))
+                    start = j
+        batch = PathBatch(queries, dict(self.versions), self.pool.map_async(_solve_chunk, tasks))
+        self.pending.append(batch)
+        return batch
+
+    def find_paths(self, pairs, profile="land"):
+        """
+        Finds the paths between many pairs of tiles at once, blocking until all of them are solved.
+        Goals are snapped and checked against the regions of the layer like in NavGrid.find_path, the cache and
+        the hierarchy answer what they can, and only the remaining queries go to the workers.
+        Their paths are added to the cache.
+
+        Args:
+            pairs (list of tuple): The (start, goal) tiles, each a (tile_x, tile_y) tuple.
+            profile (str): The movement profile to search the paths for. Defaults to "land".
+
+        Returns:
+            list: The tiles from start (exclusive) to goal (inclusive) for every pair, in order,
+                  None for the pairs without a path.
+        """
+        nav = self.layers[profile]
+        width = nav.width
+        paths = [None] * len(pairs)
+        queries = []
+        positions = []
+        for position, (start, goal) in enumerate(pairs):
+            start_x, start_y = nav.clamp(*start)
+            goal_x, goal_y = nav.clamp(*goal)
+            start_index = start_y * width + start_x
+            goal_index = nav.goal_index(start_index, goal_y * width + goal_x)
+            if goal_index < 0:
+                continue
+            known = nav.quick_path(start_index, goal_index, warm_only=True)
+            if known is not None:
+                paths[position] = [(node % width, node // width) for node in known]
+            else:
+                queries.append((profile, start_index, goal_index))
+                positions.append(position)
+        if queries:
+            for position, (_, start_index, goal_index), path in zip(positions, queries, self.submit(queries).get()):
+                if path is not None:
+                    nav.store_path(start_index, goal_index, path)
+                    paths[position] = [(node % width, node // width) for node in path]
+        return paths
+
+    def close(self):
+        """Stops the workers and frees the shared memory, safe to call more than once."""
+        if self.pool is None:
+            return
+        self.pool.terminate()
+        self.pool.join()
+        self.pool = None
+        for profile, memory in self.memories.items():
+            self.costs[profile].release()
+            memory.close()
+            memory.unlink()
+        atexit.unregister(self.close)
@@ -0,0 +1,324 @@
+"""
+CS5150 Game AI Final Project
+Team Member: Jianyan Chen, Ruidi Huang, Xin Qi
+Aug 2024
+
+This program defines the PathService class, which answers path requests outside of the entity update.
+An entity submits its start and goal tiles and gets a ticket back, then polls its ticket on the following frames
+until the path is ready. Requests are solved in one of four modes:
+    "sliced": the searches are suspended and resumed across frames, sharing a time budget per frame,
+    "thread": a worker thread runs the searches one after the other,
+    "pool":   the requests of a frame are sent as one batch to a PathPool of worker processes,
+    "frame":  the search runs right away, within the frame.
+"""
+
+import queue
+import threading
+import time
+from collections import deque
+
+from navigation.astar import AStarSearch
+from navigation.path_pool import PathPool
+
+# Returned by PathService.poll while the search of a ticket has not finished yet
+PENDING = object()
+
+# Nodes a sliced search expands on its turn before the next pending request gets to run
+SLICE_EXPANSIONS = 64
+
+
+class PathRequest(object):
+    """
+    A request searched a slice at a time by the sliced mode of the PathService.
+
+    Attributes:
+        ticket (int): The ticket of the request.
+        nav (NavGrid): The navigation layer the path is searched on.
+        start (int): The flat index of the start tile.
+        goal (int): The flat index of the goal tile.
+        search (AStarSearch): The suspended search, None until the request gets its first turn.
+        version (int): The NavGrid version the search started on.
+        path (list of tuple): The found tiles once the request is done, None if there is no path.
+    """
+    def __init__(self, ticket, nav, start, goal):
+        """
+        Initializes a request.
+
+        Args:
+            ticket (int): The ticket of the request.
+            nav (NavGrid): The navigation layer the path is searched on.
+            start (int): The flat index of the start tile.
+            goal (int): The flat index of the goal tile.
+        """
+        self.ticket = ticket
+        self.nav = nav
+        self.start = start
+        self.goal = goal
+        self.search = None
+        self.version = None
+        self.path = None
+
+    def advance(self, expansions):
+        """
+        Runs the request for one turn.
+
+        Args:
+            expansions (int): The number of nodes the search may expand on this turn.
+
+        Returns:
+            bool: True if the request is done and its path is set.
+        """
+        nav = self.nav
+        if self.search is not None and self.version != nav.version:
+            # Tile costs changed while the search was suspended, start over
+            self.search = None
+        if self.search is None:
+            path = nav.quick_path(self.start, self.goal, warm_only=True)
+            if path is not None:
+                self.path = [(node % nav.width, node // nav.width) for node in path]
+                return True
+            self.search = AStarSearch(nav.costs, nav.width, nav.height, self.start, self.goal, nav.min_cost,
+                                      landmarks=nav.heuristic_tables(self.goal))
+            self.version = nav.version
+
+        if not self.search.step(expansions):
+            return False
+        path = self.search.path
+        if path is not None:
+            nav.store_path(self.start, self.goal, path)
+            self.path = [(node % nav.width, node // nav.width) for node in path]
+        return True
+
+
+class PathService(object):
+    """
+    Queue of path requests solved on the navigation layers of the world.
+
+    Attributes:
+        layers (dict): Maps a movement profile to the NavGrid its paths are searched on.
+        search (str): The grid search used by the "thread" and "frame" modes, "astar" or "jps".
+                      Sliced searches always use A*.
+        mode (str): "sliced", "thread", "pool" or "frame". Backends that can't be sliced search within the frame
+                    instead.
+        budget (float): The time in seconds the sliced searches may take per frame.
+        requests (queue.Queue): The (ticket, start, goal, profile) requests waiting for the worker thread.
+        active (collections.deque): The PathRequests of the sliced mode, in turn order.
+        workers (int): The number of worker processes of the pool mode, 0 for one per core.
+        pool (PathPool): The worker processes of the pool mode, started with the first batch.
+        waiting (list of tuple): The (ticket, profile, start, goal) requests of the pool mode waiting for the
+                                 next batch, with flat indices.
+        batch (PathBatch): The batch the pool is solving, None if there is none.
+        batch_requests (list of tuple): The requests of that batch, in the same form as waiting.
+        submitted (dict): Maps an unanswered ticket to the time it was submitted.
+        results (dict): Maps a finished ticket to its path.
+        cancelled (set): Tickets whose result is not wanted anymore.
+        next_ticket (int): The ticket handed out by the next submit.
+        worker (threading.Thread): The worker thread, started with the first request.
+        answered (int): The number of requests answered so far.
+        waited (float): The total time in seconds the answered requests waited.
+    """
+    def __init__(self, layers, search="astar", mode="sliced", budget_ms=4.0, workers=0):
+        """
+        Initializes the service.
+
+        Args:
+            layers (dict): Maps a movement profile to its NavGrid.
+            search (str): The grid search used, "astar" or "jps". Defaults to "astar".
+            mode (str): "sliced", "thread", "pool" or "frame". Defaults to "sliced".
+            budget_ms (float): The milliseconds the sliced searches may take per frame. Defaults to 4.
+            workers (int): The number of worker processes of the pool mode, 0 for one per core. Defaults to 0.
+        """
+        self.layers = layers
+        self.search = search
+        self.mode = mode
+        self.budget = budget_ms / 1000.
+        self.requests = queue.Queue()
+        self.active = deque()
+        self.workers = workers
+        self.pool = None
+        self.waiting = []
+        self.batch = None
+        self.batch_requests = []
+        self.submitted = {}
+        self.results = {}
+        self.cancelled = set()
+        self.next_ticket = 0
+        self.worker = None
+        self.lock = threading.Lock()
+
+        self.answered = 0
+        self.waited = 0.
+
+    def submit(self, start, goal, profile="land"):
+        """
+        Requests a path between two tiles.
+
+        Args:
+            start (tuple): The start tile (tile_x, tile_y).
+            goal (tuple): The goal tile (tile_x, tile_y).
+            profile (str): The movement profile to search the path for. Defaults to "land".
+
+        Returns:
+            int: The ticket to poll for the result.
+        """
+        ticket = self.next_ticket
+        self.next_ticket += 1
+        self.submitted[ticket] = time.perf_counter()
+
+        nav = self.layers[profile]
+        if self.mode == "frame" or (self.mode == "sliced" and not nav.sliceable):
+            self._finish(ticket, nav.find_path(start, goal, self.search))
+        elif self.mode == "thread":
+            if self.worker is None:
+                self.worker = threading.Thread(target=self._work, name="PathService", daemon=True)
+                self.worker.start()
+            self.requests.put((ticket, start, goal, profile))
+        else:
+            start_x, start_y = nav.clamp(*start)
+            goal_x, goal_y = nav.clamp(*goal)
+            start_index = start_y * nav.width + start_x
+            goal_index = nav.goal_index(start_index, goal_y * nav.width + goal_x)
+            if goal_index < 0:
+                # Unreachable goals are answered right away, without a search
+                self._finish(ticket, None)
+            elif self.mode == "pool":
+                self.waiting.append((ticket, profile, start_index, goal_index))
+            else:
+                self.active.append(PathRequest(ticket, nav, start_index, goal_index))
+        return ticket
+
+    def poll(self, ticket):
+        """
+        Collects the result of a request, if it is ready. A result can only be collected once.
+
+        Args:
+            ticket (int): The ticket returned by submit.
+
+        Returns:
+            list of tuple: The path as in NavGrid.find_path (None if there is no path), or PENDING.
+        """
+        return self.results.pop(ticket, PENDING)
+
+    def cancel(self, ticket):
+        """
+        Drops a request whose result is not needed anymore, e.g. because the entity got a new destination.
+
+        Args:
+            ticket (int): The ticket returned by submit.
+        """
+        with self.lock:
+            if self.results.pop(ticket, PENDING) is PENDING and ticket in self.submitted:
+                self.cancelled.add(ticket)
+
+    def tick(self):
+        """
+        Gives the sliced searches their share of the frame. Requests take turns of SLICE_EXPANSIONS expanded nodes,
+        round robin, until the budget of the frame is used up, so many simultaneous requests make each one wait
+        longer instead of making the frame longer. Time left over computes the cluster costs of the hierarchy,
+        long requests use it once it is ready, and then the landmark tables of the heuristic.
+        In the pool mode the finished batch is published and the requests waiting since are sent as the next one.
+        In the other modes the whole budget goes to the precomputations.
+        """
+        deadline = time.perf_counter() + self.budget
+        if self.mode == "pool":
+            self._dispatch()
+        active = self.active
+        while active and time.perf_counter() < deadline:
+            request = active.popleft()
+            if request.ticket in self.cancelled:
+                self._finish(request.ticket, None)
+            elif request.advance(SLICE_EXPANSIONS):
+                self._finish(request.ticket, request.path)
+            else:
+                active.append(request)
+        for nav in self.layers.values():
+            if time.perf_counter() < deadline:
+                nav.warm(deadline)
+
+    def pending(self):
+        """
+        Returns the number of requests that have not been answered yet.
+
+        Returns:
+            int: The queue depth.
+        """
+        return len(self.submitted)
+
+    def average_wait(self):
+        """
+        Returns how long the answered requests waited on average.
+
+        Returns:
+            float: The average wait in milliseconds.
+        """
+        if self.answered == 0:
+            return 0.
+        return 1000. * self.waited / self.answered
+
+    def _finish(self, ticket, path):
+        """
+        Publishes the result of a request, unless it was cancelled.
+
+        Args:
+            ticket (int): The ticket of the request.
+            path (list of tuple): The found path, None if there is none.
+        """
+        with self.lock:
+            submitted = self.submitted.pop(ticket)
+            if ticket in self.cancelled:
+                self.cancelled.discard(ticket)
+                return
+            self.results[ticket] = path
+            self.answered += 1
+            self.waited += time.perf_counter() - submitted
+
+    def _dispatch(self):
+        """
+        Publishes the paths of the batch in flight once the pool solved it, then sends the waiting requests
+        the cache or the hierarchy can't answer to the pool as the next batch. Requests of a layer whose costs
+        changed while the batch was in flight are searched again.
+        """
+        batch = self.batch
+        if batch is not None:
+            if not batch.ready():
+                return
+            for (ticket, profile, start, goal), path in zip(self.batch_requests, batch.get()):
+                nav = self.layers[profile]
+                if ticket in self.cancelled:
+                    self._finish(ticket, None)
+                elif batch.versions[profile] != nav.version:
+                    self.waiting.append((ticket, profile, start, goal))
+                else:
+                    if path is not None:
+                        nav.store_path(start, goal, path)
+                        path = [(node % nav.width, node // nav.width) for node in path]
+                    self._finish(ticket, path)
+            self.batch = None
+            self.batch_requests = []
+
+        requests = []
+        for ticket, profile, start, goal in self.waiting:
+            if ticket in self.cancelled:
+                self._finish(ticket, None)
+                continue
+            nav = self.layers[profile]
+            path = nav.quick_path(start, goal, warm_only=True)
+            if path is not None:
+                self._finish(ticket, [(node % nav.width, node // nav.width) for node in path])
+            else:
+                requests.append((ticket, profile, start, goal))
+        self.waiting = []
+        if requests:
+            if self.pool is None:
+                self.pool = PathPool(self.layers, self.workers)
+            self.batch = self.pool.submit([(profile, start, goal) for _, profile, start, goal in requests])
+            self.batch_requests = requests
+
+    def _work(self):
+        """Solves the queued requests one by one, runs on the worker thread."""
+        while True:
+            ticket, start, goal, profile = self.requests.get()
+            if ticket in self.cancelled:
+                self._finish(ticket, None)
+                continue
+            self._finish(ticket, self.layers[profile].find_path_unlocked(start, goal, self.search))
@@ -0,0 +1,70 @@
+"""
+CS5150 Game AI Final Project
+Team Member: Jianyan Chen, Ruidi Huang, Xin Qi
+Aug 2024
+
+This program measures the path throughput of the PathPool on the land layer of a generated map, serially on the main
+process first and then with one worker process per core and fewer.
+Run it from the project root: python -m navigation.pool_benchmark [map size] [number of queries] [seed]
+"""
+
+import multiprocessing
+import random
+import sys
+import time
+from array import array
+
+from navigation.astar import astar
+from navigation.benchmark import generate_costs, path_cost
+from navigation.nav_grid import NavGrid
+from navigation.path_pool import PathPool
+from navigation.profiles import BLOCKED
+
+# The cost generate_costs gives water, which the land layer blocks
+WATER_COST = 100
+
+
+def run(size=256, queries=400, seed=1):
+    """
+    Solves the same random batch of queries serially and on pools of growing size, and prints the paths per second.
+
+    Args:
+        size (int): The side length of the map in tiles. Defaults to 256.
+        queries (int): The number of queries in the batch. Defaults to 400.
+        seed (int): The random seed of the map and of the queries. Defaults to 1.
+    """
+    land = array('i', [BLOCKED if cost == WATER_COST else cost for cost in generate_costs(size, seed)])
+    nav = NavGrid(size, size, land)
+    rng = random.Random(seed)
+    walkable = [index for index in range(size * size) if land[index] == 1]
+    batch = []
+    while len(batch) < queries:
+        start, goal = rng.choice(walkable), rng.choice(walkable)
+        if nav.regions.connected(start, goal):
+            batch.append(("land", start, goal))
+    print("Map %dx%d, batch of %d queries, %d cores" % (size, size, queries, multiprocessing.cpu_count()))
+
+    start_time = time.perf_counter()
+    expected = [astar(land, size, size, start, goal, nav.min_cost) for _, start, goal in batch]
+    serial_time = time.perf_counter() - start_time
+    print("%-10s %10.0f paths/s" % ("serial", queries / serial_time))
+
+    workers = multiprocessing.cpu_count()
+    counts = sorted(set([1, 2, 4, workers // 2, workers]) - {0})
+    for count in [count for count in counts if count <= workers]:
+        pool = PathPool({"land": nav}, count)
+        # The first batch pays for starting the workers, only the second one is timed
+        pool.submit(batch[:count]).get()
+        start_time = time.perf_counter()
+        paths = pool.submit(batch).get()
+        pool_time = time.perf_counter() - start_time
+        pool.close()
+        same = sum(1 for (_, start, _), path, serial in zip(batch, paths, expected)
+                   if abs(path_cost(land, size, start, path) - path_cost(land, size, start, serial)) < 1e-6)
+        print("%-10s %10.0f paths/s, %.1fx, %d/%d paths as cheap as the serial ones" %
+              ("%d workers" % count, queries / pool_time, serial_time / pool_time, same, queries))
+
+
+if __name__ == "__main__":
+    arguments = [int(argument) for argument in sys.argv[1:4]]
+    run(*arguments)
@@ -0,0 +1,87 @@
+"""
+CS5150 Game AI Final Project
+Team Member: Jianyan Chen, Ruidi Huang, Xin Qi
+Aug 2024
+
+This program contains the movement profiles of the navigation layers.
+A profile describes how one kind of entity moves over the terrain: the cost of a tile for the pathfinder, or BLOCKED
+if entities of that profile can't use the tile at all, and the factor their speed is multiplied by on it.
+Every profile gets its own NavGrid, which compiles both into arrays when the world is built, so the searches read
+the costs and the movement code reads the speed of a tile with a single array index.
+"""
+
+# Cost of a tile the profile can't use. Real costs are always at least 1, so the searches test "if not cost".
+BLOCKED = 0
+
+# Walking on stone and snow takes twice as long
+LAND_SPEEDS = {"AndrewSmoothStone": 0.5, "MinecraftSnow": 0.5}
+
+
+class TerrainProfile(object):
+    """
+    The per tile type costs and speeds of a movement profile. Tiles are looked up by their name.
+
+    Attributes:
+        land (bool): True if the profile walks on the walkable tiles, False if it sails on water.
+        costs (dict): Maps a tile name to its cost. Other tiles cost their Tile.cost times cost_factor on land,
+                      and 1 on water.
+        speeds (dict): Maps a tile name to the speed factor on it. Other tiles are crossed at full speed.
+        cost_factor (int): The factor of the Tile.cost of the tiles not in costs.
+    """
+    def __init__(self, land=True, costs=None, speeds=None, cost_factor=1):
+        """
+        Initializes a profile.
+
+        Args:
+            land (bool): True for a land profile, False for a water profile. Defaults to True.
+            costs (dict): Maps a tile name to its cost. Defaults to None.
+            speeds (dict): Maps a tile name to the speed factor on it. Defaults to None.
+            cost_factor (int): The factor of the Tile.cost of the other tiles. Defaults to 1.
+        """
+        self.land = land
+        self.costs = costs or {}
+        self.speeds = speeds or {}
+        self.cost_factor = cost_factor
+
+    def cost(self, tile):
+        """
+        Movement cost of a tile for the pathfinder.
+
+        Args:
+            tile (Tile): The tile.
+
+        Returns:
+            int: The cost of the tile, or BLOCKED if the profile can't use it.
+        """
+        if self.land:
+            if not tile.walkable:
+                return BLOCKED
+            return self.costs.get(tile.name, tile.cost * self.cost_factor)
+        if not tile.buildable_w or tile.walkable:
+            return BLOCKED
+        return self.costs.get(tile.name, 1)
+
+    def speed(self, tile):
+        """
+        Speed factor of an entity of this profile on a tile.
+
+        Args:
+            tile (Tile): The tile.
+
+        Returns:
+            float: The factor of the base speed.
+        """
+        return self.speeds.get(tile.name, 1.0)
+
+
+# Maps the name of a profile to its TerrainProfile, new profiles only need an entry here
+PROFILES = {
+    # Villagers walk on every walkable tile
+    "land": TerrainProfile(speeds=LAND_SPEEDS),
+    # Boats sail on every tile that takes water buildings
+    "water": TerrainProfile(land=False),
+    # Explorers gather stone, they cross it as easily as grass
+    "explorer": TerrainProfile(costs={"AndrewSmoothStone": 1}, speeds={"MinecraftSnow": 0.5}),
+    # Anglers keep to the shoreline, the beach is half as costly to them as the land behind it
+    "angler": TerrainProfile(costs={"Sand": 1}, speeds=LAND_SPEEDS, cost_factor=2),
+}
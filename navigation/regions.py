@@ -0,0 +1,291 @@
+"""
+CS5150 Game AI Final Project
+Team Member: Jianyan Chen, Ruidi Huang, Xin Qi
+Aug 2024
+
+This program defines the RegionMap class, the connected regions of the usable tiles of a navigation layer.
+Two tiles with the same region label are connected, so a goal in another region is rejected before any search.
+Diagonal moves are allowed between any two usable tiles, so regions are 8-connected like the searches.
+"""
+
+from array import array
+from collections import deque
+
+from navigation.astar import NEIGHBOURS
+
+
+class RegionMap(object):
+    """
+    Labels every usable tile of a grid with the id of its connected region, 0 for blocked tiles.
+    The labels are kept up to date when tiles become blocked or usable, without labeling the whole grid again.
+
+    Attributes:
+        costs (array.array): Row-major tile costs, 0 for blocked tiles.
+        width (int): The grid width in tiles.
+        height (int): The grid height in tiles.
+        labels (array.array): The region label of every tile.
+        sizes (dict): Maps a region label to its number of tiles.
+        next_label (int): The label given to the next new region.
+    """
+    def __init__(self, costs, width, height):
+        """
+        Initializes and labels the regions of a grid.
+
+        Args:
+            costs (array.array): Row-major tile costs.
+            width (int): The grid width in tiles.
+            height (int): The grid height in tiles.
+        """
+        self.costs = costs
+        self.width = width
+        self.height = height
+        self.labels = array('l', [0]) * (width * height)
+        self.sizes = {}
+        self.next_label = 1
+        for index in range(width * height):
+            if costs[index] and not self.labels[index]:
+                self._fill(index, 0)
+
+    def region(self, index):
+        """
+        Returns the region of a tile.
+
+        Args:
+            index (int): The flat index of the tile.
+
+        Returns:
+            int: The region label, 0 if the tile is blocked.
+        """
+        return self.labels[index]
+
+    def connected(self, a, b):
+        """
+        Checks if a path between two tiles exists.
+
+        Args:
+            a (int): The flat index of the first tile.
+            b (int): The flat index of the second tile.
+
+        Returns:
+            bool: True if both tiles are usable and in the same region.
+        """
+        label = self.labels[a]
+        return label != 0 and label == self.labels[b]
+
+    def _neighbours(self, index):
+        """
+        Lists the usable neighbours of a tile.
+
+        Args:
+            index (int): The flat index of the tile.
+
+        Returns:
+            list of int: The flat indices of the usable neighbours, in NEIGHBOURS order.
+        """
+        tile_y, tile_x = divmod(index, self.width)
+        found = []
+        for dx, dy, _ in NEIGHBOURS:
+            x = tile_x + dx
+            y = tile_y + dy
+            if 0 <= x < self.width and 0 <= y < self.height and self.costs[y * self.width + x]:
+                found.append(y * self.width + x)
+        return found
+
+    def _relabel(self, index, old_label, label):
+        """
+        Changes the label of the tiles connected to a tile that still carry an old label.
+
+        Args:
+            index (int): The flat index of the first tile, it carries the old label.
+            old_label (int): The label the tiles have now, 0 when labeling unlabeled tiles.
+            label (int): The label the tiles get.
+
+        Returns:
+            int: The number of relabeled tiles.
+        """
+        labels = self.labels
+        labels[index] = label
+        size = 1
+        frontier = deque((index,))
+        while frontier:
+            for neighbour in self._neighbours(frontier.popleft()):
+                if labels[neighbour] == old_label:
+                    labels[neighbour] = label
+                    size += 1
+                    frontier.append(neighbour)
+        return size
+
+    def _fill(self, index, old_label):
+        """
+        Gives a new region label to the tiles connected to a tile that still carry an old label.
+
+        Args:
+            index (int): The flat index of the first tile.
+            old_label (int): The label the filled tiles have now, 0 when labeling unlabeled tiles.
+
+        Returns:
+            int: The new label.
+        """
+        label = self.next_label
+        self.next_label += 1
+        size = self._relabel(index, old_label, label)
+        self.sizes[label] = size
+        if old_label:
+            self.sizes[old_label] -= size
+            if not self.sizes[old_label]:
+                del self.sizes[old_label]
+        return label
+
+    def update_tiles(self, tile_coords):
+        """
+        Updates the labels after tiles became blocked or usable, costs already updated.
+        A single new usable tile joins or merges the regions around it, the smaller ones are relabeled.
+        A single new blocked tile can only split its region if its usable neighbours are not connected around it,
+        only then are the parts relabeled. When several tiles changed, the regions around them are labeled again
+        with flood fills, as tiles changing together can open and cut the same region in ways no local check sees.
+
+        Args:
+            tile_coords (iterable): The (tile_x, tile_y) positions whose cost changed, in any order and possibly
+                                    repeated.
+        """
+        labels = self.labels
+        width = self.width
+        # The same tile listed twice must only be counted once
+        changed = list(dict.fromkeys(tile_y * width + tile_x for tile_x, tile_y in tile_coords))
+        opened = []
+        blocked = []
+        affected = set()
+        # Unlabel every new blocked tile first, so no fill below walks over one of them
+        for index in changed:
+            label = labels[index]
+            if self.costs[index] and not label:
+                opened.append(index)
+            elif not self.costs[index] and label:
+                labels[index] = 0
+                self.sizes[label] -= 1
+                if not self.sizes[label]:
+                    del self.sizes[label]
+                affected.add(label)
+                blocked.append(index)
+        if len(opened) + len(blocked) > 1:
+            self._refill(opened + blocked, affected)
+        elif blocked:
+            self._split(blocked[0])
+        elif opened:
+            self._open(opened[0])
+
+    def _refill(self, changed, affected):
+        """
+        Labels the regions around several changed tiles again. Every region that held one of the changed tiles
+        or touches one of them is flood filled from the tiles around the changes, so a region that fell apart
+        gets one label per part, and regions joined by a new usable tile share one.
+
+        Args:
+            changed (list of int): The flat indices of the tiles that became usable or blocked.
+            affected (set): The labels the blocked tiles had, more are added from the neighbours.
+        """
+        labels = self.labels
+        seeds = []
+        for index in changed:
+            if self.costs[index]:
+                seeds.append(index)
+            for neighbour in self._neighbours(index):
+                seeds.append(neighbour)
+                if labels[neighbour]:
+                    affected.add(labels[neighbour])
+        sizes = self.sizes
+        for seed in seeds:
+            # Tiles with an affected label or none yet belong to a region not labeled again so far
+            if labels[seed] and labels[seed] not in affected:
+                continue
+            label = self.next_label
+            self.next_label += 1
+            old_label = labels[seed]
+            if old_label:
+                sizes[old_label] -= 1
+            labels[seed] = label
+            size = 1
+            frontier = deque((seed,))
+            while frontier:
+                for neighbour in self._neighbours(frontier.popleft()):
+                    old_label = labels[neighbour]
+                    if not old_label or old_label in affected:
+                        if old_label:
+                            sizes[old_label] -= 1
+                        labels[neighbour] = label
+                        size += 1
+                        frontier.append(neighbour)
+            sizes[label] = size
+        # Every tile of an affected region was reached from a tile next to a change, so they are all empty now
+        for label in affected:
+            sizes.pop(label, None)
+
+    def _open(self, index):
+        """
+        Labels a tile that became usable.
+
+        Args:
+            index (int): The flat index of the tile.
+        """
+        labels = self.labels
+        around = set(labels[neighbour] for neighbour in self._neighbours(index))
+        around.discard(0)
+        if not around:
+            label = self.next_label
+            self.next_label += 1
+            labels[index] = label
+            self.sizes[label] = 1
+            return
+        largest = max(around, key=self.sizes.get)
+        labels[index] = largest
+        self.sizes[largest] += 1
+        around.discard(largest)
+        for neighbour in self._neighbours(index):
+            label = labels[neighbour]
+            if label in around:
+                # Merge the smaller region into the largest one
+                around.discard(label)
+                self.sizes[largest] += self._relabel(neighbour, label, largest)
+                del self.sizes[label]
+
+    def _cuts(self, around):
+        """
+        Checks if the neighbours of a newly blocked tile fall apart into groups that don't touch each other.
+        If they don't, the tile cut nothing, whatever went through it can go around it.
+
+        Args:
+            around (list of int): The flat indices of the usable neighbours of the tile.
+
+        Returns:
+            bool: True if the neighbours form at least two groups.
+        """
+        width = self.width
+        groups = []
+        for neighbour in around:
+            ny, nx = divmod(neighbour, width)
+            touching = [group for group in groups
+                        if any(abs(nx - other % width) <= 1 and abs(ny - other // width) <= 1 for other in group)]
+            merged = [neighbour]
+            for group in touching:
+                merged.extend(group)
+                groups.remove(group)
+            groups.append(merged)
+        return len(groups) > 1
+
+    def _split(self, index):
+        """
+        Relabels the parts of a region a newly blocked tile cut apart, if it cut anything.
+
+        Args:
+            index (int): The flat index of the blocked tile.
+        """
+        around = self._neighbours(index)
+        if not self._cuts(around):
+            return
+        # The groups may still be connected around a larger loop, a tile reached by an earlier fill is skipped
+        labels = self.labels
+        fresh = set()
+        for neighbour in around:
+            label = labels[neighbour]
+            if label and label not in fresh:
+                fresh.add(self._fill(neighbour, label))
@@ -0,0 +1,92 @@
+"""
+CS5150 Game AI Final Project
+Team Member: Jianyan Chen, Ruidi Huang, Xin Qi
+Aug 2024
+
+This program contains the path smoothing applied to the tile paths before villagers follow them.
+Consecutive tiles are pulled into straight segments as long as every tile the segment crosses costs the same,
+so a villager walks a few straight lines instead of zig-zagging from tile centre to tile centre.
+"""
+
+from array import array
+
+# Longest straight segment in tiles, keeps the line-of-sight checks of a long path cheap
+MAX_SEGMENT = 16
+
+
+def line_of_sight(costs, width, a, b):
+    """
+    Checks if the straight line between the centres of two tiles only crosses tiles of the same cost.
+    A line passing exactly through a tile corner counts as crossing both tiles beside the corner.
+
+    Args:
+        costs (array.array): Row-major tile costs.
+        width (int): The grid width in tiles.
+        a (int): The flat index of the first tile.
+        b (int): The flat index of the second tile.
+
+    Returns:
+        bool: True if every crossed tile costs the same as the first one.
+    """
+    cost = costs[a]
+    if costs[b] != cost:
+        return False
+    ay, ax = divmod(a, width)
+    by, bx = divmod(b, width)
+    dx = abs(bx - ax)
+    dy = abs(by - ay)
+    step_x = 1 if bx > ax else -1
+    step_y = 1 if by > ay else -1
+    x = ax
+    y = ay
+    error = dx - dy
+    dx *= 2
+    dy *= 2
+    while x != bx or y != by:
+        if error > 0:
+            x += step_x
+            error -= dy
+        elif error < 0:
+            y += step_y
+            error += dx
+        else:
+            # Through the corner, the line touches the tiles on both sides of it
+            if costs[y * width + x + step_x] != cost or costs[(y + step_y) * width + x] != cost:
+                return False
+            x += step_x
+            y += step_y
+            error += dx - dy
+        if costs[y * width + x] != cost:
+            return False
+    return True
+
+
+def string_pull(costs, width, start, path):
+    """
+    Reduces a tile path to the waypoints where it has to turn.
+
+    Args:
+        costs (array.array): Row-major tile costs.
+        width (int): The grid width in tiles.
+        start (int): The flat index of the tile the path starts from.
+        path (list of int): The flat indices of the path, start excluded.
+
+    Returns:
+        array.array: The flat indices of the waypoints, the last one is the end of the path.
+    """
+    waypoints = array('l')
+    if not path:
+        return waypoints
+    anchor = start
+    previous = start
+    length = 0
+    for node in path:
+        length += 1
+        # A step to a neighbour of the anchor is a step of the path itself and always allowed
+        if previous != anchor and (length > MAX_SEGMENT or not line_of_sight(costs, width, anchor, node)):
+            waypoints.append(previous)
+            anchor = previous
+            length = 1
+        previous = node
+    waypoints.append(previous)
+    return waypoints
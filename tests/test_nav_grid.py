@@ -0,0 +1,79 @@
+"""
+CS5150 Game AI Final Project
+Team Member: Jianyan Chen, Ruidi Huang, Xin Qi
+Aug 2024
+
+This program tests how NavGrid answers goals in other regions and goals on blocked tiles before any search runs.
+"""
+
+import random
+from array import array
+from collections import deque
+
+from navigation.astar import NEIGHBOURS
+from navigation.nav_grid import NavGrid
+
+
+def grid(rows):
+    """Builds a NavGrid from rows of text, '.' for a usable tile and '#' for a blocked one."""
+    costs = array('i', [1 if cell == '.' else 0 for row in rows for cell in row])
+    return NavGrid(len(rows[0]), len(rows), costs)
+
+
+def connected(nav, start, goal):
+    """Breadth first search over the usable tiles, the reference for the region checks."""
+    width = nav.width
+    seen = {start}
+    frontier = deque((start,))
+    while frontier:
+        index = frontier.popleft()
+        if index == goal:
+            return True
+        tile_y, tile_x = divmod(index, width)
+        for dx, dy, _ in NEIGHBOURS:
+            x = tile_x + dx
+            y = tile_y + dy
+            neighbour = y * width + x
+            if 0 <= x < width and 0 <= y < nav.height and nav.costs[neighbour] and neighbour not in seen:
+                seen.add(neighbour)
+                frontier.append(neighbour)
+    return False
+
+
+def test_goal_across_a_strait_is_rejected():
+    nav = grid(["..#..",
+                "..#..",
+                "..#.."])
+    assert nav.goal_index(0, 3) == -1
+    assert not nav.reachable((0, 0), (3, 0))
+    assert not nav.reachable((0, 0), (3, 0), snap=True)
+    assert nav.find_path((0, 0), (3, 0)) is None
+
+
+def test_blocked_goal_snaps_only_when_asked():
+    nav = grid(["..#..",
+                "..#..",
+                "..#.."])
+    assert nav.goal_index(0, 2) in (1, 7)
+    assert not nav.reachable((0, 0), (2, 0))
+    assert nav.reachable((0, 0), (2, 0), snap=True)
+    assert not nav.reachable((0, 0), (-1, 0))
+    assert nav.find_path((0, 0), (2, 0))[-1] in ((1, 0), (1, 1))
+
+
+def test_reachable_matches_search_on_random_grids():
+    rng = random.Random(5)
+    for _ in range(100):
+        width = rng.randint(3, 14)
+        height = rng.randint(3, 14)
+        nav = NavGrid(width, height, array('i', [rng.random() < 0.55 for _ in range(width * height)]))
+        usable = [index for index in range(width * height) if nav.costs[index]]
+        if not usable:
+            continue
+        for _ in range(20):
+            start = rng.choice(usable)
+            goal = rng.randrange(width * height)
+            expected = bool(nav.costs[goal]) and connected(nav, start, goal)
+            assert nav.reachable((start % width, start // width), (goal % width, goal // width)) == expected
+            if nav.costs[goal]:
+                assert (nav.goal_index(start, goal) >= 0) == expected
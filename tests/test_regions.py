@@ -0,0 +1,67 @@
+"""
+CS5150 Game AI Final Project
+Team Member: Jianyan Chen, Ruidi Huang, Xin Qi
+Aug 2024
+
+This program tests that RegionMap.update_tiles keeps the same regions as labeling the grid again from scratch.
+"""
+
+import random
+from array import array
+from collections import Counter
+
+from navigation.regions import RegionMap
+
+
+def canonical(labels):
+    """Renumbers the labels in order of first appearance, so two labelings of the same regions compare equal."""
+    numbers = {}
+    return [numbers.setdefault(label, len(numbers) + 1) if label else 0 for label in labels]
+
+
+def assert_rebuilt(regions):
+    """Checks the labels and sizes of a RegionMap against a RegionMap built from its current costs."""
+    rebuilt = RegionMap(regions.costs, regions.width, regions.height)
+    assert canonical(regions.labels) == canonical(rebuilt.labels)
+    assert regions.sizes == dict(Counter(label for label in regions.labels if label))
+
+
+def test_block_and_open_in_one_batch():
+    costs = array('i', [1, 1, 1,
+                        0, 0, 0,
+                        1, 1, 1])
+    regions = RegionMap(costs, 3, 3)
+    costs[1] = 0
+    costs[4] = 1
+    regions.update_tiles([(1, 0), (1, 1)])
+    assert_rebuilt(regions)
+    assert regions.connected(0, 2)
+
+    costs[1] = 1
+    regions.update_tiles([(1, 0)])
+    assert_rebuilt(regions)
+
+
+def test_repeated_tiles_are_counted_once():
+    costs = array('i', [1, 0, 1])
+    regions = RegionMap(costs, 3, 1)
+    costs[1] = 1
+    regions.update_tiles([(1, 0), (1, 0)])
+    assert_rebuilt(regions)
+    assert regions.sizes == {regions.region(0): 3}
+
+
+def test_random_batches_match_rebuild():
+    rng = random.Random(11)
+    for _ in range(200):
+        width = rng.randint(2, 12)
+        height = rng.randint(2, 12)
+        costs = array('i', [rng.random() < 0.6 for _ in range(width * height)])
+        regions = RegionMap(costs, width, height)
+        for _ in range(20):
+            coords = [(rng.randrange(width), rng.randrange(height)) for _ in range(rng.choice((1, 1, 2, 3, 6)))]
+            coords += coords[:rng.randint(0, 1)]
+            for tile_x, tile_y in coords:
+                costs[tile_y * width + tile_x] = int(rng.random() < 0.5)
+            regions.update_tiles(coords)
+            assert_rebuilt(regions)
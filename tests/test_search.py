@@ -0,0 +1,175 @@
+"""
+CS5150 Game AI Final Project
+Team Member: Jianyan Chen, Ruidi Huang, Xin Qi
+Aug 2024
+
+This program tests the grid searches and the flow field repair against a plain Dijkstra on random grids.
+"""
+
+import heapq
+import math
+import random
+from array import array
+
+from navigation.astar import NEIGHBOURS, astar, nearest_goal
+from navigation.flow_field import FlowField
+from navigation.jps import JumpGrid, jps
+from navigation.landmarks import LandmarkTable
+from navigation.nav_grid import NavGrid
+from navigation.regions import RegionMap
+
+# Costs of the random grids: blocked, plain, stone and water like
+COSTS = (0, 1, 1, 1, 2, 5)
+
+
+def random_costs(rng, width, height):
+    """Draws the costs of a grid, mostly plain tiles so the jump search has open fields to jump over."""
+    return array('i', [rng.choice(COSTS) for _ in range(width * height)])
+
+
+def dijkstra(costs, width, height, source):
+    """The reference costs from a tile to every tile, edges weigh the same both ways."""
+    dist = [math.inf] * (width * height)
+    dist[source] = 0.0
+    open_heap = [(0.0, source)]
+    while open_heap:
+        current_dist, current = heapq.heappop(open_heap)
+        if current_dist > dist[current]:
+            continue
+        cy, cx = divmod(current, width)
+        for dx, dy, weight in NEIGHBOURS:
+            x = cx + dx
+            y = cy + dy
+            neighbour = y * width + x
+            if 0 <= x < width and 0 <= y < height and costs[neighbour]:
+                candidate = current_dist + weight * (costs[current] + costs[neighbour])
+                if candidate < dist[neighbour]:
+                    dist[neighbour] = candidate
+                    heapq.heappush(open_heap, (candidate, neighbour))
+    return dist
+
+
+def path_cost(costs, width, start, path):
+    """Checks that a path only takes steps between usable neighbours and sums its edge weights."""
+    total = 0.0
+    previous = start
+    for node in path:
+        py, px = divmod(previous, width)
+        ny, nx = divmod(node, width)
+        assert max(abs(nx - px), abs(ny - py)) == 1 and costs[node]
+        total += (0.5 if nx == px or ny == py else 0.707) * (costs[previous] + costs[node])
+        previous = node
+    return total
+
+
+def assert_shortest(costs, width, start, goal, path, expected):
+    """Checks a search answer against the reference cost, None when the goal can't be reached."""
+    if expected == math.inf:
+        assert path is None
+    else:
+        assert path is not None and (path[-1] if path else start) == goal
+        assert math.isclose(path_cost(costs, width, start, path), expected, abs_tol=1e-9)
+
+
+def usable(costs):
+    """The flat indices of the tiles that are not blocked."""
+    return [index for index, cost in enumerate(costs) if cost]
+
+
+def test_astar_and_jps_find_shortest_paths():
+    rng = random.Random(3)
+    for _ in range(60):
+        width = rng.randint(2, 16)
+        height = rng.randint(2, 16)
+        costs = random_costs(rng, width, height)
+        jumps = JumpGrid(costs, width, height)
+        for _ in range(4):
+            # The jump data is repaired after every batch, like NavGrid.update_tiles does
+            coords = [(rng.randrange(width), rng.randrange(height)) for _ in range(rng.randint(1, 4))]
+            for tile_x, tile_y in coords:
+                costs[tile_y * width + tile_x] = rng.choice(COSTS)
+            jumps.update_tiles(coords)
+            starts = usable(costs)
+            if not starts:
+                continue
+            for _ in range(5):
+                start = rng.choice(starts)
+                dist = dijkstra(costs, width, height, start)
+                goal = rng.randrange(width * height)
+                assert_shortest(costs, width, start, goal, astar(costs, width, height, start, goal), dist[goal])
+                assert_shortest(costs, width, start, goal, jps(costs, width, height, start, goal, 1, jumps), dist[goal])
+
+
+def test_landmark_heuristic_finds_shortest_paths():
+    rng = random.Random(7)
+    for _ in range(40):
+        width = rng.randint(3, 16)
+        height = rng.randint(3, 16)
+        costs = random_costs(rng, width, height)
+        table = LandmarkTable(costs, width, height, RegionMap(costs, width, height), 4)
+        table.warm()
+        for _ in range(3):
+            starts = usable(costs)
+            if not starts:
+                break
+            for _ in range(5):
+                start = rng.choice(starts)
+                dist = dijkstra(costs, width, height, start)
+                goal = rng.randrange(width * height)
+                path = astar(costs, width, height, start, goal, landmarks=table.heuristic_tables(goal))
+                assert_shortest(costs, width, start, goal, path, dist[goal])
+            # Tables stay in use while tiles only get more expensive or blocked
+            for _ in range(rng.randint(1, 4)):
+                index = rng.randrange(width * height)
+                if costs[index]:
+                    costs[index] = rng.choice([cost for cost in COSTS if cost == 0 or cost > costs[index]])
+            table.update_tiles(False)
+
+
+def test_nearest_goal_reaches_the_cheapest_goal():
+    rng = random.Random(13)
+    for _ in range(60):
+        width = rng.randint(2, 16)
+        height = rng.randint(2, 16)
+        costs = random_costs(rng, width, height)
+        starts = usable(costs)
+        if not starts:
+            continue
+        for _ in range(5):
+            start = rng.choice(starts)
+            dist = dijkstra(costs, width, height, start)
+            goals = [rng.randrange(width * height) for _ in range(rng.randint(1, 5))]
+            expected = min(dist[goal] for goal in goals)
+            goal, path = nearest_goal(costs, width, height, start, goals)
+            if expected == math.inf:
+                assert (goal, path) == (-1, None)
+            else:
+                assert goal in goals and dist[goal] == expected
+                assert_shortest(costs, width, start, goal, path, expected)
+
+
+def test_flow_field_repair_matches_rebuild():
+    rng = random.Random(17)
+    for _ in range(60):
+        width = rng.randint(2, 14)
+        height = rng.randint(2, 14)
+        nav = NavGrid(width, height, random_costs(rng, width, height))
+        max_cost = rng.choice((6.0, 15.0, math.inf))
+        field = FlowField(nav, rng.randrange(width * height), max_cost)
+        for _ in range(10):
+            changed = [rng.randrange(width * height) for _ in range(rng.randint(1, 4))]
+            for index in changed:
+                nav.costs[index] = rng.choice(COSTS)
+            field.repair(changed)
+            rebuilt = FlowField(nav, field.goal, max_cost)
+            for index in range(width * height):
+                assert math.isclose(field.dist[index], rebuilt.dist[index], abs_tol=1e-9)
+                # Following the field from any tile in it walks down to the goal at the cost it stores
+                next_index = field.next[index]
+                if index == field.goal or field.dist[index] == math.inf:
+                    continue
+                # The goal can be a blocked tile, like a building, its field still leads to it
+                (py, px), (ny, nx) = divmod(index, width), divmod(next_index, width)
+                assert max(abs(nx - px), abs(ny - py)) == 1
+                step = (0.5 if nx == px or ny == py else 0.707) * (nav.costs[index] + nav.costs[next_index])
+                assert math.isclose(field.dist[index], field.dist[next_index] + step, abs_tol=1e-9)